@@ -0,0 +1,115 @@
+# agendador.py
+# Atribuição automática das tarefas sem responsável, equilibrando a carga da equipe.
+# As tarefas pendentes sem empregado são percorridas da mais urgente para a menos urgente
+# (já vêm ordenadas por prazo do índice) e cada uma vai para o empregado com a menor carga
+# no momento, escolhido por um heap: O(n log m) para n tarefas e m empregados.
+import heapq
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from database import agora_utc, aplicar_deltas_carga, carimbar_versao, versao_provisoria
+from models import Empregado, Tarefa
+
+# Tarefas que vencem até esta quantidade de dias (ou já vencidas) pesam mais na carga,
+# para que o trabalho urgente também fique espalhado entre as pessoas
+DIAS_URGENCIA = 3
+PESO_URGENTE = 2
+PESO_NORMAL = 1
+
+# Máximo de IDs por UPDATE ... WHERE id IN (...)
+TAMANHO_LOTE_UPDATE = 500
+
+
+def planejar_atribuicoes(
+    empregados: Iterable[Tuple[int, int]],
+    tarefas: Iterable[Tuple[int, Optional[date]]],
+    hoje: Optional[date] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Recebe (empregado_id, carga atual) e (tarefa_id, prazo) em ordem de urgência.
+    Devolve a lista de (tarefa_id, empregado_id). Não acessa o banco.
+    """
+    limite_urgencia = (hoje or date.today()) + timedelta(days=DIAS_URGENCIA)
+    heap = [(carga, empregado_id) for empregado_id, carga in empregados]
+    if not heap:
+        return []
+    heapq.heapify(heap)
+
+    plano = []
+    for tarefa_id, prazo in tarefas:
+        carga, empregado_id = heap[0]
+        plano.append((tarefa_id, empregado_id))
+        peso = PESO_URGENTE if prazo is not None and prazo <= limite_urgencia else PESO_NORMAL
+        heapq.heapreplace(heap, (carga + peso, empregado_id))
+    return plano
+
+
+def _carregar_empregados(db_session: Session, cargo: Optional[str]) -> List[Tuple[int, int]]:
+    stmt = select(Empregado.id, Empregado.tarefas_abertas)
+    if cargo is not None:
+        stmt = stmt.where(Empregado.cargo == cargo)
+    return [tuple(linha) for linha in db_session.execute(stmt)]
+
+
+def _carregar_tarefas_sem_responsavel(db_session: Session) -> List[Tuple[int, Optional[date]]]:
+    """Pendentes sem empregado, por prazo (índice empregado_id/concluida/prazo); sem prazo vão por último."""
+    base = select(Tarefa.id, Tarefa.prazo).where(Tarefa.empregado_id.is_(None), Tarefa.concluida == False)
+    com_prazo = db_session.execute(base.where(Tarefa.prazo.isnot(None)).order_by(Tarefa.prazo, Tarefa.id)).all()
+    sem_prazo = db_session.execute(base.where(Tarefa.prazo.is_(None)).order_by(Tarefa.id)).all()
+    return [tuple(linha) for linha in com_prazo] + [tuple(linha) for linha in sem_prazo]
+
+
+def atribuir_tarefas_pendentes(db_session: Session, cargo: Optional[str] = None, simular: bool = False) -> Dict:
+    """
+    Planeja e (se simular=False) grava a atribuição de todas as tarefas sem responsável,
+    em uma única transação. Com 'cargo', só empregados desse cargo recebem tarefas.
+    """
+    inicio = time.perf_counter()
+    plano = planejar_atribuicoes(_carregar_empregados(db_session, cargo), _carregar_tarefas_sem_responsavel(db_session))
+
+    por_empregado: Dict[int, List[int]] = defaultdict(list)
+    for tarefa_id, empregado_id in plano:
+        por_empregado[empregado_id].append(tarefa_id)
+
+    resultado = {"simulacao": simular, "atribuidas": 0}
+    if simular:
+        resultado["atribuidas"] = len(plano)
+        resultado["plano"] = [{"tarefa_id": t, "empregado_id": e} for t, e in plano]
+    elif plano:
+        conn = db_session.connection()
+        # As linhas são gravadas com uma versão provisória e a versão de verdade só é reservada
+        # no fim (carimbar_versao): o contador fica travado só durante o commit, não durante os lotes
+        provisoria = versao_provisoria()
+        # A condição "ainda sem responsável" protege contra uma atribuição concorrente:
+        # só as linhas realmente alteradas entram na carga do empregado.
+        # As condições vão dentro de coalesce(): com a coluna "nua", o SQLite sem estatísticas
+        # (ANALYZE) escolhe os índices de empregado_id/concluida e varre todas as tarefas
+        # pendentes a cada lote, em vez de buscar as linhas direto pela chave primária.
+        # Um único statement com parâmetros: compilado uma vez e reaproveitado em todos os lotes.
+        stmt = (
+            update(Tarefa)
+            .where(
+                Tarefa.id.in_(bindparam("ids", expanding=True)),
+                func.coalesce(Tarefa.empregado_id, 0) == 0,
+                func.coalesce(Tarefa.concluida, False) == False,
+            )
+            .values(empregado_id=bindparam("responsavel"), versao=provisoria, atualizado_em=agora_utc())
+        )
+        deltas = Counter()
+        for empregado_id, ids in por_empregado.items():
+            for i in range(0, len(ids), TAMANHO_LOTE_UPDATE):
+                lote = ids[i:i + TAMANHO_LOTE_UPDATE]
+                deltas[empregado_id] += conn.execute(stmt, {"ids": lote, "responsavel": empregado_id}).rowcount
+        aplicar_deltas_carga(conn, deltas)
+        carimbar_versao(conn, provisoria, Tarefa)
+        db_session.commit()
+        resultado["atribuidas"] = sum(deltas.values())
+
+    resultado["por_empregado"] = {e: len(ids) for e, ids in por_empregado.items()}
+    resultado["segundos"] = round(time.perf_counter() - inicio, 3)
+    return resultado
@@ -1,26 +1,326 @@
 # app.py (VERSÃO FINAL MAXIMIZADA E REFINADA, COM CORREÇÃO DE GRID/PACK)
 import tkinter as tk
 from tkinter import messagebox
-import ttkbootstrap as ttk 
+import ttkbootstrap as ttk
 
 # Importações completas do database
 from database import (
-    adicionar_empregado, listar_empregados, atualizar_empregado, deletar_empregado, 
-    buscar_empregado_por_id, adicionar_tarefa, listar_tarefas, atualizar_tarefa, 
-    deletar_tarefa, buscar_tarefa_por_id, listar_proximas_tarefas 
+    adicionar_empregado, listar_empregados, atualizar_empregado, deletar_empregado,
+    adicionar_tarefa, atualizar_tarefa,
+    buscar_tarefa_por_id, operar_tarefas_em_lote, listar_proximas_tarefas, estatisticas_dashboard,
+    pagina_empregados_desktop, pagina_tarefas_desktop, token_desktop,
+    alteracoes_empregados_desktop, alteracoes_tarefas_desktop
 )
+# Todo acesso ao banco passa pelo executor: a thread do Tk nunca espera o banco
+from executor_ui import ExecutorUI
+
+# --- Lista Virtual (Treeview paginada) ---
+# Com dezenas de milhares de linhas, inserir tudo no Treeview trava a janela por segundos e
+# ocupa memória à toa. A ListaVirtual mantém só uma JANELA de linhas no widget e busca a
+# página seguinte/anterior no banco (por cursor, ver database.pagina_*_desktop) quando a
+# rolagem chega perto da borda; ao passar de MAX_LINHAS, descarta as do lado oposto.
+# Ordenação (clique no cabeçalho) e filtro são feitos pelo SQL, nunca em memória.
+#
+# Depois de uma gravação a janela NÃO é refeita: a lista pede ao banco só o que mudou desde
+# o token da última leitura (database.alteracoes_*_desktop) e aplica item a item, pelo id
+# (iid do Treeview = id da linha): altera valores/tags no lugar, insere na posição certa e
+# remove o que saiu. Uma edição custa o mesmo com 50 ou com 50 mil linhas na tabela.
+
+TAMANHO_PAGINA = 200
+MAX_LINHAS = 600
+MARGEM_ROLAGEM = 0.15  # Fração da janela que, visível na borda, dispara a próxima página
+ITEM_VAZIO = "__vazio__"
+
+def _janela_com_token(buscar_pagina, **parametros):
+    # Roda no executor. Token lido ANTES da página: o que mudar no meio volta na próxima diferença
+    return token_desktop(), buscar_pagina(**parametros)
+
+def _diferenca(buscar_alteracoes, buscar_pagina, desde, **parametros):
+    # Roda no executor: ids que mudaram + as linhas atuais deles (já com filtro e chave de ordenação)
+    token, alterados, removidos = buscar_alteracoes(desde)
+    linhas = buscar_pagina(ids=alterados, **parametros) if alterados else []
+    return token, alterados, removidos, linhas
+
+class ListaVirtual(ttk.Frame):
+    """Treeview + barra de rolagem que carrega as linhas do banco sob demanda."""
+    def __init__(self, parent, executor, nome, buscar_pagina, buscar_alteracoes, colunas, formatar, texto_vazio, **opcoes_tree):
+        super().__init__(parent)
+        self.executor = executor
+        self._nome = nome                            # Chave de agrupamento das consultas no executor
+        self._buscar_pagina = buscar_pagina          # Funções do database.py (rodam no executor)
+        self._buscar_alteracoes = buscar_alteracoes
+        self._formatar = formatar                    # linha (dict) -> (values, tags)
+        self._titulos = dict(colunas)
+        self._texto_vazio = texto_vazio
+        self.ordenar, self.decrescente = colunas[0][0], False
+        self.filtros = {}
+
+        self._linhas = []       # Linhas hoje no widget, na ordem de exibição
+        self._por_id = {}       # id -> linha (as mesmas de _linhas)
+        self._inicio = True     # A janela começa na primeira linha do resultado?
+        self._fim = True        # A janela termina na última?
+        self._token = None      # Versão do banco da última leitura (base das diferenças)
+        self._carregando = False
+        self._geracao = 0       # Muda a cada recarga: respostas de recargas antigas são descartadas
+
+        self.tree = ttk.Treeview(self, columns=[c for c, _ in colunas], show='headings', **opcoes_tree)
+        self._barra = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._ao_rolar)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self._barra.grid(row=0, column=1, sticky="ns")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        for coluna, titulo in colunas:
+            self.tree.heading(coluna, text=titulo, command=lambda c=coluna: self.ordenar_por(c))
+        self._marcar_ordenacao()
+
+    # --- API das Views ---
+
+    def recarregar(self):
+        """Volta ao início da lista (nova ordenação ou filtro)."""
+        self._geracao += 1
+        geracao = self._geracao
+        self._carregando = True
+        self.executor.executar(
+            _janela_com_token, self._buscar_pagina, **self._parametros(), limite=TAMANHO_PAGINA,
+            ao_concluir=lambda resultado: self._receber_janela(geracao, *resultado),
+            ao_falhar=lambda erro: self._falhou(geracao, erro), chave=self._nome,
+        )
+
+    def atualizar(self):
+        """Aplica na janela só o que mudou no banco desde a última leitura (após uma gravação)."""
+        if self._token is None:
+            self.recarregar()
+            return
+        geracao = self._geracao
+        self.executor.executar(
+            _diferenca, self._buscar_alteracoes, self._buscar_pagina, self._token, **self._parametros(),
+            ao_concluir=lambda resultado: self._aplicar_diferenca(geracao, *resultado),
+            ao_falhar=lambda erro: self._falhou(geracao, erro), chave=self._nome + ":diferenca",
+        )
+
+    def ordenar_por(self, coluna):
+        # Segundo clique na mesma coluna inverte o sentido
+        self.decrescente = not self.decrescente if coluna == self.ordenar else False
+        self.ordenar = coluna
+        self._marcar_ordenacao()
+        self.recarregar()
+
+    def filtrar(self, **filtros):
+        self.filtros = filtros
+        self.recarregar()
+
+    def selecionados(self):
+        """Linhas (dicts) selecionadas; a linha de 'lista vazia' não conta."""
+        return [self._por_id[int(iid)] for iid in self.tree.selection() if iid != ITEM_VAZIO and int(iid) in self._por_id]
+
+    # --- Interno: leitura ---
+
+    def _parametros(self):
+        return dict(ordenar=self.ordenar, decrescente=self.decrescente, **self.filtros)
+
+    def _marcar_ordenacao(self):
+        for coluna, titulo in self._titulos.items():
+            seta = (" ▼" if self.decrescente else " ▲") if coluna == self.ordenar else ""
+            self.tree.heading(coluna, text=titulo + seta)
+
+    def _receber_janela(self, geracao, token, linhas):
+        if geracao != self._geracao:
+            return
+        # O estado fica certo ANTES de mexer no widget: inserir dispara o yscrollcommand
+        self._token = token
+        self._linhas = list(linhas)
+        self._por_id = {linha["id"]: linha for linha in linhas}
+        self._inicio, self._fim = True, len(linhas) < TAMANHO_PAGINA
+        self.tree.delete(*self.tree.get_children())
+        for linha in linhas:
+            self._inserir(tk.END, linha)
+        self._ajustar_vazio()
+        self._carregando = False
+        self.tree.yview_moveto(0)
+
+    def _ao_rolar(self, primeiro, ultimo):
+        self._barra.set(primeiro, ultimo)
+        if self._carregando or not self._linhas:
+            return
+        if float(ultimo) >= 1 - MARGEM_ROLAGEM and not self._fim:
+            self._carregar_pagina("depois")
+        elif float(primeiro) <= MARGEM_ROLAGEM and not self._inicio:
+            self._carregar_pagina("antes")
+
+    def _carregar_pagina(self, direcao):
+        self._carregando = True
+        geracao = self._geracao
+        cursor = self._linhas[-1]["chave"] if direcao == "depois" else self._linhas[0]["chave"]
+        self.executor.executar(
+            self._buscar_pagina, **self._parametros(), cursor=cursor, direcao=direcao, limite=TAMANHO_PAGINA,
+            ao_concluir=lambda linhas: self._receber_pagina(geracao, direcao, linhas),
+            ao_falhar=lambda erro: self._falhou(geracao, erro),
+        )
+
+    def _receber_pagina(self, geracao, direcao, linhas):
+        if geracao != self._geracao:
+            return
+        topo = self._item_no_topo()
+        completa = len(linhas) == TAMANHO_PAGINA
+        # Uma diferença aplicada enquanto a página vinha pode já ter inserido alguma destas
+        linhas = [linha for linha in linhas if linha["id"] not in self._por_id]
+        self._por_id.update((linha["id"], linha) for linha in linhas)
+        if direcao == "depois":
+            self._fim = not completa
+            self._linhas.extend(linhas)
+            excesso = max(len(self._linhas) - MAX_LINHAS, 0)
+            descartadas, self._linhas = self._linhas[:excesso], self._linhas[excesso:]
+            if excesso:
+                self._inicio = False
+            for linha in linhas:
+                self._inserir(tk.END, linha)
+        else:
+            self._inicio = not completa
+            self._linhas[:0] = linhas
+            excesso = max(len(self._linhas) - MAX_LINHAS, 0)
+            descartadas, self._linhas = self._linhas[len(self._linhas) - excesso:], self._linhas[:len(self._linhas) - excesso]
+            if excesso:
+                self._fim = False
+            for posicao, linha in enumerate(linhas):
+                self._inserir(posicao, linha)
+        if descartadas:
+            for linha in descartadas:
+                del self._por_id[linha["id"]]
+            self.tree.delete(*[str(linha["id"]) for linha in descartadas])
+        self._carregando = False
+        self._restaurar_topo(topo)
+
+    def _falhou(self, geracao, erro):
+        if geracao == self._geracao:
+            self._carregando = False
+        messagebox.showerror("Erro", f"Falha ao carregar a lista: {erro}")
+
+    # --- Interno: diferença ---
+
+    def _aplicar_diferenca(self, geracao, token, alterados, removidos, linhas):
+        if geracao != self._geracao:
+            return  # A lista foi recarregada enquanto isso: a recarga já trouxe tudo
+        self._token = max(token, self._token)
+        novas = {linha["id"]: linha for linha in linhas}
+        # Saem: as removidas e as alteradas que não passam mais no filtro
+        for registro_id in (*removidos, *alterados):
+            if registro_id not in novas:
+                self._remover(registro_id)
+        for linha in novas.values():
+            atual = self._por_id.get(linha["id"])
+            if atual is not None and atual["chave"] == linha["chave"]:
+                self._substituir(atual, linha)  # Mesma posição: só reconfigura o item
+                continue
+            # Fora dos limites da janela (ex.: depois da última linha carregada) ela aparece ao rolar
+            if not self._na_janela(linha["chave"]):
+                self._remover(linha["id"])
+                continue
+            if atual is not None:
+                # Mudou a chave de ordenação: move o MESMO item (mantém seleção e foco)
+                del self._linhas[self._posicao(atual["chave"])]
+            posicao = self._posicao(linha["chave"])
+            self._linhas.insert(posicao, linha)
+            self._por_id[linha["id"]] = linha
+            if atual is not None:
+                self.tree.move(str(linha["id"]), '', posicao)
+                self._configurar(linha)
+            else:
+                self._inserir(posicao, linha)
+        self._ajustar_vazio()
+
+    def _antes(self, a, b):
+        return a > b if self.decrescente else a < b
+
+    def _posicao(self, chave):
+        """Índice em que 'chave' (valor de ordenação, id) entra na janela: busca binária."""
+        baixo, alto = 0, len(self._linhas)
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            if self._antes(self._linhas[meio]["chave"], chave):
+                baixo = meio + 1
+            else:
+                alto = meio
+        return baixo
+
+    def _na_janela(self, chave):
+        if not self._inicio and (not self._linhas or self._antes(chave, self._linhas[0]["chave"])):
+            return False
+        if not self._fim and (not self._linhas or self._antes(self._linhas[-1]["chave"], chave)):
+            return False
+        return True
+
+    def _remover(self, registro_id):
+        linha = self._por_id.pop(registro_id, None)
+        if linha is None:
+            return
+        del self._linhas[self._posicao(linha["chave"])]
+        self.tree.delete(str(registro_id))
+
+    def _substituir(self, atual, linha):
+        self._linhas[self._posicao(atual["chave"])] = linha
+        self._por_id[linha["id"]] = linha
+        self._configurar(linha)
+
+    def _ajustar_vazio(self):
+        if self._linhas:
+            if self.tree.exists(ITEM_VAZIO):
+                self.tree.delete(ITEM_VAZIO)
+        elif not (self._inicio and self._fim):
+            # A janela inteira saiu, mas há linhas fora dela: volta ao início
+            self.recarregar()
+        elif not self.tree.exists(ITEM_VAZIO):
+            vazio = (self._texto_vazio,) + ('',) * (len(self._titulos) - 1)
+            self.tree.insert('', tk.END, iid=ITEM_VAZIO, values=vazio, tags=('empty',))
+
+    # --- Interno: widget ---
+
+    def _configurar(self, linha):
+        values, tags = self._formatar(linha)
+        self.tree.item(str(linha["id"]), values=values, tags=tags)
+
+    def _inserir(self, posicao, linha):
+        values, tags = self._formatar(linha)
+        self.tree.insert('', posicao, iid=str(linha["id"]), values=values, tags=tags)
+
+    def _item_no_topo(self):
+        filhos = self.tree.get_children()
+        if not filhos:
+            return None
+        indice = min(int(round(self.tree.yview()[0] * len(filhos))), len(filhos) - 1)
+        return filhos[indice]
+
+    def _restaurar_topo(self, iid):
+        # Inserir/remover linhas acima da área visível desloca a lista: devolve ao mesmo item
+        total = len(self.tree.get_children())
+        if iid is None or not total or not self.tree.exists(iid):
+            self.tree.yview_moveto(0)
+            return
+        self.tree.yview_moveto(self.tree.index(iid) / total)
 
 # --- Estrutura de Telas (Views) ---
 
 class FlowSchedulerApp(ttk.Window):
     """Classe principal da aplicação Desktop Flow Scheduler."""
     def __init__(self):
-        super().__init__(themename="cosmo") 
+        super().__init__(themename="cosmo")
         self.title("Flow Scheduler - Gestão de Carga de Trabalho")
-        
+
         # MAXIMIZAÇÃO (Tela expandida)
-        self.state('zoomed') 
-        
+        self.state('zoomed')
+
+        self.executor = ExecutorUI(self)
+        self.protocol("WM_DELETE_WINDOW", self.fechar)
+
+        # Barra de status: aparece enquanto há consulta/gravação em andamento no executor
+        self.status_frame = ttk.Frame(self)
+        self.status_frame.pack(side="bottom", fill="x")
+        self.status_label = ttk.Label(self.status_frame, text="", font=("Arial", 9))
+        self.status_label.pack(side=tk.LEFT, padx=10, pady=2)
+        self.progresso = ttk.Progressbar(self.status_frame, mode="indeterminate", length=120, bootstyle="info")
+        self.executor.ao_mudar_ocupado(self._mostrar_carregando)
+
         container = ttk.Frame(self)
         container.pack(fill="both", expand=True) # O container principal AINDA usa pack
         self.frames = {}
@@ -29,33 +329,99 @@ class FlowSchedulerApp(ttk.Window):
             frame = F(parent=container, controller=self)
             frame.grid(row=0, column=0, sticky="nsew")
             self.frames[page_name] = frame
-        
+
         self.show_frame("DashboardView")
 
     def show_frame(self, page_name):
         frame = self.frames[page_name]
         if page_name == "DashboardView":
-             frame.atualizar_preview() 
+             frame.atualizar_preview()
         frame.tkraise()
 
     def go_to_home(self):
         self.show_frame("DashboardView")
 
+    def _mostrar_carregando(self, ocupado):
+        if ocupado:
+            self.status_label.config(text="⏳ Carregando...")
+            self.progresso.pack(side=tk.LEFT, padx=5, pady=2)
+            self.progresso.start(15)
+        else:
+            self.progresso.stop()
+            self.progresso.pack_forget()
+            self.status_label.config(text="")
+
+    def fechar(self):
+        self.executor.encerrar()
+        self.destroy()
+
 class BaseView(ttk.Frame):
     """Classe base para todas as Views (Telas)."""
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
-        
+        self.executor = controller.executor
+
         # CORREÇÃO CRÍTICA: O botão agora usa GRID (Tiramos o pack)
         home_button = ttk.Button(self, text="<< Dashboard Principal", command=controller.go_to_home, bootstyle="secondary")
         home_button.grid(row=0, column=0, pady=10, padx=10, sticky="nw")
-        
+
         # Configuração do Grid para suportar o botão Home e o conteúdo abaixo
         self.grid_rowconfigure(0, weight=0) # Linha do botão Home (não expande)
         self.grid_rowconfigure(1, weight=1) # Linha do conteúdo principal (expande)
         self.grid_columnconfigure(0, weight=1) # Coluna de conteúdo expande
 
+    def gravar(self, funcao, *args, msg_sucesso, msg_erro, janela_form=None, botao=None):
+        """
+        Roda uma escrita do database.py no executor. Ao terminar mostra a mensagem,
+        atualiza a lista e fecha o formulário. O botão fica desabilitado enquanto grava
+        (evita gravar duas vezes com cliques repetidos).
+        """
+        if botao is not None:
+            botao.configure(state="disabled")
+
+        def concluido(sucesso):
+            aberta = janela_form is not None and janela_form.winfo_exists()
+            opcoes = {"parent": janela_form} if aberta else {}
+            if sucesso:
+                messagebox.showinfo("Sucesso", msg_sucesso, **opcoes)
+                self.atualizar_lista()
+                if aberta:
+                    janela_form.destroy()
+            else:
+                if botao is not None and botao.winfo_exists():
+                    botao.configure(state="normal")
+                messagebox.showerror("Erro", msg_erro, **opcoes)
+
+        self.executor.executar(funcao, *args, ao_concluir=concluido, ao_falhar=lambda erro: concluido(False))
+
+    def selecionado(self, aviso):
+        """Primeira linha selecionada na lista (dict) ou None, avisando o usuário."""
+        linhas = self.lista.selecionados()
+        if not linhas:
+            messagebox.showwarning("Atenção", aviso)
+            return None
+        return linhas[0]
+
+    def _criar_filtro(self, parent, ao_mudar):
+        """Campo de busca que só consulta o banco quando o usuário para de digitar (300 ms)."""
+        filtro_var = tk.StringVar(self)
+        agendado = []
+
+        def mudou(*_):
+            if agendado:
+                self.after_cancel(agendado.pop())
+            agendado.append(self.after(300, ao_mudar))
+
+        filtro_var.trace_add("write", mudou)
+        ttk.Label(parent, text="Buscar:").pack(side=tk.LEFT, padx=5)
+        ttk.Entry(parent, textvariable=filtro_var, width=30).pack(side=tk.LEFT, padx=5)
+        return filtro_var
+
+def _carregar_dashboard():
+    # Roda no executor: as duas consultas do painel em uma viagem só
+    return estatisticas_dashboard(), listar_proximas_tarefas()
+
 class DashboardView(BaseView):
     """Tela principal com opções de navegação e visualização de status."""
     def __init__(self, parent, controller):
@@ -63,7 +429,7 @@ class DashboardView(BaseView):
 
         # Usamos um Frame interno para o conteúdo principal (abaixo do botão Home)
         main_content_frame = ttk.Frame(self)
-        main_content_frame.grid(row=1, column=0, sticky="nsew", padx=20, pady=20) 
+        main_content_frame.grid(row=1, column=0, sticky="nsew", padx=20, pady=20)
 
         # Configuração do Grid interno para a Divisão (Navegação Col 0, Preview Col 1)
         main_content_frame.grid_rowconfigure(0, weight=1)
@@ -73,17 +439,17 @@ class DashboardView(BaseView):
         # --- Painel de Navegação (Coluna 0) ---
         nav_frame = ttk.Frame(main_content_frame)
         nav_frame.grid(row=0, column=0, padx=50, pady=50, sticky="nsew")
-        
-        # Centralizando os elementos dentro do nav_frame 
-        nav_frame.grid_rowconfigure(0, weight=1) 
-        nav_frame.grid_rowconfigure(4, weight=1) 
+
+        # Centralizando os elementos dentro do nav_frame
+        nav_frame.grid_rowconfigure(0, weight=1)
+        nav_frame.grid_rowconfigure(4, weight=1)
         nav_frame.grid_columnconfigure(0, weight=1)
 
         ttk.Label(nav_frame, text="DASHBOARD PRINCIPAL", font=("Arial", 24)).grid(row=1, column=0, pady=20)
-        
+
         ttk.Button(nav_frame, text="Gerenciar Empregados", bootstyle="primary",
                    command=lambda: controller.show_frame("EmpregadosView")).grid(row=2, column=0, pady=10, sticky="ew")
-        
+
         ttk.Button(nav_frame, text="Gerenciar Tarefas e Atribuições", bootstyle="primary",
                    command=lambda: controller.show_frame("TarefasView")).grid(row=3, column=0, pady=10, sticky="ew")
 
@@ -91,60 +457,100 @@ class DashboardView(BaseView):
         self.preview_frame = ttk.Frame(main_content_frame, bootstyle="info", width=350)
         self.preview_frame.grid(row=0, column=1, padx=50, pady=50, sticky="nsew")
         self.preview_frame.grid_columnconfigure(0, weight=1)
-        
+
         ttk.Label(self.preview_frame, text="🚨 PRÓXIMAS TAREFAS PENDENTES 🚨", font=("Arial", 14), bootstyle="inverse-info").grid(row=0, column=0, sticky="ew", pady=(10, 5), padx=5)
-        
+
+        # Totais calculados no banco (GROUP BY), sem carregar a lista de tarefas
+        self.resumo_label = ttk.Label(self.preview_frame, text="Carregando...", font=("Arial", 10))
+        self.resumo_label.grid(row=1, column=0, sticky="w", padx=5, pady=(0, 5))
+
         self.lista_urgente = ttk.Frame(self.preview_frame)
-        self.lista_urgente.grid(row=1, column=0, sticky="nsew", padx=5, pady=5)
+        self.lista_urgente.grid(row=2, column=0, sticky="nsew", padx=5, pady=5)
+
+        # Os widgets da lista são criados uma vez e só reconfigurados a cada atualização
+        # (nada de destruir/recriar Labels toda vez que o usuário volta ao Dashboard)
+        self.cabecalhos = [
+            ttk.Label(self.lista_urgente, text=texto, font=("Arial", 10, "bold"))
+            for texto in ("Prazo", "Tarefa", "Responsável")
+        ]
+        self.sem_tarefas_label = ttk.Label(self.lista_urgente, text="🎉 Nenhuma tarefa urgente encontrada!")
+        self.linhas_urgentes = []  # [(prazo, titulo, responsavel)] por linha, criadas sob demanda
 
     def atualizar_preview(self):
-        """Busca as tarefas urgentes e as exibe no painel lateral."""
-        
-        for widget in self.lista_urgente.winfo_children():
-            widget.destroy()
-            
-        tarefas = listar_proximas_tarefas()
-        
-        if not tarefas:
-            ttk.Label(self.lista_urgente, text="🎉 Nenhuma tarefa urgente encontrada!").pack(pady=20)
-            return
+        """Busca as tarefas urgentes (em segundo plano) e as exibe no painel lateral."""
+        # Voltar várias vezes ao Dashboard seguidas gera no máximo uma consulta extra
+        self.executor.executar(_carregar_dashboard, ao_concluir=self._mostrar_preview, chave="dashboard")
 
-        # Cabeçalhos
-        ttk.Label(self.lista_urgente, text="Prazo", font=("Arial", 10, "bold")).grid(row=0, column=0, padx=5, sticky="w")
-        ttk.Label(self.lista_urgente, text="Tarefa", font=("Arial", 10, "bold")).grid(row=0, column=1, padx=5, sticky="w")
-        ttk.Label(self.lista_urgente, text="Responsável", font=("Arial", 10, "bold")).grid(row=0, column=2, padx=5, sticky="w")
+    def _mostrar_preview(self, dados):
+        resumo, tarefas = dados
+
+        self.resumo_label.config(
+            text=f"Pendentes: {resumo['pendentes']}  |  Atrasadas: {resumo['atrasadas']}  |  "
+                 f"Vencem esta semana: {resumo['vencem_esta_semana']}  |  Concluídas: {resumo['concluidas']}"
+        )
 
-        # Exibe as tarefas
-        for i, t in enumerate(tarefas, start=1):
+        if not tarefas:
+            for label in self.cabecalhos:
+                label.grid_remove()
+            self.sem_tarefas_label.grid(row=0, column=0, columnspan=3, pady=20)
+        else:
+            self.sem_tarefas_label.grid_remove()
+            # Cabeçalhos
+            for coluna, label in enumerate(self.cabecalhos):
+                label.grid(row=0, column=coluna, padx=5, sticky="w")
+
+        # Cria só as linhas que ainda não existem
+        while len(self.linhas_urgentes) < len(tarefas):
+            i = len(self.linhas_urgentes) + 1
+            linha = tuple(ttk.Label(self.lista_urgente, font=("Arial", 9)) for _ in range(3))
+            for coluna, label in enumerate(linha):
+                label.grid(row=i, column=coluna, padx=5, pady=2, sticky="w")
+            self.linhas_urgentes.append(linha)
+
+        # Exibe as tarefas (reconfigurando os Labels existentes) e esconde as linhas que sobraram
+        for i, (prazo_label, titulo_label, responsavel_label) in enumerate(self.linhas_urgentes, start=1):
+            if i > len(tarefas):
+                for label in (prazo_label, titulo_label, responsavel_label):
+                    label.grid_remove()
+                continue
+            t = tarefas[i - 1]
             cor = "danger" if i == 1 else "warning" if i == 2 else "light"
-            
-            ttk.Label(self.lista_urgente, text=t.prazo, font=("Arial", 9), bootstyle=cor).grid(row=i, column=0, padx=5, pady=2, sticky="w")
-            ttk.Label(self.lista_urgente, text=t.titulo, font=("Arial", 9)).grid(row=i, column=1, padx=5, pady=2, sticky="w")
-            ttk.Label(self.lista_urgente, text=t.empregado_nome or "N/A", font=("Arial", 9)).grid(row=i, column=2, padx=5, pady=2, sticky="w")
+
+            prazo_label.configure(text=t.prazo, bootstyle=cor)
+            titulo_label.configure(text=t.titulo)
+            responsavel_label.configure(text=t.empregado_nome or "N/A")
+            for label in (prazo_label, titulo_label, responsavel_label):
+                label.grid()
 
 # --- EmpregadosView ---
+def _formatar_empregado(e):
+    return (e["id"], e["nome"], e["cargo"], e["email"]), ()
+
 class EmpregadosView(BaseView):
     """Tela para CRUD de Empregados."""
     def __init__(self, parent, controller):
         super().__init__(parent, controller)
-        
+
         # Usamos um Frame interno (content_frame) para usar .pack() sem conflito com o Grid da BaseView
         content_frame = ttk.Frame(self)
-        content_frame.grid(row=1, column=0, sticky="nsew") 
-        
+        content_frame.grid(row=1, column=0, sticky="nsew")
+
         ttk.Label(content_frame, text="GERENCIAMENTO DE EMPREGADOS", font=("Arial", 18)).pack(pady=10)
 
-        colunas = ('id', 'nome', 'cargo', 'email')
-        self.tree = ttk.Treeview(content_frame, columns=colunas, show='headings', bootstyle="info") 
-        self.tree.heading('id', text='ID', anchor=tk.W)
-        self.tree.heading('nome', text='Nome')
-        self.tree.heading('cargo', text='Cargo')
-        self.tree.heading('email', text='Email')
+        filtro_frame = ttk.Frame(content_frame)
+        filtro_frame.pack(padx=10, fill="x")
+        self.filtro_var = self._criar_filtro(filtro_frame, self._aplicar_filtro)
+
+        colunas = (('id', 'ID'), ('nome', 'Nome'), ('cargo', 'Cargo'), ('email', 'Email'))
+        self.lista = ListaVirtual(content_frame, self.executor, "lista_empregados", pagina_empregados_desktop,
+                                  alteracoes_empregados_desktop, colunas, _formatar_empregado, "Nenhum empregado cadastrado.", bootstyle="info")
+        self.tree = self.lista.tree
+        self.tree.heading('id', anchor=tk.W)
         self.tree.column('id', width=40, anchor=tk.CENTER)
         self.tree.column('nome', width=200)
         self.tree.column('cargo', width=150)
         self.tree.column('email', width=200)
-        self.tree.pack(pady=10, padx=10, fill="both", expand=True)
+        self.lista.pack(pady=10, padx=10, fill="both", expand=True)
 
         button_frame = ttk.Frame(content_frame)
         button_frame.pack(pady=10)
@@ -154,35 +560,29 @@ class EmpregadosView(BaseView):
                    command=self.abrir_formulario_edicao).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Excluir Selecionado", bootstyle="danger",
                    command=self.deletar_empregado).pack(side=tk.LEFT, padx=5)
-        
-        self.atualizar_lista()
+
+        self.lista.recarregar()
 
     # ... (Restante dos métodos da EmpregadosView) ...
     def atualizar_lista(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        empregados = listar_empregados()
-        
-        if not empregados:
-            self.tree.insert('', tk.END, values=('Nenhum empregado cadastrado.', '', '', ''), tags=('empty',))
-        else:
-            for e in empregados:
-                self.tree.insert('', tk.END, values=(e.id, e.nome, e.cargo, e.email))
-    
+        self.lista.atualizar()
+
+    def _aplicar_filtro(self):
+        self.lista.filtrar(filtro=self.filtro_var.get().strip())
+
     def abrir_formulario_adicionar(self):
         janela_form = tk.Toplevel(self)
         janela_form.title("Adicionar Empregado")
         janela_form.transient(self.controller)
-        
+
         ttk.Label(janela_form, text="Nome:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
         nome_entry = ttk.Entry(janela_form)
         nome_entry.grid(row=0, column=1, padx=5, pady=5)
-        
+
         ttk.Label(janela_form, text="Cargo:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
         cargo_entry = ttk.Entry(janela_form)
         cargo_entry.grid(row=1, column=1, padx=5, pady=5)
-        
+
         ttk.Label(janela_form, text="Email:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
         email_entry = ttk.Entry(janela_form)
         email_entry.grid(row=2, column=1, padx=5, pady=5)
@@ -191,117 +591,123 @@ class EmpregadosView(BaseView):
             nome = nome_entry.get()
             cargo = cargo_entry.get()
             email = email_entry.get()
-            
+
             if nome and cargo:
-                if adicionar_empregado(nome, cargo, email):
-                    messagebox.showinfo("Sucesso", "Empregado adicionado com sucesso!", parent=janela_form)
-                    self.atualizar_lista()
-                    janela_form.destroy()
-                else:
-                    messagebox.showerror("Erro", "Falha ao adicionar empregado no DB.", parent=janela_form)
+                self.gravar(adicionar_empregado, nome, cargo, email,
+                            msg_sucesso="Empregado adicionado com sucesso!",
+                            msg_erro="Falha ao adicionar empregado no DB.",
+                            janela_form=janela_form, botao=salvar)
             else:
                 messagebox.showwarning("Atenção", "Preencha Nome e Cargo.", parent=janela_form)
 
-        ttk.Button(janela_form, text="Salvar", command=submit, bootstyle="success").grid(row=3, column=0, columnspan=2, pady=15)
-    
-    def abrir_formulario_edicao(self):
-        selecao = self.tree.selection()
-        if not selecao:
-            messagebox.showwarning("Atenção", "Selecione um empregado para editar.")
-            return
-
-        item_selecionado = self.tree.item(selecao[0], 'values')
-        empregado_id = item_selecionado[0]
-        empregado = buscar_empregado_por_id(empregado_id)
+        salvar = ttk.Button(janela_form, text="Salvar", command=submit, bootstyle="success")
+        salvar.grid(row=3, column=0, columnspan=2, pady=15)
 
+    def abrir_formulario_edicao(self):
+        # A linha da lista já traz todos os campos do empregado: nada a buscar no banco
+        empregado = self.selecionado("Selecione um empregado para editar.")
         if not empregado:
-            messagebox.showerror("Erro", "Empregado não encontrado.")
             return
+        empregado_id = empregado["id"]
 
         janela_form = tk.Toplevel(self)
-        janela_form.title(f"Editar Empregado: {empregado.nome}")
+        janela_form.title(f"Editar Empregado: {empregado['nome']}")
         janela_form.transient(self.controller)
-        
+
         ttk.Label(janela_form, text="Nome:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
         nome_entry = ttk.Entry(janela_form)
-        nome_entry.insert(0, empregado.nome)
+        nome_entry.insert(0, empregado["nome"])
         nome_entry.grid(row=0, column=1, padx=5, pady=5)
-        
+
         ttk.Label(janela_form, text="Cargo:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
         cargo_entry = ttk.Entry(janela_form)
-        cargo_entry.insert(0, empregado.cargo)
+        cargo_entry.insert(0, empregado["cargo"])
         cargo_entry.grid(row=1, column=1, padx=5, pady=5)
 
         ttk.Label(janela_form, text="Email:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
         email_entry = ttk.Entry(janela_form)
-        email_entry.insert(0, empregado.email)
+        email_entry.insert(0, empregado["email"])
         email_entry.grid(row=2, column=1, padx=5, pady=5)
 
         def submit_edicao():
             novo_nome = nome_entry.get()
             novo_cargo = cargo_entry.get()
             novo_email = email_entry.get()
-            
+
             if novo_nome and novo_cargo:
-                if atualizar_empregado(empregado_id, novo_nome, novo_cargo, novo_email):
-                    messagebox.showinfo("Sucesso", "Empregado atualizado com sucesso!", parent=janela_form)
-                    self.atualizar_lista()
-                    janela_form.destroy()
-                else:
-                    messagebox.showerror("Erro", "Falha ao atualizar empregado no DB.", parent=janela_form)
+                self.gravar(atualizar_empregado, empregado_id, novo_nome, novo_cargo, novo_email,
+                            msg_sucesso="Empregado atualizado com sucesso!",
+                            msg_erro="Falha ao atualizar empregado no DB.",
+                            janela_form=janela_form, botao=salvar)
             else:
                 messagebox.showwarning("Atenção", "Preencha Nome e Cargo.", parent=janela_form)
 
-        ttk.Button(janela_form, text="Salvar Alterações", command=submit_edicao, bootstyle="warning").grid(row=3, column=0, columnspan=2, pady=15)
-        
+        salvar = ttk.Button(janela_form, text="Salvar Alterações", command=submit_edicao, bootstyle="warning")
+        salvar.grid(row=3, column=0, columnspan=2, pady=15)
+
     def deletar_empregado(self):
-        selecao = self.tree.selection()
-        if not selecao:
-            messagebox.showwarning("Atenção", "Selecione um empregado para deletar.")
+        empregado = self.selecionado("Selecione um empregado para deletar.")
+        if not empregado:
             return
-
-        item_selecionado = self.tree.item(selecao[0], 'values')
-        empregado_id = item_selecionado[0]
-        nome_empregado = item_selecionado[1]
+        empregado_id = empregado["id"]
+        nome_empregado = empregado["nome"]
 
         confirmar = messagebox.askyesno(
             "Confirmar Exclusão",
-            f"Tem certeza que deseja DELETAR o empregado: {nome_empregado} (ID: {empregado_id})?\nEsta ação é irreversível.",
+            f"Tem certeza que deseja DELETAR o empregado: {nome_empregado} (ID: {empregado_id})?\nAs tarefas dele ficarão sem responsável. Esta ação é irreversível.",
             icon='warning'
         )
-        
+
         if confirmar:
-            if deletar_empregado(empregado_id):
-                messagebox.showinfo("Sucesso", f"Empregado {nome_empregado} deletado com sucesso!")
-                self.atualizar_lista()
-            else:
-                messagebox.showerror("Erro", "Falha ao deletar empregado no DB.")
+            self.gravar(deletar_empregado, empregado_id,
+                        msg_sucesso=f"Empregado {nome_empregado} deletado com sucesso!",
+                        msg_erro="Falha ao deletar empregado no DB.")
 
 # --- TarefasView ---
+SITUACOES = {"Todas": "todas", "Pendentes": "pendentes", "Concluídas": "concluidas"}
+
+def _formatar_tarefa(t):
+    status = "✅ SIM" if t["concluida"] else "❌ NÃO"
+    valores = (t["id"], t["titulo"], t["prazo"] or "", t["empregado_nome"] or "Não Atribuído", status)
+    return valores, ('concluida' if t["concluida"] else 'pendente',)
+
+def _carregar_formulario_tarefa(tarefa_id):
+    # Roda no executor: empregados do combo + a tarefa em edição (se houver)
+    return listar_empregados(), (buscar_tarefa_por_id(tarefa_id) if tarefa_id is not None else None)
+
 class TarefasView(BaseView):
     """Tela para CRUD de Tarefas."""
     def __init__(self, parent, controller):
         super().__init__(parent, controller)
-        
+        self.empregados_dict = {}
+
         # Usamos um Frame interno (content_frame) para usar .pack() sem conflito com o Grid da BaseView
         content_frame = ttk.Frame(self)
         content_frame.grid(row=1, column=0, sticky="nsew") # Colocamos o conteúdo abaixo do botão Home
-        
+
         ttk.Label(content_frame, text="GERENCIAMENTO DE TAREFAS", font=("Arial", 18)).pack(pady=10)
 
-        colunas = ('id', 'titulo', 'prazo', 'empregado', 'concluida')
-        self.tree = ttk.Treeview(content_frame, columns=colunas, show='headings', bootstyle="info")
-        self.tree.heading('id', text='ID', anchor=tk.W)
-        self.tree.heading('titulo', text='Título')
-        self.tree.heading('prazo', text='Prazo')
-        self.tree.heading('empregado', text='Atribuído a')
-        self.tree.heading('concluida', text='Concluída')
+        filtro_frame = ttk.Frame(content_frame)
+        filtro_frame.pack(padx=10, fill="x")
+        self.filtro_var = self._criar_filtro(filtro_frame, self._aplicar_filtro)
+        ttk.Label(filtro_frame, text="Situação:").pack(side=tk.LEFT, padx=5)
+        self.situacao_combo = ttk.Combobox(filtro_frame, values=list(SITUACOES), state="readonly", width=12)
+        self.situacao_combo.set("Todas")
+        self.situacao_combo.bind("<<ComboboxSelected>>", lambda _: self._aplicar_filtro())
+        self.situacao_combo.pack(side=tk.LEFT, padx=5)
+
+        colunas = (('id', 'ID'), ('titulo', 'Título'), ('prazo', 'Prazo'), ('empregado', 'Atribuído a'), ('concluida', 'Concluída'))
+        self.lista = ListaVirtual(content_frame, self.executor, "lista_tarefas", pagina_tarefas_desktop,
+                                  alteracoes_tarefas_desktop, colunas, _formatar_tarefa, "Nenhuma tarefa cadastrada.",
+                                  selectmode="extended", bootstyle="info")  # Ctrl/Shift+clique: várias tarefas
+        self.tree = self.lista.tree
+        self.tree.heading('id', anchor=tk.W)
         self.tree.column('id', width=40, anchor=tk.CENTER)
         self.tree.column('titulo', width=250)
         self.tree.column('prazo', width=100, anchor=tk.CENTER)
         self.tree.column('empregado', width=150)
         self.tree.column('concluida', width=80, anchor=tk.CENTER)
-        self.tree.pack(pady=10, padx=10, fill="both", expand=True)
+        self.lista.pack(pady=10, padx=10, fill="both", expand=True)
 
         self.tree.tag_configure('concluida', background='#e0ffe0')
         self.tree.tag_configure('pendente', background='#ffdbdb')
@@ -316,46 +722,30 @@ class TarefasView(BaseView):
                    command=self.deletar_tarefa).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Marcar/Desmarcar Concluída", bootstyle="info",
                    command=self.toggle_concluida).pack(side=tk.LEFT, padx=5)
-        
-        self.atualizar_lista()
+
+        self.lista.recarregar()
 
     def atualizar_lista(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        tarefas = listar_tarefas()
-        
-        if not tarefas:
-            self.tree.insert('', tk.END, values=('Nenhuma tarefa cadastrada.', '', '', '', ''), tags=('empty',))
-        else:
-            for t in tarefas:
-                # Nota: A TarefasView depende que a função listar_tarefas() no database.py retorne 'empregado_nome'.
-                # Assumindo que database.py foi corrigido para buscar o nome do empregado (como no listar_proximas_tarefas).
-                empregado_nome = getattr(t, 'empregado_nome', 'Não Atribuído') if t.empregado_id else "Não Atribuído"
-                status = "✅ SIM" if t.concluida else "❌ NÃO"
-                
-                self.tree.insert('', tk.END, 
-                                 values=(t.id, t.titulo, t.prazo, empregado_nome, status),
-                                 tags=('concluida' if t.concluida else 'pendente',)
-                                )
-
-    def _carregar_empregados_para_combo(self):
-        empregados = listar_empregados()
-        self.empregados_dict = {f"{e.nome} ({e.cargo})": e.id for e in empregados}
-        empregado_nomes = ["Não Atribuído"] + list(self.empregados_dict.keys())
-        return empregado_nomes
+        self.lista.atualizar()
+
+    def _aplicar_filtro(self):
+        self.lista.filtrar(filtro=self.filtro_var.get().strip(),
+                           situacao=SITUACOES[self.situacao_combo.get()])
 
     def _criar_formulario_tarefa(self, janela_pai, tarefa_item=None):
+        """
+        Monta o formulário na hora e preenche quando o executor trouxer os empregados (e a
+        tarefa, na edição). Até lá 'janela_form.carregado' é False e o Salvar só avisa.
+        """
         janela_form = tk.Toplevel(janela_pai)
         janela_form.title("Editar Tarefa" if tarefa_item else "Adicionar Tarefa")
         janela_form.transient(self.controller)
-        
-        opcoes_empregados = self._carregar_empregados_para_combo()
+        janela_form.carregado = False
 
         ttk.Label(janela_form, text="Título:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
         titulo_entry = ttk.Entry(janela_form, width=40)
         titulo_entry.grid(row=0, column=1, padx=5, pady=5)
-        
+
         ttk.Label(janela_form, text="Descrição:").grid(row=1, column=0, padx=5, pady=5, sticky="w")
         descricao_entry = tk.Text(janela_form, height=4, width=30)
         descricao_entry.grid(row=1, column=1, padx=5, pady=5)
@@ -366,138 +756,140 @@ class TarefasView(BaseView):
 
         ttk.Label(janela_form, text="Atribuir a:").grid(row=3, column=0, padx=5, pady=5, sticky="w")
         empregado_var = tk.StringVar(janela_form)
-        empregado_combo = ttk.Combobox(janela_form, textvariable=empregado_var, values=opcoes_empregados, state="readonly")
+        empregado_combo = ttk.Combobox(janela_form, textvariable=empregado_var, values=[], state="disabled")
         empregado_combo.grid(row=3, column=1, padx=5, pady=5)
-        empregado_combo.set("Não Atribuído")
+        empregado_combo.set("Carregando...")
 
         concluida_var = tk.BooleanVar(janela_form)
-        
-        if tarefa_item:
-            tarefa_id = tarefa_item[0]
-            tarefa_completa = buscar_tarefa_por_id(tarefa_id) 
 
+        if tarefa_item:
             ttk.Label(janela_form, text="Concluída:").grid(row=4, column=0, padx=5, pady=5, sticky="w")
             concluida_check = ttk.Checkbutton(janela_form, variable=concluida_var, bootstyle="round-toggle")
             concluida_check.grid(row=4, column=1, padx=5, pady=5, sticky="w")
 
-            titulo_entry.insert(0, tarefa_completa.titulo)
-            descricao_entry.insert('1.0', tarefa_completa.descricao)
-            prazo_entry.insert(0, tarefa_completa.prazo)
-            concluida_var.set(tarefa_completa.concluida)
-            
-            if tarefa_completa.empregado_id:
-                nome_completo = next((nome for nome, id_val in self.empregados_dict.items() if id_val == tarefa_completa.empregado_id), "Não Atribuído")
-                empregado_combo.set(nome_completo)
-            
+        def preencher(dados):
+            if not janela_form.winfo_exists():
+                return  # Formulário fechado antes da resposta
+            empregados, tarefa_completa = dados
+            self.empregados_dict = {f"{e.nome} ({e.cargo})": e.id for e in empregados}
+            empregado_combo.configure(values=["Não Atribuído"] + list(self.empregados_dict.keys()), state="readonly")
+            empregado_combo.set("Não Atribuído")
+
+            if tarefa_item:
+                if tarefa_completa is None:
+                    messagebox.showerror("Erro", "Tarefa não encontrada no banco de dados.", parent=janela_form)
+                    janela_form.destroy()
+                    return
+                titulo_entry.insert(0, tarefa_completa.titulo)
+                descricao_entry.insert('1.0', tarefa_completa.descricao or "")
+                prazo_entry.insert(0, tarefa_completa.prazo or "")
+                concluida_var.set(tarefa_completa.concluida)
+
+                if tarefa_completa.empregado_id:
+                    nome_completo = next((nome for nome, id_val in self.empregados_dict.items() if id_val == tarefa_completa.empregado_id), "Não Atribuído")
+                    empregado_combo.set(nome_completo)
+            janela_form.carregado = True
+
+        def falhou(erro):
+            if janela_form.winfo_exists():
+                messagebox.showerror("Erro", f"Falha ao carregar o formulário: {erro}", parent=janela_form)
+                janela_form.destroy()
+
+        self.executor.executar(_carregar_formulario_tarefa, tarefa_item["id"] if tarefa_item else None,
+                               ao_concluir=preencher, ao_falhar=falhou)
+
         return janela_form, titulo_entry, descricao_entry, prazo_entry, empregado_var, concluida_var
-    
+
     def abrir_formulario_adicionar(self):
         janela_form, titulo_entry, descricao_entry, prazo_entry, empregado_var, _ = self._criar_formulario_tarefa(self)
-        
+
         def submit():
+            if not janela_form.carregado:
+                messagebox.showwarning("Atenção", "Aguarde o carregamento do formulário.", parent=janela_form)
+                return
             titulo = titulo_entry.get()
             descricao = descricao_entry.get('1.0', tk.END).strip()
             prazo = prazo_entry.get()
             nome_selecionado = empregado_var.get()
-            empregado_id = self.empregados_dict.get(nome_selecionado, None) 
-            
+            empregado_id = self.empregados_dict.get(nome_selecionado, None)
+
             if titulo and prazo:
-                if adicionar_tarefa(titulo, descricao, prazo, empregado_id):
-                    messagebox.showinfo("Sucesso", "Tarefa adicionada com sucesso!", parent=janela_form)
-                    self.atualizar_lista()
-                    janela_form.destroy()
-                else:
-                    messagebox.showerror("Erro", "Falha ao adicionar tarefa no DB.", parent=janela_form)
+                self.gravar(adicionar_tarefa, titulo, descricao, prazo, empregado_id,
+                            msg_sucesso="Tarefa adicionada com sucesso!",
+                            msg_erro="Falha ao adicionar tarefa no DB.",
+                            janela_form=janela_form, botao=salvar)
             else:
                 messagebox.showwarning("Atenção", "Preencha Título e Prazo.", parent=janela_form)
 
         # CORREÇÃO CRÍTICA: O botão agora está na indentação correta
-        ttk.Button(janela_form, text="Salvar Tarefa", command=submit, bootstyle="success").grid(row=5, column=0, columnspan=2, pady=15)
+        salvar = ttk.Button(janela_form, text="Salvar Tarefa", command=submit, bootstyle="success")
+        salvar.grid(row=5, column=0, columnspan=2, pady=15)
 
     def abrir_formulario_edicao(self):
-        selecao = self.tree.selection()
-        if not selecao:
-            messagebox.showwarning("Atenção", "Selecione uma tarefa para editar.")
+        tarefa = self.selecionado("Selecione uma tarefa para editar.")
+        if not tarefa:
             return
+        tarefa_id = tarefa["id"]
+
+        janela_form, titulo_entry, descricao_entry, prazo_entry, empregado_var, concluida_var = self._criar_formulario_tarefa(self, tarefa_item=tarefa)
 
-        item_selecionado = self.tree.item(selecao[0], 'values')
-        tarefa_id = item_selecionado[0]
-        
-        janela_form, titulo_entry, descricao_entry, prazo_entry, empregado_var, concluida_var = self._criar_formulario_tarefa(self, tarefa_item=item_selecionado)
-        
         def submit_edicao():
+            if not janela_form.carregado:
+                messagebox.showwarning("Atenção", "Aguarde o carregamento do formulário.", parent=janela_form)
+                return
             titulo = titulo_entry.get()
             descricao = descricao_entry.get('1.0', tk.END).strip()
             prazo = prazo_entry.get()
             nome_selecionado = empregado_var.get()
-            empregado_id = self.empregados_dict.get(nome_selecionado, None) 
+            empregado_id = self.empregados_dict.get(nome_selecionado, None)
             concluida = concluida_var.get()
 
             if titulo and prazo:
-                if atualizar_tarefa(tarefa_id, titulo, descricao, prazo, empregado_id, concluida):
-                    messagebox.showinfo("Sucesso", "Tarefa atualizada com sucesso!", parent=janela_form)
-                    self.atualizar_lista()
-                    janela_form.destroy()
-                else:
-                    messagebox.showerror("Erro", "Falha ao atualizar tarefa no DB.", parent=janela_form)
+                self.gravar(atualizar_tarefa, tarefa_id, titulo, descricao, prazo, empregado_id, concluida,
+                            msg_sucesso="Tarefa atualizada com sucesso!",
+                            msg_erro="Falha ao atualizar tarefa no DB.",
+                            janela_form=janela_form, botao=salvar)
             else:
                 messagebox.showwarning("Atenção", "Preencha Título e Prazo.", parent=janela_form)
 
-        ttk.Button(janela_form, text="Salvar Alterações", command=submit_edicao, bootstyle="warning").grid(row=5, column=0, columnspan=2, pady=15)
+        salvar = ttk.Button(janela_form, text="Salvar Alterações", command=submit_edicao, bootstyle="warning")
+        salvar.grid(row=5, column=0, columnspan=2, pady=15)
 
     def deletar_tarefa(self):
-        selecao = self.tree.selection()
-        if not selecao:
-            messagebox.showwarning("Atenção", "Selecione uma tarefa para deletar.")
+        # Todas as selecionadas, numa só transação (DELETE ... WHERE id IN)
+        tarefas = self.lista.selecionados()
+        if not tarefas:
+            messagebox.showwarning("Atenção", "Selecione uma ou mais tarefas para deletar.")
             return
+        if len(tarefas) == 1:
+            pergunta = f"Tem certeza que deseja DELETAR a tarefa: {tarefas[0]['titulo']} (ID: {tarefas[0]['id']})?"
+        else:
+            pergunta = f"Tem certeza que deseja DELETAR as {len(tarefas)} tarefas selecionadas?"
 
-        item_selecionado = self.tree.item(selecao[0], 'values')
-        tarefa_id = item_selecionado[0]
-        titulo_tarefa = item_selecionado[1]
+        if messagebox.askyesno("Confirmar Exclusão", pergunta, icon='warning'):
+            self.gravar(operar_tarefas_em_lote, "deletar", [t["id"] for t in tarefas],
+                        msg_sucesso=f"{len(tarefas)} tarefa(s) deletada(s) com sucesso!",
+                        msg_erro="Falha ao deletar tarefas no DB.")
 
-        confirmar = messagebox.askyesno(
-            "Confirmar Exclusão",
-            f"Tem certeza que deseja DELETAR a tarefa: {titulo_tarefa} (ID: {tarefa_id})?",
-            icon='warning'
-        )
-        
-        if confirmar:
-            if deletar_tarefa(tarefa_id):
-                messagebox.showinfo("Sucesso", f"Tarefa {titulo_tarefa} deletada com sucesso!")
-                self.atualizar_lista()
-            else:
-                messagebox.showerror("Erro", "Falha ao deletar tarefa no DB.")
-                
     def toggle_concluida(self):
-        selecao = self.tree.selection()
-        if not selecao:
-            messagebox.showwarning("Atenção", "Selecione uma tarefa para alterar o status.")
+        tarefas = self.lista.selecionados()
+        if not tarefas:
+            messagebox.showwarning("Atenção", "Selecione uma ou mais tarefas para alterar o status.")
             return
+        # Alguma pendente na seleção: conclui todas; senão reabre todas
+        concluir = any(not t["concluida"] for t in tarefas)
 
-        item_selecionado = self.tree.item(selecao[0], 'values')
-        tarefa_id = item_selecionado[0]
-        status_atual_texto = item_selecionado[4] 
-        novo_status = True if status_atual_texto == "❌ NÃO" else False
-
-        tarefa_completa = buscar_tarefa_por_id(tarefa_id)
-
-        if tarefa_completa:
-            if atualizar_tarefa(
-                tarefa_id, 
-                tarefa_completa.titulo, 
-                tarefa_completa.descricao, 
-                tarefa_completa.prazo, 
-                tarefa_completa.empregado_id, 
-                novo_status
-            ):
-                messagebox.showinfo("Sucesso", f"Status de '{tarefa_completa.titulo}' alterado para {'CONCLUÍDA' if novo_status else 'PENDENTE'}.")
-                self.atualizar_lista()
-            else:
-                messagebox.showerror("Erro", "Falha ao alterar status da tarefa.")
-        else:
-            messagebox.showerror("Erro", "Tarefa não encontrada no banco de dados.")
+        self.gravar(operar_tarefas_em_lote, "concluir" if concluir else "reabrir", [t["id"] for t in tarefas],
+                    msg_sucesso=f"{len(tarefas)} tarefa(s) marcada(s) como {'CONCLUÍDA' if concluir else 'PENDENTE'}.",
+                    msg_erro="Falha ao alterar status das tarefas.")
 
 # --- Execução da Aplicação ---
 if __name__ == "__main__":
+    # Banco criado por uma versão anterior: aplica as migrações antes da primeira consulta.
+    # Com o schema em dia custa um SELECT (migracoes.preparar_banco)
+    from database import engine
+    from migracoes import preparar_banco
+    preparar_banco(engine)
+
     app = FlowSchedulerApp()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
@@ -0,0 +1,153 @@
+# arquivo.py
+# Arquivamento das tarefas concluídas: separa o histórico (frio) das tarefas em uso (quentes).
+#
+# Tarefas concluídas há mais de ARQUIVO_DIAS dias (pela última escrita, atualizado_em) saem de
+# 'tarefas' e vão para 'tarefas_arquivo'. Assim listagens, painel, estatísticas e joins leem
+# uma tabela que só cresce com o trabalho em andamento e cabe no cache do banco.
+#
+# Cada lote (no máximo TAMANHO_LOTE_ARQUIVO tarefas) é uma transação curta: copia para o arquivo,
+# apaga de 'tarefas' e deixa as lápides (o cliente tira as tarefas da cópia local pelo GET /changes).
+# Os triggers da busca textual tiram as tarefas do índice junto com o DELETE. Tarefas concluídas
+# não contam na carga dos empregados: o contador tarefas_abertas não muda.
+#
+# Roda sozinho na API a cada ARQUIVO_INTERVALO_MIN minutos (main.py) ou pela linha de comando:
+#   python arquivo.py                 -> arquiva tudo o que já passou da idade
+#   python arquivo.py --dias 30       -> outra idade mínima
+#   python arquivo.py --simular       -> só conta quantas seriam arquivadas
+import os
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from database import abrir_escrita, agora_utc, codificar_cursor, decodificar_cursor, proxima_versao
+from models import Remocao, Tarefa, TarefaArquivada
+
+ARQUIVO_DIAS = int(os.environ.get("ARQUIVO_DIAS", "90"))
+TAMANHO_LOTE_ARQUIVO = int(os.environ.get("ARQUIVO_LOTE", "1000"))
+# Pausa entre lotes: as escritas da API entram entre um lote e outro
+PAUSA_ENTRE_LOTES_S = 0.05
+
+# Colunas devolvidas pela consulta ao arquivo (TarefaArquivadaSchema)
+COLUNAS_API_ARQUIVO = (
+    TarefaArquivada.tarefa_id.label("id"), TarefaArquivada.titulo, TarefaArquivada.descricao,
+    TarefaArquivada.prazo, TarefaArquivada.empregado_id, TarefaArquivada.esforco_horas,
+    TarefaArquivada.concluida_em, TarefaArquivada.arquivada_em, TarefaArquivada.id.label("arquivo_id"),
+)
+
+
+# --- ARQUIVAMENTO ---
+
+def _candidatas(limite_data, quantidade: int) -> Select:
+    """
+    Concluídas sem escrita desde limite_data. Sem data (linhas de antes da migração 2) a idade
+    é desconhecida: não são arquivadas (a migração 6 dá a elas a data da atualização).
+    """
+    return (
+        select(Tarefa.id)
+        .where(Tarefa.concluida == True, Tarefa.atualizado_em < limite_data)
+        .order_by(Tarefa.id)
+        .limit(quantidade)
+    )
+
+
+def _arquivar_lote(db_session: Session, limite_data, quantidade: int) -> List[int]:
+    """Move um lote para o arquivo, numa transação. Retorna os ids movidos (vazio = acabou)."""
+    conn = db_session.connection()
+    # As candidatas ficam travadas até o commit (FOR UPDATE no PostgreSQL, pulando as que uma
+    # escrita da API está usando; BEGIN IMMEDIATE no SQLite): ninguém as reabre entre a cópia
+    # e o DELETE. As condições são repetidas mesmo assim.
+    abrir_escrita(conn)
+    ids = conn.execute(_candidatas(limite_data, quantidade).with_for_update(skip_locked=True)).scalars().all()
+    if not ids:
+        db_session.rollback()
+        return []
+    agora = agora_utc()
+    condicao = (Tarefa.id.in_(ids), Tarefa.concluida == True, Tarefa.atualizado_em < limite_data)
+    conn.execute(insert(TarefaArquivada).from_select(
+        ["tarefa_id", "titulo", "descricao", "prazo", "esforco_horas", "empregado_id", "concluida_em", "arquivada_em"],
+        select(Tarefa.id, Tarefa.titulo, Tarefa.descricao, Tarefa.prazo, Tarefa.esforco_horas,
+               Tarefa.empregado_id, Tarefa.atualizado_em, literal(agora, TarefaArquivada.arquivada_em.type)).where(*condicao),
+    ))
+    movidas = conn.execute(Tarefa.__table__.delete().where(*condicao).returning(Tarefa.id)).scalars().all()
+    if movidas:
+        # A versão só é reservada para as lápides, a última escrita antes do commit
+        versao = proxima_versao(conn)
+        conn.execute(insert(Remocao), [{"tabela": "tarefas", "registro_id": i, "versao": versao} for i in movidas])
+    db_session.commit()
+    return movidas
+
+
+def arquivar_concluidas(db_session: Session, dias: int = ARQUIVO_DIAS, lote: int = TAMANHO_LOTE_ARQUIVO,
+                        max_lotes: Optional[int] = None, simular: bool = False) -> Dict:
+    """
+    Arquiva as tarefas concluídas há mais de 'dias' dias, lote a lote. Com max_lotes, para
+    depois desse número de lotes (o resto fica para a próxima rodada). Com simular=True só conta.
+    Quem chama avisa os workers (versoes.incrementar("tarefas")) se 'arquivadas' > 0.
+    """
+    inicio = time.perf_counter()
+    limite_data = agora_utc() - timedelta(days=dias)
+    if simular:
+        total = db_session.execute(select(func.count()).select_from(_candidatas(limite_data, 2 ** 31).subquery())).scalar()
+        return {"simulacao": True, "arquivadas": total, "dias": dias}
+
+    arquivadas, lotes = 0, 0
+    while max_lotes is None or lotes < max_lotes:
+        movidas = _arquivar_lote(db_session, limite_data, lote)
+        arquivadas += len(movidas)
+        lotes += 1
+        if len(movidas) < lote:
+            break
+        time.sleep(PAUSA_ENTRE_LOTES_S)
+    return {"simulacao": False, "arquivadas": arquivadas, "lotes": lotes, "dias": dias,
+            "segundos": round(time.perf_counter() - inicio, 3)}
+
+
+# --- CONSULTA ---
+
+def consulta_arquivo(limite: int = 100, cursor: Optional[str] = None, empregado_id: Optional[int] = None,
+                     prazo_de: Optional[date] = None, prazo_ate: Optional[date] = None) -> Select:
+    """Uma página do arquivo, na ordem de arquivamento (cursor = arquivo_id). Busca limite + 1 linhas."""
+    stmt = select(*COLUNAS_API_ARQUIVO)
+    if empregado_id is not None:
+        stmt = stmt.where(TarefaArquivada.empregado_id == empregado_id)
+    if prazo_de is not None:
+        stmt = stmt.where(TarefaArquivada.prazo >= prazo_de)
+    if prazo_ate is not None:
+        stmt = stmt.where(TarefaArquivada.prazo <= prazo_ate)
+    if cursor:
+        stmt = stmt.where(TarefaArquivada.id > decodificar_cursor(cursor)["id"])
+    return stmt.order_by(TarefaArquivada.id.asc()).limit(limite + 1)
+
+
+def listar_arquivo(db_session: Session, limite: int = 100, cursor: Optional[str] = None, **filtros) -> Tuple[list, Optional[str]]:
+    """(linhas, próximo cursor ou None)."""
+    linhas = db_session.execute(consulta_arquivo(limite, cursor, **filtros)).all()
+    if len(linhas) <= limite:
+        return linhas, None
+    linhas = linhas[:limite]
+    return linhas, codificar_cursor({"id": linhas[-1].arquivo_id})
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import versoes
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Arquiva as tarefas concluídas antigas.")
+    parser.add_argument("--dias", type=int, default=ARQUIVO_DIAS, help="idade mínima (dias desde a última escrita)")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_ARQUIVO, help="tarefas por transação")
+    parser.add_argument("--simular", action="store_true", help="só conta, não move nada")
+    args = parser.parse_args()
+
+    with SessionLocal() as sessao:
+        resultado = arquivar_concluidas(sessao, dias=args.dias, lote=args.lote, simular=args.simular)
+    if args.simular:
+        print(f"{resultado['arquivadas']} tarefa(s) concluída(s) há mais de {args.dias} dias seriam arquivadas.")
+    else:
+        if resultado["arquivadas"]:
+            versoes.incrementar("tarefas")
+        print(f"📦 {resultado['arquivadas']} tarefa(s) arquivada(s) em {resultado['lotes']} lote(s), {resultado['segundos']}s.")
@@ -0,0 +1,631 @@
+# benchmark.py
+# Carga reproduzível da API: semeia empregados/tarefas em várias escalas e dispara todas as
+# rotas do main.py com clientes concorrentes, medindo p50/p95/p99, vazão e pico de memória.
+# Antes das rotas, mede CPU e memória para serializar 10 mil tarefas (medir_serializacao).
+#
+# Cada escala roda em um processo próprio (banco novo, memória medida do zero). Por padrão o
+# servidor é a própria aplicação ASGI no mesmo processo (httpx.ASGITransport); com
+# --servidor uvicorn é um uvicorn local de verdade. O SQLite é sempre medido; o PostgreSQL
+# entra quando há um servidor acessível (--postgres-url ou BENCH_POSTGRES_URL).
+# ⚠️ No PostgreSQL as tabelas do banco informado são APAGADAS e recriadas a cada escala.
+#
+# Uso:
+#   python benchmark.py                                   -> SQLite, 10k e 100k tarefas
+#   python benchmark.py --escalas 10000,100000,1000000 --salvar baseline.json
+#   python benchmark.py --comparar baseline.json          -> sai com código 1 se houver regressão
+#   python benchmark.py --escalas 1000000 --cenarios tarefas_busca   -> só a busca textual
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+try:
+    import resource
+except ImportError:  # Windows: sem getrusage, o relatório sai sem o pico de memória
+    resource = None
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+POSTGRES_PADRAO = "postgresql://postgres@localhost/flowscheduler_bench"
+
+CARGOS = ("Desenvolvedor", "Analista", "Gerente", "Designer", "Suporte")
+# Vocabulário dos títulos/descrições semeados (a busca textual precisa de texto variado)
+ACOES = ("Revisar", "Preparar", "Enviar", "Atualizar", "Aprovar", "Corrigir", "Publicar", "Testar")
+ASSUNTOS = ("relatório", "contrato", "proposta", "orçamento", "fatura", "apresentação",
+            "planilha", "backup", "servidor", "campanha", "treinamento", "auditoria")
+PROJETOS = 5000  # Códigos de projeto (prj0..prj4999) citados nas descrições
+TAMANHO_LOTE_SEMEADURA = 10000
+
+# Rotas que não entram na medição (documentação e o stream SSE, que não termina)
+ROTAS_IGNORADAS = {"/openapi.json", "/docs", "/docs/oauth2-redirect", "/redoc", "/eventos"}
+
+# Uma diferença de p95 abaixo disto (ms) é ruído, mesmo que passe da tolerância percentual
+PISO_REGRESSAO_MS = 2.0
+
+
+# --- CENÁRIOS ---
+
+class Cenario:
+    """
+    Uma rota a medir. 'caminho' e 'corpo' podem ser funções (contexto, i) para variar a
+    requisição; 'fracao' reduz a quantidade de requisições das rotas pesadas.
+    """
+
+    def __init__(self, nome, metodo, rota, caminho, corpo=None, fracao=1.0, cabecalhos=None,
+                 esperados=(200,), depois=None, conteudo=None):
+        self.nome = nome
+        self.metodo = metodo
+        self.rota = rota  # Molde da rota em main.py (para achar rotas sem cenário)
+        self.caminho = caminho
+        self.corpo = corpo
+        self.conteudo = conteudo
+        self.fracao = fracao
+        self.cabecalhos = cabecalhos
+        self.esperados = esperados
+        self.depois = depois  # Callback (contexto, resposta) para guardar IDs criados
+
+    def requisicao(self, ctx, i) -> dict:
+        resolver = lambda v: v(ctx, i) if callable(v) else v
+        dados = {"method": self.metodo, "url": resolver(self.caminho)}
+        if self.corpo is not None:
+            dados["json"] = resolver(self.corpo)
+        if self.conteudo is not None:
+            dados["content"] = resolver(self.conteudo)
+        if self.cabecalhos is not None:
+            dados["headers"] = resolver(self.cabecalhos)
+        return dados
+
+
+def _guardar_id(lista):
+    def depois(ctx, resposta):
+        if resposta.status_code == 200:
+            ctx[lista].append(resposta.json()["id"])
+    return depois
+
+
+def _tirar_id(lista, reserva):
+    """ID criado por um cenário anterior (ou um inexistente, se a lista acabou)."""
+    def caminho(ctx, i):
+        return f"{reserva}{ctx[lista].pop() if ctx[lista] else 10**9 + i}"
+    return caminho
+
+
+def _ndjson_tarefas(ctx, i):
+    hoje = date.today()
+    return "".join(
+        json.dumps({"titulo": f"Importada {i}-{j}", "prazo": str(hoje + timedelta(days=j % 30)),
+                    "empregado_id": 1 + (i * 500 + j) % ctx["empregados"], "esforco_horas": 2}) + "\n"
+        for j in range(500)
+    )
+
+
+# Leituras primeiro, escritas depois (as remoções apagam o que os cenários de criação criaram)
+CENARIOS = [
+    Cenario("raiz", "GET", "/", "/"),
+    Cenario("empregados_pagina1", "GET", "/empregados/", "/empregados/?limit=100"),
+    Cenario("empregados_pagina2", "GET", "/empregados/",
+            lambda ctx, i: f"/empregados/?limit=100&cursor={ctx['cursor_empregados']}"),
+    Cenario("tarefas_pagina1", "GET", "/tarefas/", "/tarefas/?limit=100"),
+    Cenario("tarefas_pendentes_por_prazo", "GET", "/tarefas/", "/tarefas/?limit=100&ordenar=prazo&concluida=false"),
+    Cenario("tarefas_de_um_empregado", "GET", "/tarefas/",
+            lambda ctx, i: f"/tarefas/?limit=100&empregado_id={1 + i % ctx['empregados']}"),
+    Cenario("tarefas_com_nomes", "GET", "/tarefas/", "/tarefas/?limit=100&expand=empregado"),
+    Cenario("tarefas_304", "GET", "/tarefas/", "/tarefas/?limit=100",
+            cabecalhos=lambda ctx, i: {"If-None-Match": ctx["etag_tarefas"]}, esperados=(304,)),
+    # Busca seletiva (assunto + código de projeto: ~0,02% das tarefas) e ampla (um assunto: ~8%)
+    Cenario("tarefas_busca", "GET", "/tarefas/busca",
+            lambda ctx, i: f"/tarefas/busca?q={ASSUNTOS[i % len(ASSUNTOS)]}+prj{(i * 7919) % PROJETOS}"),
+    Cenario("tarefas_busca_ampla", "GET", "/tarefas/busca",
+            lambda ctx, i: f"/tarefas/busca?q={ASSUNTOS[i % len(ASSUNTOS)][:5]}", fracao=0.1),
+    Cenario("tarefas_arquivo", "GET", "/tarefas/arquivo", "/tarefas/arquivo?limit=100", fracao=0.2),
+    Cenario("tarefas_arquivo_de_um_empregado", "GET", "/tarefas/arquivo",
+            lambda ctx, i: f"/tarefas/arquivo?limit=100&empregado_id={1 + i % ctx['empregados']}", fracao=0.2),
+    Cenario("tarefas_exportar_ndjson", "GET", "/tarefas/exportar", "/tarefas/exportar?formato=ndjson", fracao=0.02),
+    Cenario("empregados_carga", "GET", "/empregados/carga", "/empregados/carga", fracao=0.2),
+    Cenario("estatisticas_empregados", "GET", "/estatisticas/empregados", "/estatisticas/empregados", fracao=0.1),
+    Cenario("estatisticas_dashboard", "GET", "/estatisticas/dashboard", "/estatisticas/dashboard", fracao=0.5),
+    Cenario("changes", "GET", "/changes", lambda ctx, i: f"/changes?since={ctx['token']}"),
+    Cenario("planejamento_empregado", "GET", "/planejamento/{empregado_id}",
+            lambda ctx, i: f"/planejamento/{1 + i % ctx['empregados']}", fracao=0.5),
+    Cenario("planejamento_em_risco", "GET", "/planejamento/", "/planejamento/?somente_em_risco=true", fracao=0.02),
+    Cenario("atribuir_simulacao", "POST", "/agendamento/atribuir", "/agendamento/atribuir?dry_run=true", fracao=0.02),
+    Cenario("diagnostico_pool", "GET", "/diagnostico/pool", "/diagnostico/pool", fracao=0.2),
+    Cenario("metrics", "GET", "/metrics", "/metrics", fracao=0.1),
+    Cenario("criar_empregado", "POST", "/empregados/", "/empregados/",
+            corpo=lambda ctx, i: {"nome": f"Bench {i}", "cargo": "Bench", "email": f"bench{i}-{time.time_ns()}@bench"},
+            depois=_guardar_id("empregados_criados")),
+    Cenario("criar_tarefa", "POST", "/tarefas/", "/tarefas/",
+            corpo=lambda ctx, i: {"titulo": f"Bench {i}", "prazo": str(date.today() + timedelta(days=i % 30)),
+                                  "empregado_id": 1 + i % ctx["empregados"], "esforco_horas": 3},
+            depois=_guardar_id("tarefas_criadas")),
+    Cenario("editar_tarefa", "PATCH", "/tarefas/{tarefa_id}", lambda ctx, i: f"/tarefas/{1 + i % 1000}",
+            corpo=lambda ctx, i: {"esforco_horas": 1 + i % 8}),
+    Cenario("editar_empregado", "PATCH", "/empregados/{empregado_id}",
+            lambda ctx, i: f"/empregados/{1 + i % ctx['empregados']}", corpo=lambda ctx, i: {"cargo": f"Cargo {i % 5}"}),
+    # Fechamento de sprint: 50 tarefas de uma vez, alternando concluir/reabrir no mesmo bloco
+    Cenario("tarefas_lote_50", "POST", "/tarefas/lote", "/tarefas/lote",
+            corpo=lambda ctx, i: {"operacao": "reabrir" if (i // 20) % 2 else "concluir",
+                                  "ids": list(range(1 + (i % 20) * 50, 51 + (i % 20) * 50))}),
+    Cenario("importar_tarefas_500", "POST", "/importar/{entidade}", "/importar/tarefas?formato=ndjson",
+            conteudo=_ndjson_tarefas, fracao=0.05),
+    Cenario("deletar_tarefa", "DELETE", "/tarefas/{tarefa_id}", _tirar_id("tarefas_criadas", "/tarefas/")),
+    Cenario("deletar_empregado", "DELETE", "/empregados/{empregado_id}", _tirar_id("empregados_criados", "/empregados/")),
+    # Desligamento de empregados semeados (~100 tarefas cada), do último id para trás; as tarefas vão para o 1
+    Cenario("desligar_empregado", "POST", "/empregados/{empregado_id}/desligamento",
+            lambda ctx, i: f"/empregados/{ctx['empregados'] - i if ctx['empregados'] - i > 1 else 10**9 + i}/desligamento",
+            corpo=lambda ctx, i: {"transferir_para": 1}, fracao=0.1),
+]
+
+
+# --- SEMEADURA ---
+
+def semear(engine, quantidade_tarefas: int) -> int:
+    """Cria o schema e insere as linhas (Core, em lotes). Retorna a quantidade de empregados."""
+    from sqlalchemy import insert
+    from database import SessionLocal, agora_utc, proxima_versao, reconciliar_carga_trabalho
+    from migracoes import preparar_banco
+    from models import Base, Empregado, Tarefa, TarefaArquivada
+
+    if engine.dialect.name != "sqlite":
+        Base.metadata.drop_all(bind=engine)
+    preparar_banco(engine)
+
+    quantidade_empregados = max(10, quantidade_tarefas // 100)
+    hoje = date.today()
+    with engine.begin() as conn:
+        versao = proxima_versao(conn)
+        agora = agora_utc()
+        for inicio in range(0, quantidade_empregados, TAMANHO_LOTE_SEMEADURA):
+            conn.execute(insert(Empregado), [
+                {"nome": f"Empregado {i}", "cargo": CARGOS[i % len(CARGOS)], "email": f"empregado{i}@bench",
+                 "tarefas_abertas": 0, "versao": versao, "atualizado_em": agora}
+                for i in range(inicio, min(inicio + TAMANHO_LOTE_SEMEADURA, quantidade_empregados))
+            ])
+        for inicio in range(0, quantidade_tarefas, TAMANHO_LOTE_SEMEADURA):
+            conn.execute(insert(Tarefa), [
+                {"titulo": f"{ACOES[i % len(ACOES)]} {ASSUNTOS[(i // len(ACOES)) % len(ASSUNTOS)]} {i}",
+                 "descricao": f"Descrição da tarefa {i} do projeto prj{(i // 3) % PROJETOS}",
+                 # ~8% sem prazo, como os prazos inválidos anulados pela migração 1
+                 "prazo": None if i % 13 == 1 else hoje + timedelta(days=i % 120 - 30),
+                 "concluida": i % 4 == 0,
+                 # 10% sem responsável, para a atribuição automática ter o que planejar
+                 "empregado_id": None if i % 10 == 0 else 1 + i % quantidade_empregados,
+                 "esforco_horas": 1 + i % 8, "versao": versao, "atualizado_em": agora}
+                for i in range(inicio, min(inicio + TAMANHO_LOTE_SEMEADURA, quantidade_tarefas))
+            ])
+        # Histórico já arquivado (um quarto do volume das tarefas em uso), com ids que não colidem
+        for inicio in range(0, quantidade_tarefas // 4, TAMANHO_LOTE_SEMEADURA):
+            conn.execute(insert(TarefaArquivada), [
+                {"tarefa_id": quantidade_tarefas * 2 + i, "titulo": f"Antiga {i}", "descricao": None,
+                 "prazo": hoje - timedelta(days=200 + i % 365), "esforco_horas": 1 + i % 8,
+                 "empregado_id": 1 + i % quantidade_empregados,
+                 "concluida_em": agora - timedelta(days=120 + i % 365), "arquivada_em": agora}
+                for i in range(inicio, min(inicio + TAMANHO_LOTE_SEMEADURA, quantidade_tarefas // 4))
+            ])
+    db = SessionLocal()
+    try:
+        reconciliar_carga_trabalho(db)
+    finally:
+        db.close()
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            conn.exec_driver_sql("ANALYZE")
+    return quantidade_empregados
+
+
+# --- MEDIÇÃO ---
+
+def percentil(valores, p: float) -> float:
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    posicao = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[posicao]
+
+
+async def medir_cenario(cliente, cenario: Cenario, ctx: dict, total: int, concorrencia: int) -> dict:
+    latencias = []
+    erros = []
+    contador = iter(range(total))
+
+    async def trabalhador():
+        for i in contador:
+            inicio = time.perf_counter()
+            resposta = await cliente.request(**cenario.requisicao(ctx, i))
+            latencias.append((time.perf_counter() - inicio) * 1000)
+            if resposta.status_code not in cenario.esperados:
+                erros.append(resposta.status_code)
+            elif cenario.depois:
+                cenario.depois(ctx, resposta)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(min(concorrencia, total))))
+    duracao = time.perf_counter() - inicio
+    return {
+        "requisicoes": total,
+        "erros": len(erros),
+        "status_erros": sorted(set(erros)),
+        "p50_ms": round(percentil(latencias, 50), 3),
+        "p95_ms": round(percentil(latencias, 95), 3),
+        "p99_ms": round(percentil(latencias, 99), 3),
+        "vazao_rps": round(total / duracao, 1) if duracao else 0.0,
+    }
+
+
+async def _conferir_paginacao_por_prazo(cliente, empregado_id: int = 2, limite: int = 7):
+    """
+    Percorre as tarefas de um empregado por prazo, em páginas pequenas, e compara com a lista
+    por id: nenhuma tarefa pode sumir ou repetir, inclusive as sem prazo (que ficam no fim).
+    """
+    esperadas = {t["id"] for t in (await cliente.get(f"/tarefas/?limit=1000&empregado_id={empregado_id}")).json()}
+    vistas, prazos, cursor = [], [], ""
+    while True:
+        resposta = await cliente.get(f"/tarefas/?limit={limite}&ordenar=prazo&empregado_id={empregado_id}&cursor={cursor}")
+        if resposta.status_code != 200:
+            raise RuntimeError(f"Paginação por prazo falhou: HTTP {resposta.status_code} (cursor {cursor!r})")
+        vistas += [t["id"] for t in resposta.json()]
+        prazos += [t["prazo"] for t in resposta.json()]
+        cursor = resposta.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    ordenados = sorted(prazos, key=lambda p: p or "9999-12-31")
+    if len(vistas) != len(set(vistas)) or set(vistas) != esperadas or prazos != ordenados or None not in prazos:
+        raise RuntimeError(f"Paginação por prazo inconsistente: {len(vistas)} lidas, {len(esperadas)} esperadas.")
+
+
+async def _preparar_contexto(cliente, quantidade_empregados: int) -> dict:
+    await _conferir_paginacao_por_prazo(cliente)
+    ctx = {"empregados": quantidade_empregados, "empregados_criados": [], "tarefas_criadas": []}
+    ctx["token"] = (await cliente.get("/changes")).json()["token"]
+    ctx["cursor_empregados"] = (await cliente.get("/empregados/?limit=100")).headers.get("X-Next-Cursor", "")
+    ctx["etag_tarefas"] = (await cliente.get("/tarefas/?limit=100")).headers.get("ETag", "")
+    return ctx
+
+
+def _rotas_sem_cenario(app) -> list:
+    from fastapi.routing import APIRoute
+    cobertas = {(c.metodo, c.rota) for c in CENARIOS}
+    return sorted(
+        f"{metodo} {rota.path}"
+        for rota in app.router.routes if isinstance(rota, APIRoute) and rota.path not in ROTAS_IGNORADAS
+        for metodo in rota.methods if (metodo, rota.path) not in cobertas
+    )
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rss_pico_processos(pid: int):
+    """
+    Soma do VmHWM (pico de memória) do processo e dos filhos (workers do uvicorn), em MB.
+    None fora do Linux (sem /proc).
+    """
+    if not os.path.isdir(f"/proc/{pid}/task"):
+        return None
+    total = 0
+    pids = [pid]
+    for tarefa in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{tarefa}/children") as arquivo:
+            pids += [int(p) for p in arquivo.read().split()]
+    for p in pids:
+        with open(f"/proc/{p}/status") as arquivo:
+            for linha in arquivo:
+                if linha.startswith("VmHWM:"):
+                    total += int(linha.split()[1])
+    return round(total / 1024, 1)
+
+
+async def _ler_trava_versao(cliente) -> tuple:
+    """Soma e quantidade de flow_versao_trava_segundos no GET /metrics."""
+    valores = {"sum": 0.0, "count": 0.0}
+    for linha in (await cliente.get("/metrics")).text.splitlines():
+        if linha.startswith(("flow_versao_trava_segundos_sum", "flow_versao_trava_segundos_count")):
+            nome, valor = linha.split()
+            valores[nome.rsplit("_", 1)[1]] = float(valor)
+    return valores["sum"], int(valores["count"])
+
+
+def _resumir_trava_versao(antes: tuple, depois: tuple) -> dict:
+    """
+    Quanto tempo as escritas dos cenários seguraram o contador de versões e o teto de escritas
+    por segundo que isso dá: uma transação por vez passa pelo contador, então o banco inteiro
+    não grava mais que 1 / (tempo médio) transações por segundo.
+    """
+    transacoes = depois[1] - antes[1]
+    if not transacoes:
+        return {"transacoes": 0}
+    media = (depois[0] - antes[0]) / transacoes
+    return {"transacoes": transacoes, "media_ms": round(media * 1000, 3),
+            "teto_escritas_s": round(1 / media, 1) if media else None}
+
+
+async def executar_cenarios(app_ou_url, quantidade_empregados: int, args) -> tuple:
+    import httpx
+
+    if isinstance(app_ou_url, str):
+        cliente = httpx.AsyncClient(base_url=app_ou_url, timeout=300)
+    else:
+        cliente = httpx.AsyncClient(transport=httpx.ASGITransport(app=app_ou_url), base_url="http://bench", timeout=300)
+    async with cliente:
+        ctx = await _preparar_contexto(cliente, quantidade_empregados)
+        # Só as escritas dos cenários (a semeadura segura o contador durante a carga inteira)
+        trava_antes = await _ler_trava_versao(cliente)
+        resultados = {}
+        for cenario in CENARIOS:
+            if args.cenarios and not any(cenario.nome.startswith(n) for n in args.cenarios.split(",")):
+                continue
+            total = max(1, int(args.requisicoes * cenario.fracao))
+            resultados[cenario.nome] = await medir_cenario(cliente, cenario, ctx, total, args.concorrencia)
+            r = resultados[cenario.nome]
+            print(f"  {cenario.nome:<30} p50={r['p50_ms']:>9.2f}ms p95={r['p95_ms']:>9.2f}ms "
+                  f"p99={r['p99_ms']:>9.2f}ms {r['vazao_rps']:>8.1f} req/s erros={r['erros']}", flush=True)
+        trava = _resumir_trava_versao(trava_antes, await _ler_trava_versao(cliente))
+        if trava["transacoes"]:
+            print(f"  contador de versões: {trava['transacoes']} escritas, travado {trava['media_ms']:.3f}ms em média "
+                  f"-> teto de ~{trava['teto_escritas_s']} escritas/s", flush=True)
+        return resultados, trava
+
+
+def executar_escala(config: dict, args) -> dict:
+    """Roda no processo filho: o DATABASE_URL já foi definido no ambiente pelo processo pai."""
+    from database import engine
+
+    inicio = time.perf_counter()
+    quantidade_empregados = semear(engine, config["escala"])
+    semeadura = time.perf_counter() - inicio
+    print(f"  semeadura: {config['escala']} tarefas / {quantidade_empregados} empregados em {semeadura:.1f}s", flush=True)
+
+    serializacao = medir_serializacao(min(10000, config["escala"]))
+    for nome, dados in serializacao.items():
+        extras = f" pico={dados['pico_mb']:6.1f}MB" if "pico_mb" in dados else ""
+        print(f"  serializacao/{nome:<14} cpu={dados['cpu_ms']:8.1f}ms{extras} corpo={dados['bytes'] / 1024:8.1f}KB", flush=True)
+
+    import versoes
+    versoes.reiniciar()
+    import main
+
+    resultado = {"semeadura_s": round(semeadura, 2), "empregados": quantidade_empregados, "serializacao": serializacao,
+                 "rotas_sem_cenario": _rotas_sem_cenario(main.app)}
+    if args.servidor == "uvicorn":
+        porta = _porta_livre()
+        servidor = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(porta), "--workers", str(args.workers),
+             "--log-level", "warning"],
+            cwd=DIRETORIO,
+        )
+        try:
+            import httpx
+            for _ in range(300):
+                try:
+                    httpx.get(f"http://127.0.0.1:{porta}/", timeout=1)
+                    break
+                except httpx.HTTPError:
+                    time.sleep(0.1)
+            resultado["cenarios"], resultado["trava_versao"] = asyncio.run(
+                executar_cenarios(f"http://127.0.0.1:{porta}", quantidade_empregados, args)
+            )
+            rss_pico = _rss_pico_processos(servidor.pid)
+            if rss_pico is not None:
+                resultado["rss_pico_mb"] = rss_pico
+        finally:
+            servidor.terminate()
+            servidor.wait()
+    else:
+        resultado["cenarios"], resultado["trava_versao"] = asyncio.run(executar_cenarios(main.app, quantidade_empregados, args))
+        if resource is not None:
+            # ru_maxrss: KB no Linux, bytes no macOS
+            fator = 1024 * 1024 if sys.platform == "darwin" else 1024
+            resultado["rss_pico_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / fator, 1)
+    return resultado
+
+
+# --- SERIALIZAÇÃO (CPU E MEMÓRIA POR 10 MIL LINHAS) ---
+
+def medir_serializacao(linhas: int = 10000, repeticoes: int = 3) -> dict:
+    """
+    Custo de montar o JSON de 'linhas' tarefas (consulta incluída), fora do servidor:
+    o caminho antigo (entidades do ORM + TarefaSchema + jsonable_encoder + json) contra o
+    atual (colunas projetadas + orjson), e quanto a compressão reduz o corpo.
+    """
+    import gc
+    import gzip
+    import tracemalloc
+    from fastapi.encoders import jsonable_encoder
+    from sqlalchemy import select
+    from cache_nomes import linhas_com_nomes
+    from database import COLUNAS_API_TAREFA, SessionLocal
+    from models import Tarefa
+    from schemas import TarefaSchema
+    from serializacao import serializar
+
+    def orm_schema():
+        with SessionLocal() as sessao:
+            tarefas = sessao.scalars(select(Tarefa).order_by(Tarefa.id).limit(linhas)).all()
+            conteudo = jsonable_encoder([TarefaSchema.model_validate(t) for t in tarefas])
+            return json.dumps(conteudo, separators=(",", ":")).encode()
+
+    def projetado():
+        with SessionLocal() as sessao:
+            return serializar(linhas_com_nomes(
+                sessao.execute(select(*COLUNAS_API_TAREFA).order_by(Tarefa.id).limit(linhas)).all(), {}
+            ))
+
+    resultado = {}
+    for nome, funcao in (("orm_schema", orm_schema), ("projetado", projetado)):
+        corpo = funcao()  # Aquecimento (conexão, compilação do SQL)
+        tempos = []
+        for _ in range(repeticoes):
+            gc.collect()
+            inicio = time.process_time()
+            funcao()
+            tempos.append(time.process_time() - inicio)
+        tracemalloc.start()
+        funcao()
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        resultado[nome] = {"cpu_ms": round(min(tempos) * 1000, 1), "pico_mb": round(pico / 2 ** 20, 1), "bytes": len(corpo)}
+
+    inicio = time.process_time()
+    comprimido = gzip.compress(corpo, compresslevel=5)
+    resultado["gzip"] = {"cpu_ms": round((time.process_time() - inicio) * 1000, 1), "bytes": len(comprimido)}
+    try:
+        import brotli
+        inicio = time.process_time()
+        comprimido = brotli.compress(corpo, quality=5)
+        resultado["brotli"] = {"cpu_ms": round((time.process_time() - inicio) * 1000, 1), "bytes": len(comprimido)}
+    except ImportError:
+        pass
+    return resultado
+
+
+# --- ORQUESTRAÇÃO (PROCESSO PAI) ---
+
+def _postgres_disponivel(url: str) -> bool:
+    try:
+        from sqlalchemy import create_engine
+        teste = create_engine(url)
+        with teste.connect():
+            pass
+        teste.dispose()
+        return True
+    except Exception as e:
+        print(f"PostgreSQL indisponível ({url}): {type(e).__name__}. Medindo só o SQLite.")
+        return False
+
+
+def _rodar_filho(backend: str, url: str, escala: int, args, temporario: str) -> dict:
+    saida = os.path.join(temporario, f"{backend}-{escala}.json")
+    ambiente = dict(os.environ)
+    ambiente.update({
+        "DATABASE_URL": url,
+        # Contadores de versão e retratos de métricas isolados dos de um servidor real
+        "VERSOES_ARQUIVO": os.path.join(temporario, f"versoes-{backend}-{escala}.bin"),
+        "METRICAS_DIR": os.path.join(temporario, f"metricas-{backend}-{escala}"),
+        "WEB_CONCURRENCY": str(args.workers),
+    })
+    config = {"backend": backend, "escala": escala, "saida": saida}
+    comando = [sys.executable, os.path.abspath(__file__), "--_filho", json.dumps(config),
+               "--requisicoes", str(args.requisicoes), "--concorrencia", str(args.concorrencia),
+               "--servidor", args.servidor, "--workers", str(args.workers)]
+    if args.cenarios:
+        comando += ["--cenarios", args.cenarios]
+    retorno = subprocess.run(comando, env=ambiente, cwd=DIRETORIO)
+    if retorno.returncode != 0:
+        raise SystemExit(f"Falha na escala {escala} ({backend}).")
+    with open(saida) as arquivo:
+        return json.load(arquivo)
+
+
+def comparar(atual: dict, base: dict, tolerancia: float) -> list:
+    """Lista as regressões (p95 ou vazão piores que a base além da tolerância, e memória)."""
+    regressoes = []
+    for backend, escalas in atual["resultados"].items():
+        for escala, dados in escalas.items():
+            dados_base = base.get("resultados", {}).get(backend, {}).get(escala)
+            if not dados_base:
+                continue
+            for nome, r in dados["cenarios"].items():
+                rb = dados_base["cenarios"].get(nome)
+                if not rb:
+                    continue
+                prefixo = f"{backend}/{escala}/{nome}"
+                if r["p95_ms"] > rb["p95_ms"] * (1 + tolerancia) and r["p95_ms"] - rb["p95_ms"] > PISO_REGRESSAO_MS:
+                    regressoes.append(f"{prefixo}: p95 {rb['p95_ms']}ms -> {r['p95_ms']}ms")
+                if r["vazao_rps"] < rb["vazao_rps"] * (1 - tolerancia):
+                    regressoes.append(f"{prefixo}: vazão {rb['vazao_rps']} -> {r['vazao_rps']} req/s")
+                if r["erros"] > rb["erros"]:
+                    regressoes.append(f"{prefixo}: erros {rb['erros']} -> {r['erros']}")
+            if "rss_pico_mb" not in dados or "rss_pico_mb" not in dados_base:
+                continue  # Medido numa plataforma sem getrusage ou /proc
+            if dados["rss_pico_mb"] > dados_base["rss_pico_mb"] * (1 + tolerancia):
+                regressoes.append(f"{backend}/{escala}: memória {dados_base['rss_pico_mb']}MB -> {dados['rss_pico_mb']}MB")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga da API do Flow Scheduler.")
+    parser.add_argument("--escalas", default="10000,100000", help="quantidades de tarefas, separadas por vírgula")
+    parser.add_argument("--requisicoes", type=int, default=200, help="requisições por cenário (antes da fração)")
+    parser.add_argument("--concorrencia", type=int, default=16, help="clientes simultâneos")
+    parser.add_argument("--servidor", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="workers do uvicorn (com --servidor uvicorn)")
+    parser.add_argument("--postgres-url", default=os.environ.get("BENCH_POSTGRES_URL"),
+                        help=f"banco PostgreSQL descartável (padrão: tenta {POSTGRES_PADRAO})")
+    parser.add_argument("--sem-postgres", action="store_true", help="mede só o SQLite")
+    parser.add_argument("--cenarios", help="só os cenários com estes prefixos de nome, separados por vírgula")
+    parser.add_argument("--salvar", help="grava o resultado (JSON) como nova linha de base")
+    parser.add_argument("--comparar", help="compara com uma linha de base e falha se houver regressão")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="piora relativa aceita (0.25 = 25%%)")
+    parser.add_argument("--_filho", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._filho:
+        config = json.loads(args._filho)
+        resultado = executar_escala(config, args)
+        with open(config["saida"], "w") as arquivo:
+            json.dump(resultado, arquivo)
+        return
+
+    import sqlite3
+    escalas = [int(e) for e in args.escalas.split(",") if e.strip()]
+    relatorio = {
+        "meta": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+            "servidor": args.servidor,
+            "workers": args.workers,
+            "concorrencia": args.concorrencia,
+            "requisicoes": args.requisicoes,
+        },
+        "resultados": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="flowscheduler-bench-") as temporario:
+        backends = [("sqlite", lambda e: f"sqlite:///{os.path.join(temporario, f'bench-{e}.db')}")]
+        url_postgres = args.postgres_url or POSTGRES_PADRAO
+        if not args.sem_postgres and _postgres_disponivel(url_postgres):
+            backends.append(("postgresql", lambda e: url_postgres))
+
+        for backend, url in backends:
+            for escala in escalas:
+                print(f"== {backend}, {escala} tarefas ==", flush=True)
+                relatorio["resultados"].setdefault(backend, {})[str(escala)] = _rodar_filho(
+                    backend, url(escala), escala, args, temporario
+                )
+
+    for backend, resultados in relatorio["resultados"].items():
+        for escala, dados in resultados.items():
+            if "rss_pico_mb" in dados:
+                print(f"{backend}/{escala}: pico de memória {dados['rss_pico_mb']}MB")
+            if dados["rotas_sem_cenario"]:
+                print(f"⚠️ Rotas sem cenário no benchmark: {', '.join(dados['rotas_sem_cenario'])}")
+
+    if args.salvar:
+        with open(args.salvar, "w") as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+        print(f"Resultado gravado em {args.salvar}.")
+
+    if args.comparar:
+        with open(args.comparar) as arquivo:
+            base = json.load(arquivo)
+        regressoes = comparar(relatorio, base, args.tolerancia)
+        if regressoes:
+            print(f"❌ {len(regressoes)} regressão(ões) em relação a {args.comparar}:")
+            for r in regressoes:
+                print(f"  {r}")
+            sys.exit(1)
+        print(f"✅ Sem regressões em relação a {args.comparar} (tolerância {args.tolerancia:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# busca.py
+# Busca textual nas tarefas (título e descrição) com índice de verdade, em vez de
+# "LIKE '%x%'", que lê a tabela inteira a cada busca.
+#
+# - SQLite: tabela virtual FTS5 'tarefas_busca' de conteúdo externo (o texto continua só em
+#   'tarefas'; o FTS guarda apenas o índice invertido), mantida por triggers em INSERT,
+#   DELETE e UPDATE de titulo/descricao. Os triggers valem para qualquer escrita (ORM, Core,
+#   importação em lote, SQL manual). Relevância: bm25, com o título pesando mais.
+# - PostgreSQL: coluna gerada 'busca' (tsvector, título com peso A e descrição com peso B)
+#   com índice GIN. O próprio banco recalcula a coluna quando o texto muda. Relevância: ts_rank_cd.
+#
+# Nenhum dos dois aparece em models.py (create_all não sabe criar nenhum deles): quem cria é
+# a migração 5 (migracoes.py), que chama criar_indice_busca.
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, and_, column, func, literal_column, or_, select, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from database import codificar_cursor, decodificar_cursor
+from models import Tarefa
+
+# Quantos termos da busca são usados (o resto é ignorado)
+MAXIMO_TERMOS = 8
+# Configuração de idioma do PostgreSQL (stemming e stopwords em português)
+IDIOMA_PG = "portuguese"
+# Peso do título em relação à descrição no bm25 do SQLite
+PESO_TITULO = 10.0
+
+_tarefas_busca = table("tarefas_busca", column("rowid"))
+
+
+# --- ÍNDICE (MIGRAÇÃO) ---
+
+DDL_SQLITE = (
+    # remove_diacritics: "relatorio" encontra "relatório"
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tarefas_busca USING fts5(
+        titulo, descricao, content='tarefas', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS tarefas_busca_ai AFTER INSERT ON tarefas BEGIN
+        INSERT INTO tarefas_busca(rowid, titulo, descricao) VALUES (new.id, new.titulo, new.descricao);
+    END""",
+    # Conteúdo externo: para remover do índice é preciso passar o texto ANTIGO
+    """CREATE TRIGGER IF NOT EXISTS tarefas_busca_ad AFTER DELETE ON tarefas BEGIN
+        INSERT INTO tarefas_busca(tarefas_busca, rowid, titulo, descricao) VALUES ('delete', old.id, old.titulo, old.descricao);
+    END""",
+    # Só quando o texto muda: concluir/reatribuir uma tarefa não mexe no índice
+    """CREATE TRIGGER IF NOT EXISTS tarefas_busca_au AFTER UPDATE OF titulo, descricao ON tarefas BEGIN
+        INSERT INTO tarefas_busca(tarefas_busca, rowid, titulo, descricao) VALUES ('delete', old.id, old.titulo, old.descricao);
+        INSERT INTO tarefas_busca(rowid, titulo, descricao) VALUES (new.id, new.titulo, new.descricao);
+    END""",
+    # Indexa as tarefas que já existem
+    "INSERT INTO tarefas_busca(tarefas_busca) VALUES ('rebuild')",
+)
+
+DDL_POSTGRES = (
+    f"""ALTER TABLE tarefas ADD COLUMN IF NOT EXISTS busca tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{IDIOMA_PG}', coalesce(titulo, '')), 'A') ||
+        setweight(to_tsvector('{IDIOMA_PG}', coalesce(descricao, '')), 'B')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_tarefas_busca ON tarefas USING GIN (busca)",
+)
+
+
+def criar_indice_busca(engine: Engine):
+    """Cria (ou completa) o índice de busca e indexa as tarefas existentes. Idempotente."""
+    comandos = {"sqlite": DDL_SQLITE, "postgresql": DDL_POSTGRES}.get(engine.dialect.name)
+    if comandos is None:
+        print(f"⚠️ Busca textual sem índice: banco '{engine.dialect.name}' não suportado.")
+        return
+    with engine.begin() as conn:
+        for comando in comandos:
+            conn.execute(text(comando))
+    print("Índice de busca textual das tarefas criado.")
+
+
+# --- CONSULTA ---
+
+def extrair_termos(texto: str) -> List[str]:
+    """
+    Palavras da busca, sem a sintaxe dos motores de busca (aspas, operadores, parênteses):
+    o que o usuário digita nunca vira erro de sintaxe no MATCH / to_tsquery.
+    """
+    return re.findall(r"\w+", texto.lower())[:MAXIMO_TERMOS]
+
+
+def _consulta_textual(termos: List[str], dialeto: str) -> str:
+    # Todos os termos precisam aparecer (E); o último vale como prefixo (busca enquanto digita)
+    if dialeto == "postgresql":
+        return " & ".join(termos[:-1] + [termos[-1] + ":*"])
+    return " ".join([f'"{t}"' for t in termos[:-1]] + [f'"{termos[-1]}"*'])
+
+
+def condicao_busca(texto: str, dialeto: str):
+    """
+    Condição WHERE "a tarefa casa com a busca", servida pelo índice textual. Para usar como
+    filtro em outras consultas de tarefas (ex.: a lista do app desktop).
+    Levanta ValueError se a busca não tem nenhuma palavra.
+    """
+    termos = extrair_termos(texto)
+    if not termos:
+        raise ValueError("A busca precisa ter ao menos uma palavra.")
+    consulta = _consulta_textual(termos, dialeto)
+    if dialeto == "postgresql":
+        return literal_column("tarefas.busca").op("@@")(func.to_tsquery(IDIOMA_PG, consulta))
+    return Tarefa.id.in_(
+        select(_tarefas_busca.c.rowid).where(literal_column("tarefas_busca").op("MATCH")(consulta))
+    )
+
+
+def consulta_busca(texto: str, dialeto: str, limite: int = 20, cursor: Optional[str] = None) -> Select:
+    """
+    SELECT (Tarefa, relevancia) das tarefas que casam com a busca, da mais relevante para a
+    menos (empate pelo id). Relevância maior = melhor nos dois bancos. Busca limite + 1 linhas.
+    """
+    termos = extrair_termos(texto)
+    if not termos:
+        raise ValueError("A busca precisa ter ao menos uma palavra.")
+    consulta = _consulta_textual(termos, dialeto)
+
+    if dialeto == "postgresql":
+        tsquery = func.to_tsquery(IDIOMA_PG, consulta)
+        relevancia = func.ts_rank_cd(literal_column("tarefas.busca"), tsquery)
+        chave = Tarefa.id
+        candidatos = select(chave.label("id"), relevancia.label("relevancia")).where(
+            literal_column("tarefas.busca").op("@@")(tsquery)
+        )
+    else:
+        # bm25 é negativo (mais negativo = melhor): o sinal é invertido para bater com o PostgreSQL
+        relevancia = -func.bm25(literal_column("tarefas_busca"), PESO_TITULO, 1.0)
+        chave = _tarefas_busca.c.rowid
+        candidatos = select(chave.label("id"), relevancia.label("relevancia")).where(
+            literal_column("tarefas_busca").op("MATCH")(consulta)
+        )
+
+    if cursor:
+        valores = decodificar_cursor(cursor)
+        try:
+            relevancia_cursor, id_cursor = float(valores["r"]), int(valores["id"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError("Cursor inválido.") from e
+        # Próxima página: menos relevante que a última entregue, ou igual com id maior.
+        # A relevância depende das estatísticas do índice: se muitas tarefas forem escritas
+        # entre uma página e outra, a ordem pode variar um pouco (nada se repete na mesma página).
+        candidatos = candidatos.where(or_(relevancia < relevancia_cursor, and_(relevancia == relevancia_cursor, chave > id_cursor)))
+
+    # Ordena e corta só no índice; a tabela de tarefas é lida apenas para as linhas da página
+    # (numa busca ampla, ler a linha de cada uma das milhares de candidatas custaria mais que o ranking)
+    pagina = candidatos.order_by(relevancia.desc(), chave.asc()).limit(limite + 1).subquery()
+    return (
+        select(Tarefa, pagina.c.relevancia)
+        .join(pagina, Tarefa.id == pagina.c.id)
+        .order_by(pagina.c.relevancia.desc(), Tarefa.id.asc())
+    )
+
+
+def buscar_tarefas(db_session: Session, texto: str, limite: int = 20, cursor: Optional[str] = None) -> Tuple[List[Tarefa], Optional[str]]:
+    """
+    Uma página da busca: (tarefas, próximo cursor ou None). Cada tarefa volta com o
+    atributo 'relevancia' preenchido (mesmo esquema do 'empregado_nome' em listar_proximas_tarefas).
+    """
+    dialeto = db_session.get_bind().dialect.name
+    linhas = db_session.execute(consulta_busca(texto, dialeto, limite, cursor)).all()
+    tarefas = []
+    for tarefa, relevancia in linhas[:limite]:
+        setattr(tarefa, "relevancia", relevancia)
+        tarefas.append(tarefa)
+    if len(linhas) <= limite:
+        return tarefas, None
+    return tarefas, codificar_cursor({"r": tarefas[-1].relevancia, "id": tarefas[-1].id})
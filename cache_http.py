@@ -0,0 +1,100 @@
+# cache_http.py
+# GET condicional (ETag / If-None-Match) e cache opcional de respostas das listagens.
+# O ETag combina a época e as versões das tabelas lidas (versoes.py) com a rota e os filtros:
+# se nada foi escrito nessas tabelas, o ETag é o mesmo e a rota responde 304 sem consultar o banco.
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+from fastapi import Request, Response
+
+import versoes
+from serializacao import serializar
+
+# Quantidade de respostas guardadas em memória por worker (0 desliga o cache)
+TAMANHO_CACHE_RESPOSTAS = int(os.environ.get("CACHE_RESPOSTAS", "0"))
+
+
+class CacheRespostas:
+    """Cache LRU limitado de respostas já serializadas, indexado pelo ETag."""
+
+    def __init__(self, tamanho: int):
+        self.tamanho = tamanho
+        self._itens: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: str):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+            return item
+
+    def guardar(self, chave: str, corpo: bytes, cabecalhos: Dict[str, str]):
+        if self.tamanho <= 0:
+            return
+        with self._lock:
+            self._itens[chave] = (corpo, cabecalhos)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+
+
+cache_respostas = CacheRespostas(TAMANHO_CACHE_RESPOSTAS)
+
+
+class ConsultaCondicional:
+    """
+    Uso em uma rota de listagem:
+        cond = ConsultaCondicional(request, ("tarefas",))
+        pronta = cond.resposta_pronta()
+        if pronta is not None:
+            return pronta          # 304 ou resposta do cache, sem banco
+        ...consulta...
+        return cond.responder(conteudo, {"X-Next-Cursor": ...})
+    """
+
+    def __init__(self, request: Request, tabelas: Sequence[str], extra: str = ""):
+        self.request = request
+        self.tabelas = tuple(tabelas)
+        # As versões são lidas ANTES da consulta: se uma escrita acontecer no meio, o ETag
+        # antigo nunca fica associado aos dados novos (ver responder()).
+        self.versoes = self._ler_versoes()
+        parametros = sorted(request.query_params.multi_items())
+        assinatura = hashlib.blake2b(
+            # 'extra': o que mais muda a resposta sem escrita no banco (ex: a data de hoje)
+            json.dumps([request.url.path, parametros, self.versoes, extra]).encode(), digest_size=12
+        ).hexdigest()
+        self.etag = f'"{assinatura}"'
+
+    def _ler_versoes(self):
+        return [versoes.epoca()] + [versoes.versao(t) for t in self.tabelas]
+
+    def _cabecalhos(self, extras: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        # no-cache: o navegador pode guardar, mas sempre revalida com If-None-Match
+        return {**(extras or {}), "ETag": self.etag, "Cache-Control": "no-cache"}
+
+    def resposta_pronta(self) -> Optional[Response]:
+        """304 se o cliente já tem esta versão; a resposta do cache se existir; senão None."""
+        if_none_match = self.request.headers.get("if-none-match", "")
+        if self.etag in [e.strip() for e in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=self._cabecalhos())
+
+        em_cache = cache_respostas.obter(self.etag)
+        if em_cache is not None:
+            corpo, cabecalhos = em_cache
+            return Response(content=corpo, media_type="application/json", headers=self._cabecalhos(cabecalhos))
+        return None
+
+    def responder(self, conteudo, cabecalhos: Optional[Dict[str, str]] = None) -> Response:
+        """Serializa o conteúdo e, se nenhuma escrita ocorreu durante a consulta, emite o ETag e guarda no cache."""
+        corpo = serializar(conteudo)
+        cabecalhos = cabecalhos or {}
+        if self._ler_versoes() != self.versoes:
+            # Escrita concorrente: o conteúdo pode ser de qualquer uma das duas versões
+            return Response(content=corpo, media_type="application/json", headers=cabecalhos)
+        cache_respostas.guardar(self.etag, corpo, cabecalhos)
+        return Response(content=corpo, media_type="application/json", headers=self._cabecalhos(cabecalhos))
@@ -0,0 +1,104 @@
+# cache_nomes.py
+# Nome do responsável nas listagens de tarefas (expand=empregado) sem N+1.
+#
+# Acessar tarefa.empregado.nome linha a linha dispara uma consulta por tarefa (lazy load).
+# Aqui os nomes de uma página inteira saem de um cache LRU (id -> nome) por worker e só os
+# que faltam são buscados, em UMA consulta (WHERE id IN ...). Com o cache quente, listar
+# 10 mil tarefas com nome é só a consulta das tarefas.
+#
+# Invalidação: o cache guarda a versão da tabela empregados (versoes.py) com que foi
+# preenchido. Qualquer escrita em empregados, em qualquer worker, muda essa versão e o
+# cache é esvaziado na próxima consulta.
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import Empregado
+import versoes
+
+# Quantidade de nomes guardados por worker (0 desliga o cache: sempre uma consulta por página)
+TAMANHO_CACHE_NOMES = int(os.environ.get("CACHE_NOMES", "10000"))
+
+
+class CacheNomes:
+    """LRU limitado de id do empregado -> nome, esvaziado quando a tabela empregados muda."""
+
+    def __init__(self, tamanho: int):
+        self.tamanho = tamanho
+        self._itens: "OrderedDict[int, str]" = OrderedDict()
+        self._versao: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _versao_atual() -> Tuple[int, int]:
+        # A época entra junto: um reinício do servidor zera os contadores
+        return versoes.epoca(), versoes.versao("empregados")
+
+    def _procurar(self, ids: Set[int]) -> Tuple[Dict[int, str], Set[int], Tuple[int, int]]:
+        """(nomes em cache, ids que faltam, versão lida ANTES de consultar o banco)."""
+        versao = self._versao_atual()
+        with self._lock:
+            if versao != self._versao:
+                self._itens.clear()
+                self._versao = versao
+            achados = {}
+            for empregado_id in ids:
+                nome = self._itens.get(empregado_id)
+                if nome is not None:
+                    self._itens.move_to_end(empregado_id)
+                    achados[empregado_id] = nome
+        return achados, ids - achados.keys(), versao
+
+    def _guardar(self, nomes: Dict[int, str], versao: Tuple[int, int]):
+        if self.tamanho <= 0:
+            return
+        with self._lock:
+            # Uma escrita em empregados aconteceu durante a consulta: o que foi lido pode estar velho
+            if versao != self._versao:
+                return
+            self._itens.update(nomes)
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+
+    def nomes(self, db_session: Session, ids: Iterable[Optional[int]]) -> Dict[int, str]:
+        """Nomes dos empregados indicados (ids None são ignorados): no máximo uma consulta."""
+        achados, faltando, versao = self._procurar({i for i in ids if i is not None})
+        if faltando:
+            novos = dict(db_session.execute(select(Empregado.id, Empregado.nome).where(Empregado.id.in_(faltando))).all())
+            self._guardar(novos, versao)
+            achados.update(novos)
+        return achados
+
+    async def nomes_async(self, db_session: AsyncSession, ids: Iterable[Optional[int]]) -> Dict[int, str]:
+        """Mesmo que nomes(), para as rotas de rotas_async.py."""
+        achados, faltando, versao = self._procurar({i for i in ids if i is not None})
+        if faltando:
+            novos = dict((await db_session.execute(select(Empregado.id, Empregado.nome).where(Empregado.id.in_(faltando)))).all())
+            self._guardar(novos, versao)
+            achados.update(novos)
+        return achados
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._versao = None
+
+
+cache_nomes = CacheNomes(TAMANHO_CACHE_NOMES)
+
+
+def preencher_nomes(tarefas: list, nomes: Dict[int, str]) -> list:
+    """Põe o atributo 'empregado_nome' em cada tarefa (None se não tem responsável)."""
+    for tarefa in tarefas:
+        setattr(tarefa, "empregado_nome", nomes.get(tarefa.empregado_id))
+    return tarefas
+
+
+def linhas_com_nomes(linhas: list, nomes: Dict[int, str]) -> List[dict]:
+    """Linhas (Row) das listagens -> dicts da resposta, com 'empregado_nome' (None sem expand)."""
+    return [{**linha._asdict(), "empregado_nome": nomes.get(linha.empregado_id)} for linha in linhas]
@@ -1,8 +1,16 @@
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import create_engine
-from models import Base, Empregado, Tarefa # Assume-se que 'models' contém a definição das classes SQLAlchemy
+from sqlalchemy.orm import sessionmaker, Session, attributes
+from sqlalchemy import create_engine, case, event, func, insert, or_, select, tuple_, update, Select
+from sqlalchemy.engine import Connection, Row, make_url
+from models import Base, Empregado, Tarefa, ContadorVersao, Remocao, PRAZO_ORDENACAO # Assume-se que 'models' contém a definição das classes SQLAlchemy
+import metricas
+import base64
+import json
 import os
-from typing import Any 
+import secrets
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
 # --- Configuração do DB ---
 
@@ -15,14 +23,88 @@ DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///flow_scheduler.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# --- Perfis de Ajuste do Engine (por backend) ---
+# Escolhidos pelo DATABASE_URL; cada valor pode ser trocado por variável de ambiente.
+
+def _env_int(nome: str, padrao: int) -> int:
+    valor = os.environ.get(nome)
+    return int(valor) if valor not in (None, "") else padrao
+
+def _env_bool(nome: str, padrao: bool) -> bool:
+    valor = os.environ.get(nome)
+    return padrao if valor in (None, "") else valor.lower() in ("1", "true", "sim")
+
+# SQLite: WAL deixa leitores e o escritor trabalharem ao mesmo tempo (no journal padrão uma
+# escrita bloqueia todas as leituras) e, com synchronous=NORMAL, o commit não faz fsync a cada
+# transação (só no checkpoint; continua seguro contra queda do processo).
+# busy_timeout: em vez de falhar na hora com "database is locked", espera o outro escritor.
+# foreign_keys: o SQLite só respeita as chaves estrangeiras (e o ON DELETE SET NULL de
+# tarefas.empregado_id) com este PRAGMA ligado, em cada conexão.
+PRAGMAS_SQLITE = {
+    "journal_mode": os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": _env_int("SQLITE_CACHE_KB", 65536) * -1,  # negativo = tamanho em KiB
+    "mmap_size": _env_int("SQLITE_MMAP_MB", 256) * 1024 * 1024,
+    "busy_timeout": _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000),
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+}
+
+def _aplicar_pragmas_sqlite(dbapi_conn, connection_record):
+    """Evento 'connect': roda em cada conexão nova do pool, antes do primeiro uso."""
+    cursor = dbapi_conn.cursor()
+    try:
+        for pragma, valor in PRAGMAS_SQLITE.items():
+            cursor.execute(f"PRAGMA {pragma}={valor}")
+    finally:
+        cursor.close()
+
+def opcoes_do_engine(url: str) -> Dict[str, Any]:
+    """Argumentos do create_engine para o backend do URL."""
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        # check_same_thread=False: a sessão é usada pelas threads do FastAPI
+        return {
+            "connect_args": {"check_same_thread": False},
+            "pool_size": _env_int("DB_POOL_SIZE", 5),
+            "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        }
+    if backend == "postgresql":
+        # Cada worker do uvicorn tem o seu pool: o total de conexões no servidor é
+        # WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW), que precisa caber no max_connections.
+        # pre_ping descarta conexões derrubadas pelo servidor/proxy; recycle renova as antigas
+        # antes do timeout de ociosidade da plataforma.
+        return {
+            "pool_size": _env_int("DB_POOL_SIZE", 5),
+            "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+            "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+            "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+            "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+        }
+    return {}
+
+def _e_sqlite_em_memoria(url: str) -> bool:
+    url_obj = make_url(url)
+    return url_obj.get_backend_name() == "sqlite" and url_obj.database in (None, "", ":memory:")
+
+def criar_engine_ajustado(url: str):
+    """create_engine com o perfil do backend (e os PRAGMAs no SQLite)."""
+    opcoes = opcoes_do_engine(url)
+    if _e_sqlite_em_memoria(url):
+        # Banco em memória usa um pool de conexão única: sem tamanho de pool
+        opcoes.pop("pool_size", None)
+        opcoes.pop("max_overflow", None)
+    else:
+        # Mesmo QueuePool padrão, mas medindo a espera pelo checkout (GET /metrics)
+        opcoes["poolclass"] = metricas.QueuePoolMedido
+    novo_engine = create_engine(url, **opcoes)
+    if novo_engine.dialect.name == "sqlite":
+        event.listen(novo_engine, "connect", _aplicar_pragmas_sqlite)
+    metricas.instrumentar_engine(novo_engine)
+    return novo_engine
 
 # Criação do Engine
-engine = create_engine(
-    DATABASE_URL, 
-    # Necessário apenas para SQLite: check_same_thread=False
-    # Em produção (PostgreSQL), connect_args é vazio.
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {} 
-)
+engine = criar_engine_ajustado(DATABASE_URL)
 
 # Base.metadata.create_all(engine)
 # MANTIDO REMOVIDO: A criação das tabelas deve ser feita via script de inicialização
@@ -30,6 +112,85 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Workers criados por fork (gunicorn --preload) não podem reaproveitar conexões abertas no
+# processo mestre: o pool do filho começa vazio (close=False não fecha as do mestre).
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
+# --- Configuração do DB Assíncrono (opcional) ---
+# Com DB_ASYNC=1 a API usa as rotas assíncronas (rotas_async.py), que não bloqueiam uma thread
+# do threadpool por requisição. O driver async é derivado do DATABASE_URL:
+# aiosqlite para SQLite (testes locais) e asyncpg para PostgreSQL.
+USAR_DB_ASYNC = os.environ.get("DB_ASYNC", "").lower() in ("1", "true", "sim")
+
+DRIVERS_ASYNC = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+def _url_async(url: str) -> str:
+    """Troca o driver síncrono do DATABASE_URL pelo equivalente assíncrono."""
+    url_obj = make_url(url)
+    backend = url_obj.get_backend_name()
+    if backend not in DRIVERS_ASYNC:
+        raise ValueError(f"Backend sem driver assíncrono configurado: {backend}")
+    return url_obj.set(drivername=f"{backend}+{DRIVERS_ASYNC[backend]}").render_as_string(hide_password=False)
+
+async_engine = None
+AsyncSessionLocal = None
+
+if USAR_DB_ASYNC:
+    # Importado só quando habilitado: aiosqlite/asyncpg são dependências opcionais
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL") or _url_async(DATABASE_URL)
+    # Mesmo perfil do engine síncrono (o asyncpg não aceita check_same_thread)
+    _opcoes_async = opcoes_do_engine(ASYNC_DATABASE_URL)
+    _opcoes_async.pop("connect_args", None)
+    if _e_sqlite_em_memoria(ASYNC_DATABASE_URL):
+        _opcoes_async.pop("pool_size", None)
+        _opcoes_async.pop("max_overflow", None)
+    else:
+        _opcoes_async["poolclass"] = metricas.AsyncAdaptedQueuePoolMedido
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **_opcoes_async)
+    if async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", _aplicar_pragmas_sqlite)
+    metricas.instrumentar_engine(async_engine.sync_engine)
+    # expire_on_commit=False: depois do commit o objeto continua legível sem novo SELECT (lazy load não existe no async)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# --- Estatísticas do Pool ---
+
+def estatisticas_pool(engine_alvo=None) -> Dict[str, Any]:
+    """
+    Situação do pool de conexões DESTE processo (cada worker tem o seu), para dimensionar
+    DB_POOL_SIZE/DB_MAX_OVERFLOW contra o WEB_CONCURRENCY.
+    """
+    engine_alvo = engine_alvo or engine
+    pool = engine_alvo.pool
+    workers = _env_int("WEB_CONCURRENCY", 1)
+    dados = {
+        "pid": os.getpid(),
+        "backend": engine_alvo.dialect.name,
+        "pool": type(pool).__name__,
+        "workers": workers,
+    }
+    # Só o QueuePool (e derivados) têm tamanho/overflow; o pool de conexão única não
+    if hasattr(pool, "checkedout"):
+        tamanho = pool.size()
+        max_overflow = getattr(pool, "_max_overflow", 0)
+        dados.update({
+            "tamanho": tamanho,
+            "max_overflow": max_overflow,
+            "em_uso": pool.checkedout(),
+            "ociosas": pool.checkedin(),
+            # Negativo enquanto o pool ainda não abriu todas as 'tamanho' conexões
+            "overflow": pool.overflow(),
+            "timeout_segundos": getattr(pool, "_timeout", None),
+            "maximo_por_worker": tamanho + max_overflow,
+            "maximo_total": workers * (tamanho + max_overflow),
+        })
+    if engine_alvo.dialect.name == "sqlite":
+        dados["pragmas"] = PRAGMAS_SQLITE
+    return dados
+
 # --- Funções de Injeção de Dependência ---
 
 def get_db():
@@ -39,7 +200,253 @@ def get_db():
         yield db
     finally:
         db.close()
-        
+
+async def get_async_db():
+    """Versão assíncrona do get_db (só disponível com DB_ASYNC=1)."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# -----------------------------------------------------------------
+# --- Rastreamento de Alterações (Sincronização Incremental) ---
+# -----------------------------------------------------------------
+# Toda escrita em Empregado/Tarefa recebe um número de versão global e crescente; toda remoção
+# deixa uma "lápide" em Remocao. O cliente guarda a maior versão que já viu (o token) e pede só
+# o que mudou depois dela (listar_alteracoes), em vez de reler as tabelas inteiras.
+
+TABELAS_RASTREADAS = {"empregados": Empregado, "tarefas": Tarefa}
+# As lápides ficam guardadas por este número de dias (descartar_remocoes_antigas). Um cliente
+# que passar mais tempo sem sincronizar recebe "resync" e refaz a carga completa.
+REMOCOES_DIAS = _env_int("REMOCOES_DIAS", 30)
+
+def agora_utc() -> datetime:
+    """Data/hora atual em UTC, sem fuso (o formato gravado nas colunas DateTime)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def proxima_versao(conn: Connection) -> int:
+    """
+    Reserva a próxima versão dentro da transação atual.
+    O UPDATE trava a linha do contador até o commit: transações concorrentes esperam,
+    e por isso uma versão só fica visível depois de todas as menores já estarem commitadas.
+
+    Custo: todas as transações que gravam passam por esta linha, uma de cada vez, do momento
+    da reserva até o commit. O teto de escritas por segundo do banco inteiro (todos os
+    workers) é ~1 / (tempo médio entre reservar e commitar), medido em flow_versao_trava_segundos
+    (GET /metrics; o benchmark.py imprime o teto). No SQLite isso não muda nada (o banco já
+    aceita um escritor por vez); no PostgreSQL é o limite de vazão das escritas. Por isso:
+    - as escritas de uma linha reservam e fazem o commit logo em seguida;
+    - os trabalhos longos (importação, lote, atribuição automática, desligamento, arquivamento)
+      gravam com versao_provisoria() e só reservam a versão no fim (carimbar_versao), ou
+      reservam depois do trabalho pesado, quando só falta gravar as lápides.
+    """
+    valor = conn.execute(
+        update(ContadorVersao).where(ContadorVersao.id == 1)
+        .values(valor=ContadorVersao.valor + 1).returning(ContadorVersao.valor)
+    ).scalar()
+    if valor is None:
+        # Banco recém-criado: a linha do contador ainda não existe
+        conn.execute(insert(ContadorVersao).values(id=1, valor=1))
+        valor = 1
+    conn.info.setdefault(metricas.CHAVE_VERSAO_RESERVADA, time.perf_counter())
+    return valor
+
+def versao_provisoria() -> int:
+    """
+    Marca negativa e única para as linhas gravadas por um trabalho longo antes de reservar a
+    versão. Só a própria transação enxerga essas linhas; carimbar_versao troca a marca pela versão.
+    """
+    return -1 - secrets.randbelow(2 ** 31)
+
+def carimbar_versao(conn: Connection, provisoria: int, *modelos) -> int:
+    """Reserva a versão (último passo antes do commit) e a grava nas linhas marcadas com 'provisoria'."""
+    versao = proxima_versao(conn)
+    for modelo in modelos:
+        # Pelo índice de 'versao': só as linhas desta transação têm a marca
+        conn.execute(update(modelo.__table__).where(modelo.versao == provisoria).values(versao=versao))
+    return versao
+
+def abrir_escrita(conn: Connection):
+    """
+    Abre a transação de escrita antes das leituras que decidem o que gravar.
+    SQLite: o driver só faz o BEGIN no primeiro INSERT/UPDATE/DELETE, e as leituras anteriores
+    ficariam fora da transação; aqui ela começa com BEGIN IMMEDIATE (a trava de escrita do
+    banco, que no SQLite já serializa os escritores). PostgreSQL: nada a fazer, quem chama lê
+    as linhas com FOR UPDATE.
+    """
+    if conn.dialect.name == "sqlite" and not conn.connection.driver_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+def versao_atual(conn: Connection) -> int:
+    """Maior versão já commitada (o token a devolver ao cliente)."""
+    return conn.execute(select(ContadorVersao.valor).where(ContadorVersao.id == 1)).scalar() or 0
+
+@event.listens_for(Session, "before_flush")
+def _registrar_versoes(session, flush_context, instances):
+    """Numera as linhas criadas/alteradas e registra as removidas, no mesmo flush (e transação)."""
+    alterados = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, (Empregado, Tarefa)) and (obj in session.new or session.is_modified(obj, include_collections=False))
+    ]
+    removidos = [obj for obj in session.deleted if isinstance(obj, (Empregado, Tarefa))]
+    if not alterados and not removidos:
+        return
+
+    versao = proxima_versao(session.connection())
+    agora = agora_utc()
+    for obj in alterados:
+        obj.versao = versao
+        obj.atualizado_em = agora
+    for obj in removidos:
+        session.add(Remocao(tabela=obj.__tablename__, registro_id=obj.id, versao=versao))
+
+# -----------------------------------------------------------------
+# --- Carga de Trabalho (contador de tarefas abertas por empregado) ---
+# -----------------------------------------------------------------
+# Empregado.tarefas_abertas é ajustado por diferença (+1/-1) na mesma transação de cada escrita:
+# - escritas pelo ORM (rotas, funções CRUD deste arquivo, app desktop): hook after_flush abaixo;
+# - escritas em massa pelo Core (importação, operações em lote): chamam aplicar_deltas_carga.
+
+def aplicar_deltas_carga(conn: Connection, deltas: Mapping[int, int]):
+    """
+    Soma os deltas ao contador de cada empregado. Um UPDATE ... WHERE id IN por valor de
+    delta (não por empregado): um lote que fecha uma tarefa de cada um de 50 empregados
+    custa um UPDATE, não 50.
+    """
+    por_delta: Dict[int, List[int]] = {}
+    for empregado_id, delta in deltas.items():
+        if empregado_id is not None and delta:
+            por_delta.setdefault(delta, []).append(empregado_id)
+    for delta, ids in por_delta.items():
+        conn.execute(
+            update(Empregado).where(Empregado.id.in_(ids))
+            .values(tarefas_abertas=Empregado.tarefas_abertas + delta)
+        )
+
+def deltas_de_insercao(linhas) -> Counter:
+    """Deltas de carga para tarefas novas (dicionários com empregado_id/concluida)."""
+    return Counter(
+        linha.get("empregado_id") for linha in linhas
+        if linha.get("empregado_id") is not None and not linha.get("concluida")
+    )
+
+def _valor_anterior(obj, atributo: str):
+    """Valor do atributo antes das mudanças ainda não gravadas (o que está no banco)."""
+    historico = attributes.get_history(obj, atributo)
+    if historico.deleted:
+        return historico.deleted[0]
+    if historico.unchanged:
+        return historico.unchanged[0]
+    return getattr(obj, atributo)
+
+@event.listens_for(Session, "after_flush")
+def _atualizar_carga(session, flush_context):
+    """Calcula os deltas de carga das tarefas criadas, alteradas e removidas neste flush."""
+    deltas = Counter()
+    for obj in session.new:
+        if isinstance(obj, Tarefa) and obj.empregado_id is not None and not obj.concluida:
+            deltas[obj.empregado_id] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Tarefa) and not _valor_anterior(obj, "concluida"):
+            deltas[_valor_anterior(obj, "empregado_id")] -= 1
+    for obj in session.dirty:
+        if not isinstance(obj, Tarefa) or obj in session.deleted:
+            continue
+        antes = (_valor_anterior(obj, "empregado_id"), bool(_valor_anterior(obj, "concluida")))
+        depois = (obj.empregado_id, bool(obj.concluida))
+        if antes == depois:
+            continue
+        if not antes[1]:
+            deltas[antes[0]] -= 1
+        if not depois[1]:
+            deltas[depois[0]] += 1
+    if deltas:
+        aplicar_deltas_carga(session.connection(), deltas)
+
+def reconciliar_carga_trabalho(db_session: Session, corrigir: bool = True) -> List[dict]:
+    """
+    Recalcula a carga de todos os empregados a partir de 'tarefas' e devolve as divergências
+    (empregado_id, nome, registrado, real). Com corrigir=True, grava os valores reais.
+    """
+    reais = select(
+        Tarefa.empregado_id.label("empregado_id"), func.count(Tarefa.id).label("abertas")
+    ).where(Tarefa.concluida == False, Tarefa.empregado_id.isnot(None)).group_by(Tarefa.empregado_id).subquery()
+
+    real = func.coalesce(reais.c.abertas, 0)
+    linhas = db_session.execute(
+        select(Empregado.id, Empregado.nome, Empregado.tarefas_abertas, real)
+        .outerjoin(reais, reais.c.empregado_id == Empregado.id)
+        .where(Empregado.tarefas_abertas != real)
+        .order_by(Empregado.id)
+    ).all()
+    divergencias = [
+        {"empregado_id": i, "nome": nome, "registrado": registrado, "real": valor_real}
+        for i, nome, registrado, valor_real in linhas
+    ]
+
+    if corrigir and divergencias:
+        conn = db_session.connection()
+        for d in divergencias:
+            conn.execute(update(Empregado).where(Empregado.id == d["empregado_id"]).values(tarefas_abertas=d["real"]))
+        db_session.commit()
+    return divergencias
+
+def _remocoes_descartadas_ate(conn: Connection) -> int:
+    return conn.execute(select(ContadorVersao.remocoes_ate).where(ContadorVersao.id == 1)).scalar() or 0
+
+def listar_alteracoes(db_session: Session, desde: Optional[int] = None) -> dict:
+    """
+    Devolve o que mudou depois da versão 'desde': linhas criadas/alteradas (estado atual)
+    e IDs removidos, por tabela. Sem 'desde', devolve só o token atual (ponto de partida
+    para o cliente, que então faz a carga inicial pelas listagens paginadas).
+    Com "resync": True, as lápides de que o cliente precisava já foram descartadas
+    (descartar_remocoes_antigas): ele tem de refazer a carga completa.
+    """
+    # O token é lido ANTES das linhas: uma escrita que acontecer no meio aparece de novo
+    # na próxima sincronização (reaplicar é inofensivo), mas nunca fica de fora.
+    conn = db_session.connection()
+    token = versao_atual(conn)
+    resultado = {"token": token, "resync": False, "alterados": {}, "removidos": {}}
+    if desde is None:
+        return resultado
+    if desde < _remocoes_descartadas_ate(conn):
+        return {**resultado, "resync": True}
+
+    colunas = {"empregados": COLUNAS_API_EMPREGADO, "tarefas": COLUNAS_API_TAREFA}
+    for nome, modelo in TABELAS_RASTREADAS.items():
+        # Só as colunas da API (linhas simples, sem montar objetos do ORM)
+        resultado["alterados"][nome] = db_session.execute(
+            select(*colunas[nome]).where(modelo.versao > desde).order_by(modelo.versao, modelo.id)
+        ).all()
+        resultado["removidos"][nome] = db_session.scalars(
+            select(Remocao.registro_id).where(Remocao.tabela == nome, Remocao.versao > desde).order_by(Remocao.versao)
+        ).all()
+    # Conferido de novo depois da leitura: um descarte que terminou no meio dela pode ter
+    # levado lápides que este cliente ainda não tinha recebido
+    if desde < _remocoes_descartadas_ate(conn):
+        return {"token": token, "resync": True, "alterados": {}, "removidos": {}}
+    return resultado
+
+def descartar_remocoes_antigas(db_session: Session, dias: int = REMOCOES_DIAS) -> int:
+    """
+    Apaga as lápides com mais de 'dias' dias e guarda em contador_versao.remocoes_ate a maior
+    versão descartada: dali em diante, um GET /changes com token menor pede a carga completa.
+    Retorna quantas lápides foram apagadas.
+    """
+    conn = db_session.connection()
+    limite = conn.execute(
+        select(func.max(Remocao.versao)).where(Remocao.removida_em < agora_utc() - timedelta(days=dias))
+    ).scalar()
+    if limite is None:
+        db_session.rollback()
+        return 0
+    # Piso e DELETE na mesma transação: quem não encontrar as lápides já encontra o piso novo
+    conn.execute(
+        update(ContadorVersao).where(ContadorVersao.id == 1, ContadorVersao.remocoes_ate < limite)
+        .values(remocoes_ate=limite)
+    )
+    apagadas = conn.execute(Remocao.__table__.delete().where(Remocao.versao <= limite)).rowcount
+    db_session.commit()
+    return apagadas
+
 # -----------------------------------------------------------------
 # --- Funções CRUD (Busca e Leitura) ---
 # -----------------------------------------------------------------
@@ -60,26 +467,142 @@ def get_tarefas(db_session: Session, skip: int = 0, limit: int = 100):
     """Lista todas as tarefas com paginação (útil para APIs)."""
     return db_session.query(Tarefa).offset(skip).limit(limit).all()
 
+# --- PAGINAÇÃO POR CURSOR (KEYSET) ---
+
+# Tamanho das páginas das listagens (o cliente pode pedir menos, nunca mais que o máximo)
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 1000
+
+# Em vez de OFFSET (que obriga o banco a percorrer todas as linhas puladas), o cursor
+# guarda a chave da última linha entregue e a próxima página começa com "WHERE chave > cursor".
+# O custo de cada página é o mesmo, não importa o quão fundo o cliente já paginou.
+
+def codificar_cursor(valores: dict) -> str:
+    """Transforma a chave da última linha da página em um token opaco (base64 de JSON)."""
+    bruto = json.dumps(valores, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+def decodificar_cursor(cursor: str) -> dict:
+    """Lê um token gerado por codificar_cursor. Levanta ValueError se o token for inválido."""
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+    except Exception as e:
+        raise ValueError("Cursor inválido.") from e
+    if not isinstance(valores, dict) or not isinstance(valores.get("id"), int):
+        raise ValueError("Cursor inválido.")
+    return valores
+
+# Colunas devolvidas pelas listagens da API (os campos de EmpregadoSchema/TarefaSchema).
+# As listagens selecionam só essas colunas e recebem linhas simples (Row), não objetos do ORM:
+# sem montar entidades, identity map e estado de cada uma, e sem as colunas internas
+# (versao, atualizado_em, tarefas_abertas) que a resposta descartaria.
+COLUNAS_API_EMPREGADO = (Empregado.id, Empregado.nome, Empregado.cargo, Empregado.email)
+COLUNAS_API_TAREFA = (
+    Tarefa.id, Tarefa.titulo, Tarefa.descricao, Tarefa.prazo,
+    Tarefa.empregado_id, Tarefa.concluida, Tarefa.esforco_horas,
+)
+
+def consulta_empregados_keyset(limite: int = 100, cursor: Optional[str] = None) -> Select:
+    """Monta o SELECT de uma página de empregados (ordenados por ID). Busca limite + 1 linhas."""
+    stmt = select(*COLUNAS_API_EMPREGADO)
+    if cursor:
+        stmt = stmt.where(Empregado.id > decodificar_cursor(cursor)["id"])
+    # Busca uma linha a mais só para saber se existe uma próxima página
+    return stmt.order_by(Empregado.id.asc()).limit(limite + 1)
+
+def consulta_tarefas_keyset(
+    limite: int = 100,
+    cursor: Optional[str] = None,
+    ordenar: str = "id",
+    concluida: Optional[bool] = None,
+    empregado_id: Optional[int] = None,
+    prazo_de: Optional[date] = None,
+    prazo_ate: Optional[date] = None,
+) -> Select:
+    """
+    Monta o SELECT de uma página de tarefas, com os filtros aplicados no próprio SQL.
+    A ordenação pode ser por 'id' ou por 'prazo' (desempate pelo id). Busca limite + 1 linhas.
+    """
+    stmt = select(*COLUNAS_API_TAREFA)
+
+    if concluida is not None:
+        stmt = stmt.where(Tarefa.concluida == concluida)
+    if empregado_id is not None:
+        stmt = stmt.where(Tarefa.empregado_id == empregado_id)
+    if prazo_de is not None:
+        stmt = stmt.where(Tarefa.prazo >= prazo_de)
+    if prazo_ate is not None:
+        stmt = stmt.where(Tarefa.prazo <= prazo_ate)
+
+    if ordenar == "prazo":
+        if cursor:
+            chave = decodificar_cursor(cursor)
+            try:
+                prazo_cursor = date.fromisoformat(chave["prazo"])
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError("Cursor inválido.") from e
+            # Comparação de tupla (prazo, id) > (x, y) sobre o prazo de ordenação (sem prazo = no
+            # fim). O ">=" sozinho é o que deixa o SQLite começar a leitura do índice no cursor.
+            stmt = stmt.where(
+                PRAZO_ORDENACAO >= prazo_cursor,
+                tuple_(PRAZO_ORDENACAO, Tarefa.id) > tuple_(prazo_cursor, chave["id"]),
+            )
+        stmt = stmt.order_by(PRAZO_ORDENACAO.asc(), Tarefa.id.asc())
+    else:
+        if cursor:
+            stmt = stmt.where(Tarefa.id > decodificar_cursor(cursor)["id"])
+        stmt = stmt.order_by(Tarefa.id.asc())
+
+    return stmt.limit(limite + 1)
+
+def fechar_pagina(itens: list, limite: int, ordenar: str = "id") -> Tuple[list, Optional[str]]:
+    """Recebe as limite + 1 linhas da consulta e devolve (página, cursor da próxima página ou None)."""
+    if len(itens) <= limite:
+        return itens, None
+    itens = itens[:limite]
+    ultimo = itens[-1]
+    if ordenar == "prazo":
+        # Mesmo valor de PRAZO_ORDENACAO: a última tarefa da página pode não ter prazo
+        return itens, codificar_cursor({"prazo": (ultimo.prazo or date.max).isoformat(), "id": ultimo.id})
+    return itens, codificar_cursor({"id": ultimo.id})
+
+def listar_empregados_keyset(db_session: Session, limite: int = 100, cursor: Optional[str] = None) -> Tuple[List[Row], Optional[str]]:
+    """Lista empregados ordenados por ID, uma página por vez. Retorna (linhas, próximo cursor)."""
+    itens = db_session.execute(consulta_empregados_keyset(limite, cursor)).all()
+    return fechar_pagina(itens, limite)
+
+def listar_tarefas_keyset(db_session: Session, limite: int = 100, cursor: Optional[str] = None, ordenar: str = "id", **filtros) -> Tuple[List[Row], Optional[str]]:
+    """Lista tarefas uma página por vez (ver consulta_tarefas_keyset). Retorna (linhas, próximo cursor)."""
+    itens = db_session.execute(consulta_tarefas_keyset(limite, cursor, ordenar, **filtros)).all()
+    return fechar_pagina(itens, limite, ordenar)
+
 # --- NOVAS FUNÇÕES DE LEITURA E RELATÓRIO ---
 
 def get_tarefas_by_empregado_id(db_session: Session, empregado_id: int):
     """Lista todas as tarefas atribuídas a um empregado específico."""
     return db_session.query(Tarefa).filter(Tarefa.empregado_id == empregado_id).all()
 
-def listar_proximas_tarefas(db_session: Session = SessionLocal()):
+def listar_proximas_tarefas(db_session: Optional[Session] = None):
     """
     Lista tarefas pendentes (limitado a 5), ordenadas por prazo. 
     Inclui o nome do empregado responsável para exibição no Dashboard.
+    Sem 'db_session' abre (e fecha) uma sessão própria: o app desktop chama de threads diferentes.
     """
-    
-    # Faz um LEFT OUTER JOIN para incluir o nome do empregado (mesmo que seja NULO)
+    if db_session is None:
+        with SessionLocal() as sessao:
+            return listar_proximas_tarefas(sessao)
+
+    # Faz um LEFT OUTER JOIN para incluir o nome do empregado (mesmo que seja NULO).
+    # O filtro + ordenação são servidos pelo índice (concluida, prazo, id): o banco lê só as 5 primeiras entradas.
     tarefas_com_empregado = db_session.query(
         Tarefa, 
         Empregado.nome.label('empregado_nome') # Renomeia o campo nome do empregado
     ).outerjoin(
         Empregado, Tarefa.empregado_id == Empregado.id
     ).filter(
-        Tarefa.concluida == False
+        Tarefa.concluida == False,
+        Tarefa.prazo.isnot(None) # Tarefa sem prazo não é "urgente"
     ).order_by(
         Tarefa.prazo.asc()
     ).limit(5).all() # Limita a 5 para o preview
@@ -93,69 +616,457 @@ def listar_proximas_tarefas(db_session: Session = SessionLocal()):
         
     return resultado
 
+# --- ESTATÍSTICAS (AGREGAÇÕES NO BANCO) ---
+# Tudo é calculado com GROUP BY/SUM no SQL, em uma consulta: a resposta tem poucas centenas
+# de bytes em vez da lista inteira de tarefas. As colunas usadas estão nos índices de Tarefa.
+
+def _somar_se(condicao):
+    return func.coalesce(func.sum(case((condicao, 1), else_=0)), 0)
+
+def estatisticas_por_empregado(db_session: Optional[Session] = None, hoje: Optional[date] = None) -> List[dict]:
+    """Pendentes, atrasadas e concluídas por empregado (inclui quem não tem tarefas)."""
+    hoje = hoje or date.today()
+    sessao = db_session or SessionLocal()
+    try:
+        contagens = select(
+            Tarefa.empregado_id.label("empregado_id"),
+            _somar_se(Tarefa.concluida == False).label("pendentes"),
+            _somar_se((Tarefa.concluida == False) & (Tarefa.prazo < hoje)).label("atrasadas"),
+            _somar_se(Tarefa.concluida == True).label("concluidas"),
+        ).where(Tarefa.empregado_id.isnot(None)).group_by(Tarefa.empregado_id).subquery()
+
+        linhas = sessao.execute(
+            select(
+                Empregado.id, Empregado.nome,
+                func.coalesce(contagens.c.pendentes, 0), func.coalesce(contagens.c.atrasadas, 0),
+                func.coalesce(contagens.c.concluidas, 0),
+            ).outerjoin(contagens, contagens.c.empregado_id == Empregado.id).order_by(Empregado.id)
+        ).all()
+        return [
+            {"empregado_id": i, "nome": nome, "pendentes": p, "atrasadas": a, "concluidas": c}
+            for i, nome, p, a, c in linhas
+        ]
+    finally:
+        if db_session is None:
+            sessao.close()
+
+def estatisticas_dashboard(db_session: Optional[Session] = None, hoje: Optional[date] = None) -> dict:
+    """Totais do Dashboard em uma única consulta. "Esta semana" vai de hoje até o domingo."""
+    hoje = hoje or date.today()
+    domingo = hoje + timedelta(days=6 - hoje.weekday())
+    pendente = Tarefa.concluida == False
+    sessao = db_session or SessionLocal()
+    try:
+        linha = sessao.execute(select(
+            func.count(Tarefa.id),
+            _somar_se(pendente),
+            _somar_se(pendente & (Tarefa.prazo < hoje)),
+            _somar_se(Tarefa.concluida == True),
+            _somar_se(pendente & Tarefa.prazo.between(hoje, domingo)),
+            _somar_se(pendente & Tarefa.empregado_id.is_(None)),
+        )).one()
+        chaves = ("total", "pendentes", "atrasadas", "concluidas", "vencem_esta_semana", "sem_responsavel")
+        return dict(zip(chaves, linha))
+    finally:
+        if db_session is None:
+            sessao.close()
+
 # -----------------------------------------------------------------
-# --- Funções CRUD (Criação) ---
+# --- Funções CRUD (escrita em uma ida ao banco por comando) ---
 # -----------------------------------------------------------------
+# Usadas pelas rotas da API. Em vez de "commit + refresh" (um SELECT a mais depois de cada
+# gravação) e de "SELECT antes do DELETE", cada escrita é um único INSERT/UPDATE/DELETE com
+# RETURNING (SQLite 3.35+ e PostgreSQL), que já devolve a linha gravada. Como o Core não passa
+# pelos hooks do ORM, a versão, as lápides e a carga são gravadas aqui, na mesma transação.
+# Todas fazem o commit; as que recebem um id devolvem None/False se ele não existe.
+
+_COLUNAS_EMPREGADO = tuple(Empregado.__table__.c)
+_COLUNAS_TAREFA = tuple(Tarefa.__table__.c)
+# Colunas que a API não aceita gravar como NULL num PATCH
+CAMPOS_OBRIGATORIOS = {"empregados": ("nome", "cargo", "email"), "tarefas": ("titulo", "prazo", "concluida")}
+
+def _dados(modelo: Any, parcial: bool = False) -> Dict[str, Any]:
+    """Campos de um schema Pydantic (só os enviados, se parcial) ou de um dict."""
+    if isinstance(modelo, Mapping):
+        return dict(modelo)
+    return modelo.model_dump(exclude_unset=parcial)
+
+def _conferir_obrigatorios(tabela: str, campos: Mapping[str, Any]):
+    for campo in CAMPOS_OBRIGATORIOS[tabela]:
+        if campo in campos and campos[campo] is None:
+            raise ValueError(f"O campo '{campo}' não pode ser nulo.")
+
+def _carimbo(conn: Connection) -> Dict[str, Any]:
+    return {"versao": proxima_versao(conn), "atualizado_em": agora_utc()}
 
 def create_empregado(db_session: Session, empregado_data: Any):
-    """Cria e salva um novo empregado."""
-    # .dict() será removido no Pydantic V2. O método .model_dump() é preferido.
-    # Assumindo Pydantic V1 ou que o .dict() ainda funciona:
-    db_empregado = Empregado(**empregado_data.dict()) 
-    
-    db_session.add(db_empregado)
+    """Cria o empregado e devolve a linha gravada (com o id)."""
+    conn = db_session.connection()
+    linha = conn.execute(
+        insert(Empregado.__table__).values(**_dados(empregado_data), tarefas_abertas=0, **_carimbo(conn))
+        .returning(*_COLUNAS_EMPREGADO)
+    ).one()
     db_session.commit()
-    db_session.refresh(db_empregado) # Recarrega para obter o ID
-    return db_empregado
+    return linha
 
 def create_tarefa(db_session: Session, tarefa_data: Any):
-    """Cria e salva uma nova tarefa."""
-    db_tarefa = Tarefa(**tarefa_data.dict())
-    
-    db_session.add(db_tarefa)
+    """Cria a tarefa e devolve a linha gravada (com o id)."""
+    dados = _dados(tarefa_data)
+    conn = db_session.connection()
+    linha = conn.execute(
+        insert(Tarefa.__table__).values(**dados, **_carimbo(conn)).returning(*_COLUNAS_TAREFA)
+    ).one()
+    aplicar_deltas_carga(conn, deltas_de_insercao([dados]))
     db_session.commit()
-    db_session.refresh(db_tarefa)
-    return db_tarefa
+    return linha
 
-# -----------------------------------------------------------------
-# --- Funções CRUD (Atualização) ---
-# -----------------------------------------------------------------
+def _mudou(tabela, campos: Dict[str, Any]):
+    """Condição do UPDATE parcial: algum campo enviado difere do gravado (NULL incluído)."""
+    return or_(*(tabela.c[campo].is_distinct_from(valor) for campo, valor in campos.items()))
 
-def update_empregado(db_session: Session, db_empregado: Empregado, empregado_data: Any):
-    """Atualiza as informações de um empregado existente."""
-    # .dict() será removido no Pydantic V2. O método .model_dump() é preferido.
-    data_to_update = empregado_data.dict(exclude_unset=True) # exclude_unset ignora campos não enviados (para PATCH)
-    
-    for key, value in data_to_update.items():
-        setattr(db_empregado, key, value)
-        
+def _sem_mudanca(db_session: Session, colunas, coluna_id, registro_id: int) -> Tuple[Optional[Row], bool]:
+    """O UPDATE não gravou nada: desfaz a versão reservada e lê a linha como está (None se não existe)."""
+    db_session.rollback()
+    return db_session.execute(select(*colunas).where(coluna_id == registro_id)).first(), False
+
+def update_empregado(db_session: Session, empregado_id: int, empregado_data: Any) -> Tuple[Optional[Row], bool]:
+    """
+    Atualização parcial (só os campos enviados). Devolve (linha, alterada): linha None se o
+    empregado não existe; alterada False se nada mudou (corpo vazio ou valores iguais aos
+    gravados). Sem mudança não há escrita, nem versão nova.
+    """
+    campos = _dados(empregado_data, parcial=True)
+    _conferir_obrigatorios("empregados", campos)
+    if not campos:
+        return _sem_mudanca(db_session, _COLUNAS_EMPREGADO, Empregado.id, empregado_id)
+    conn = db_session.connection()
+    linha = conn.execute(
+        update(Empregado.__table__).where(Empregado.id == empregado_id, _mudou(Empregado.__table__, campos))
+        .values(**campos, **_carimbo(conn)).returning(*_COLUNAS_EMPREGADO)
+    ).first()
+    if linha is None:
+        return _sem_mudanca(db_session, _COLUNAS_EMPREGADO, Empregado.id, empregado_id)
     db_session.commit()
-    db_session.refresh(db_empregado)
-    return db_empregado
+    return linha, True
 
-def update_tarefa(db_session: Session, db_tarefa: Tarefa, tarefa_data: Any):
-    """Atualiza uma tarefa existente."""
-    data_to_update = tarefa_data.dict(exclude_unset=True) 
+def update_tarefa(db_session: Session, tarefa_id: int, tarefa_data: Any) -> Tuple[Optional[Row], bool]:
+    """
+    Atualização parcial (só os campos enviados). Devolve (linha, alterada), como update_empregado.
+    Só quando o responsável ou a conclusão mudam é que o estado anterior é lido (para a carga).
+    """
+    campos = _dados(tarefa_data, parcial=True)
+    _conferir_obrigatorios("tarefas", campos)
+    if not campos:
+        return _sem_mudanca(db_session, _COLUNAS_TAREFA, Tarefa.id, tarefa_id)
+    conn = db_session.connection()
+    # A versão é reservada antes da leitura: o contador fica travado até o commit
+    carimbo = _carimbo(conn)
+    anterior = None
+    if "empregado_id" in campos or "concluida" in campos:
+        anterior = conn.execute(
+            select(Tarefa.empregado_id, Tarefa.concluida).where(Tarefa.id == tarefa_id).with_for_update()
+        ).first()
+        if anterior is None:
+            db_session.rollback()
+            return None, False
+    linha = conn.execute(
+        update(Tarefa.__table__).where(Tarefa.id == tarefa_id, _mudou(Tarefa.__table__, campos))
+        .values(**campos, **carimbo).returning(*_COLUNAS_TAREFA)
+    ).first()
+    if linha is None:
+        return _sem_mudanca(db_session, _COLUNAS_TAREFA, Tarefa.id, tarefa_id)
+    if anterior is not None:
+        deltas = Counter()
+        if not anterior.concluida:
+            deltas[anterior.empregado_id] -= 1
+        if not linha.concluida:
+            deltas[linha.empregado_id] += 1
+        aplicar_deltas_carga(conn, deltas)
+    db_session.commit()
+    return linha, True
 
-    for key, value in data_to_update.items():
-        setattr(db_tarefa, key, value)
-        
+def desligar_empregado(db_session: Session, empregado_id: int, transferir_para: Optional[int] = None) -> Optional[Dict]:
+    """
+    Desligamento: passa as tarefas do empregado para 'transferir_para' (None = deixa sem
+    responsável) e apaga o empregado, numa transação. Um UPDATE ... WHERE empregado_id = :id
+    move todas as tarefas sem carregá-las (memória constante, não importa quantas sejam).
+    Devolve o resumo ou None se o empregado não existe. ValueError se o destino é inválido.
+    """
+    if transferir_para == empregado_id:
+        raise ValueError("O empregado não pode receber as próprias tarefas.")
+    conn = db_session.connection()
+    if transferir_para is not None:
+        if conn.execute(select(Empregado.id).where(Empregado.id == transferir_para)).scalar() is None:
+            raise ValueError(f"Empregado {transferir_para} não encontrado.")
+    # O empregado fica travado até o commit (nenhuma tarefa nova aponta para ele no meio do caminho)
+    abrir_escrita(conn)
+    if conn.execute(select(Empregado.id).where(Empregado.id == empregado_id).with_for_update()).scalar() is None:
+        db_session.rollback()
+        return None
+    # Versão nova nas tarefas (o GET /changes entrega o novo responsável aos clientes), reservada
+    # só no fim: até lá elas levam uma marca provisória, que também serve para contar as abertas
+    # entre as linhas que o próprio UPDATE travou
+    provisoria = versao_provisoria()
+    transferidas = conn.execute(
+        update(Tarefa.__table__).where(Tarefa.empregado_id == empregado_id)
+        .values(empregado_id=transferir_para, versao=provisoria, atualizado_em=agora_utc())
+    ).rowcount
+    abertas = conn.execute(
+        select(func.count()).select_from(Tarefa).where(Tarefa.versao == provisoria, Tarefa.concluida == False)
+    ).scalar() if transferidas else 0
+    # Nenhuma tarefa aponta mais para ele; se alguma entrou por fora, o ON DELETE SET NULL resolve
+    conn.execute(Empregado.__table__.delete().where(Empregado.id == empregado_id))
+    aplicar_deltas_carga(conn, {transferir_para: abertas})
+    versao = carimbar_versao(conn, provisoria, Tarefa)
+    conn.execute(insert(Remocao).values(tabela="empregados", registro_id=empregado_id, versao=versao))
     db_session.commit()
-    db_session.refresh(db_tarefa)
-    return db_tarefa
+    return {"empregado_id": empregado_id, "transferir_para": transferir_para,
+            "tarefas_transferidas": transferidas, "tarefas_abertas": abertas, "versao": versao}
+
+def delete_empregado(db_session: Session, empregado_id: int) -> bool:
+    """Apaga o empregado; as tarefas dele ficam sem responsável. False se não existe."""
+    return desligar_empregado(db_session, empregado_id) is not None
+
+def delete_tarefa(db_session: Session, tarefa_id: int) -> bool:
+    """Apaga a tarefa sem lê-la antes (o RETURNING traz o que a carga precisa). False se não existe."""
+    conn = db_session.connection()
+    versao = proxima_versao(conn)
+    apagada = conn.execute(
+        Tarefa.__table__.delete().where(Tarefa.id == tarefa_id).returning(Tarefa.empregado_id, Tarefa.concluida)
+    ).first()
+    if apagada is None:
+        db_session.rollback()
+        return False
+    conn.execute(insert(Remocao).values(tabela="tarefas", registro_id=tarefa_id, versao=versao))
+    if not apagada.concluida:
+        aplicar_deltas_carga(conn, {apagada.empregado_id: -1})
+    db_session.commit()
+    return True
 
 # -----------------------------------------------------------------
-# --- Funções CRUD (Exclusão) ---
+# --- Funções do App Desktop (app.py) ---
 # -----------------------------------------------------------------
+# Cada função abre e fecha a própria sessão: o app chama estas funções de threads do
+# executor em segundo plano (executor_ui.py), nunca da thread do Tk. As escritas devolvem
+# True/False (o app mostra a mensagem de erro) e avisam a API rodando na mesma máquina
+# (versoes.py) para que os ETags dela não fiquem velhos.
 
-def delete_empregado(db_session: Session, db_empregado: Empregado):
-    """Deleta um empregado."""
-    db_session.delete(db_empregado)
-    db_session.commit()
-    return {"message": "Empregado deletado com sucesso"}
+def _avisar_api(*tabelas: str):
+    import versoes  # Import tardio: versoes.py importa este módulo
+    versoes.incrementar(*tabelas)
 
-def delete_tarefa(db_session: Session, db_tarefa: Tarefa):
-    """Deleta uma tarefa."""
-    db_session.delete(db_tarefa)
-    db_session.commit()
-    return {"message": "Tarefa deletada com sucesso"}
+def _converter_prazo(prazo) -> Optional[date]:
+    """Aceita date ou texto AAAA-MM-DD (o formulário do app). Levanta ValueError se inválido."""
+    if prazo is None or isinstance(prazo, date):
+        return prazo
+    return date.fromisoformat(str(prazo).strip())
+
+def _escrever_desktop(operacao, *tabelas: str) -> bool:
+    """Roda operacao(sessao) em uma transação. Retorna False (e desfaz) em caso de erro."""
+    with SessionLocal() as sessao:
+        try:
+            if operacao(sessao) is False:
+                return False
+            sessao.commit()
+        except Exception as e:
+            sessao.rollback()
+            print(f"Erro ao gravar no banco: {e}")
+            return False
+    _avisar_api(*tabelas)
+    return True
+
+def adicionar_empregado(nome: str, cargo: str, email: str) -> bool:
+    return _escrever_desktop(lambda s: s.add(Empregado(nome=nome, cargo=cargo, email=email)), "empregados")
+
+def listar_empregados() -> List[Empregado]:
+    with SessionLocal() as sessao:
+        return sessao.scalars(select(Empregado).order_by(Empregado.id)).all()
+
+def buscar_empregado_por_id(empregado_id) -> Optional[Empregado]:
+    with SessionLocal() as sessao:
+        return sessao.get(Empregado, int(empregado_id))
+
+def atualizar_empregado(empregado_id, nome: str, cargo: str, email: str) -> bool:
+    def operacao(sessao):
+        empregado = sessao.get(Empregado, int(empregado_id))
+        if empregado is None:
+            return False
+        empregado.nome, empregado.cargo, empregado.email = nome, cargo, email
+    return _escrever_desktop(operacao, "empregados")
+
+def deletar_empregado(empregado_id, transferir_para: Optional[int] = None) -> bool:
+    """Desliga o empregado (desligar_empregado): as tarefas vão para transferir_para ou ficam sem responsável."""
+    return _escrever_desktop(lambda s: desligar_empregado(s, int(empregado_id), transferir_para) is not None,
+                             "empregados", "tarefas")
+
+def adicionar_tarefa(titulo: str, descricao: Optional[str], prazo, empregado_id: Optional[int] = None) -> bool:
+    def operacao(sessao):
+        sessao.add(Tarefa(titulo=titulo, descricao=descricao, prazo=_converter_prazo(prazo),
+                          empregado_id=empregado_id, concluida=False))
+    return _escrever_desktop(operacao, "empregados", "tarefas")
+
+def listar_tarefas() -> List[Tarefa]:
+    with SessionLocal() as sessao:
+        return sessao.scalars(select(Tarefa).order_by(Tarefa.id)).all()
+
+def buscar_tarefa_por_id(tarefa_id) -> Optional[Tarefa]:
+    with SessionLocal() as sessao:
+        return sessao.get(Tarefa, int(tarefa_id))
+
+def atualizar_tarefa(tarefa_id, titulo: str, descricao: Optional[str], prazo, empregado_id: Optional[int], concluida: bool) -> bool:
+    def operacao(sessao):
+        tarefa = sessao.get(Tarefa, int(tarefa_id))
+        if tarefa is None:
+            return False
+        tarefa.titulo, tarefa.descricao, tarefa.prazo = titulo, descricao, _converter_prazo(prazo)
+        tarefa.empregado_id, tarefa.concluida = empregado_id, bool(concluida)
+    return _escrever_desktop(operacao, "empregados", "tarefas")
+
+def deletar_tarefa(tarefa_id) -> bool:
+    def operacao(sessao):
+        tarefa = sessao.get(Tarefa, int(tarefa_id))
+        if tarefa is None:
+            return False
+        sessao.delete(tarefa)
+    return _escrever_desktop(operacao, "empregados", "tarefas")
+
+def operar_tarefas_em_lote(operacao: str, ids: Sequence[int], empregado_id: Optional[int] = None) -> Optional[dict]:
+    """Concluir/reabrir/atribuir/deletar as tarefas selecionadas (lote.py). None em caso de erro."""
+    from lote import aplicar_operacao_lote  # lote.py importa este módulo
+    resultado = {}
+    if not _escrever_desktop(lambda s: resultado.update(aplicar_operacao_lote(s, operacao, ids, empregado_id)), "empregados", "tarefas"):
+        return None
+    return resultado
+
+# --- LISTAS VIRTUAIS DO APP DESKTOP (PÁGINAS POR CURSOR, EM QUALQUER COLUNA) ---
+# A lista do app mostra só uma janela de linhas e busca a página seguinte/anterior conforme
+# a rolagem. Ordenação e filtro vão para o SQL; a posição na lista é a chave (valor da coluna
+# de ordenação, id). Colunas que aceitam NULL entram com coalesce para a comparação de tupla
+# continuar válida (NULL não é maior nem menor que nada).
+
+ORDENACAO_EMPREGADOS_DESKTOP = {
+    "id": Empregado.id,
+    "nome": func.coalesce(Empregado.nome, ""),
+    "cargo": func.coalesce(Empregado.cargo, ""),
+    "email": func.coalesce(Empregado.email, ""),
+}
+
+ORDENACAO_TAREFAS_DESKTOP = {
+    "id": Tarefa.id,
+    "titulo": func.coalesce(Tarefa.titulo, ""),
+    "prazo": func.coalesce(Tarefa.prazo, date.max),  # Sem prazo fica no fim
+    "empregado": func.coalesce(Empregado.nome, ""),
+    "concluida": func.coalesce(Tarefa.concluida, False),
+}
+
+def _pagina_por_chave(sessao: Session, stmt: Select, expressao, coluna_id, decrescente: bool,
+                      cursor: Optional[Tuple] = None, direcao: str = "depois", inclusivo: bool = False,
+                      limite: int = 200) -> list:
+    """
+    Uma página a partir de 'cursor' (valor de ordenação, id), na ordem pedida.
+    direcao="antes" busca as linhas imediatamente anteriores ao cursor (rolagem para cima).
+    Devolve as linhas sempre na ordem de exibição.
+    """
+    # Rolar para cima = ler no sentido contrário e inverter o resultado
+    crescente = (not decrescente) if direcao == "depois" else decrescente
+    if cursor is not None:
+        chave = tuple_(expressao, coluna_id)
+        valor = tuple_(cursor[0], cursor[1])
+        if crescente:
+            stmt = stmt.where(chave >= valor if inclusivo else chave > valor)
+        else:
+            stmt = stmt.where(chave <= valor if inclusivo else chave < valor)
+    if crescente:
+        stmt = stmt.order_by(expressao.asc(), coluna_id.asc())
+    else:
+        stmt = stmt.order_by(expressao.desc(), coluna_id.desc())
+    linhas = sessao.execute(stmt.add_columns(expressao.label("valor_ordem")).limit(limite)).all()
+    return linhas if direcao == "depois" else linhas[::-1]
+
+def pagina_empregados_desktop(ordenar: str = "id", decrescente: bool = False, filtro: str = "",
+                              cursor: Optional[Tuple] = None, direcao: str = "depois",
+                              inclusivo: bool = False, limite: int = 200,
+                              ids: Optional[Sequence[int]] = None) -> List[dict]:
+    """
+    Página de empregados para a lista virtual. 'filtro' procura em nome, cargo e email.
+    Com 'ids', devolve só esses empregados (os que ainda passam no filtro), sem limite.
+    """
+    stmt = select(Empregado.id, Empregado.nome, Empregado.cargo, Empregado.email)
+    if ids is not None:
+        stmt, limite = stmt.where(Empregado.id.in_(ids)), max(len(ids), 1)
+    if filtro:
+        padrao = f"%{filtro}%"
+        stmt = stmt.where(Empregado.nome.ilike(padrao) | Empregado.cargo.ilike(padrao) | Empregado.email.ilike(padrao))
+    with SessionLocal() as sessao:
+        linhas = _pagina_por_chave(sessao, stmt, ORDENACAO_EMPREGADOS_DESKTOP[ordenar], Empregado.id,
+                                   decrescente, cursor, direcao, inclusivo, limite)
+    return [
+        {"id": l.id, "nome": l.nome, "cargo": l.cargo, "email": l.email, "chave": (l.valor_ordem, l.id)}
+        for l in linhas
+    ]
+
+def pagina_tarefas_desktop(ordenar: str = "id", decrescente: bool = False, filtro: str = "",
+                           situacao: str = "todas", cursor: Optional[Tuple] = None, direcao: str = "depois",
+                           inclusivo: bool = False, limite: int = 200,
+                           ids: Optional[Sequence[int]] = None) -> List[dict]:
+    """
+    Página de tarefas (com o nome do responsável) para a lista virtual.
+    'filtro' usa o índice de busca textual (título e descrição, ver busca.py);
+    'situacao' é "todas", "pendentes" ou "concluidas".
+    Com 'ids', devolve só essas tarefas (as que ainda passam no filtro), sem limite.
+    """
+    stmt = select(
+        Tarefa.id, Tarefa.titulo, Tarefa.prazo, Tarefa.concluida, Tarefa.empregado_id,
+        Empregado.nome.label("empregado_nome"),
+    ).outerjoin(Empregado, Tarefa.empregado_id == Empregado.id)
+    if ids is not None:
+        stmt, limite = stmt.where(Tarefa.id.in_(ids)), max(len(ids), 1)
+    if filtro:
+        from busca import condicao_busca, extrair_termos  # Import tardio: busca.py importa este módulo
+        if extrair_termos(filtro):
+            stmt = stmt.where(condicao_busca(filtro, engine.dialect.name))
+    if situacao == "pendentes":
+        stmt = stmt.where(Tarefa.concluida == False)
+    elif situacao == "concluidas":
+        stmt = stmt.where(Tarefa.concluida == True)
+    with SessionLocal() as sessao:
+        linhas = _pagina_por_chave(sessao, stmt, ORDENACAO_TAREFAS_DESKTOP[ordenar], Tarefa.id,
+                                   decrescente, cursor, direcao, inclusivo, limite)
+    return [
+        {"id": l.id, "titulo": l.titulo, "prazo": l.prazo, "concluida": bool(l.concluida),
+         "empregado_id": l.empregado_id, "empregado_nome": l.empregado_nome, "chave": (l.valor_ordem, l.id)}
+        for l in linhas
+    ]
+
+# --- ALTERAÇÕES PARA AS LISTAS DO APP DESKTOP ---
+# Depois de uma gravação a lista não é relida: ela pede o que mudou desde o token da última
+# leitura (mesmas versões/lápides do GET /changes) e aplica só as inserções, alterações e
+# remoções nas linhas que já estão no widget.
+
+def token_desktop() -> int:
+    """Versão atual do banco; ler ANTES da página que ela acompanha."""
+    with SessionLocal() as sessao:
+        return versao_atual(sessao.connection())
+
+def _alteracoes_desktop(sessao: Session, tabela: str, alterados_stmt: Select, desde: int) -> Tuple[int, List[int], List[int]]:
+    token = versao_atual(sessao.connection())
+    alterados = sessao.scalars(alterados_stmt).all()
+    removidos = sessao.scalars(
+        select(Remocao.registro_id).where(Remocao.tabela == tabela, Remocao.versao > desde)
+    ).all()
+    return token, alterados, removidos
+
+def alteracoes_empregados_desktop(desde: int) -> Tuple[int, List[int], List[int]]:
+    """(token novo, ids de empregados criados/alterados, ids removidos) depois de 'desde'."""
+    with SessionLocal() as sessao:
+        return _alteracoes_desktop(sessao, "empregados", select(Empregado.id).where(Empregado.versao > desde), desde)
+
+def alteracoes_tarefas_desktop(desde: int) -> Tuple[int, List[int], List[int]]:
+    """
+    Igual para tarefas. Uma tarefa cujo responsável mudou de nome também conta como
+    alterada: a coluna "Atribuído a" da lista mostra esse nome.
+    """
+    renomeados = select(Empregado.id).where(Empregado.versao > desde)
+    stmt = select(Tarefa.id).where((Tarefa.versao > desde) | Tarefa.empregado_id.in_(renomeados))
+    with SessionLocal() as sessao:
+        return _alteracoes_desktop(sessao, "tarefas", stmt, desde)
@@ -0,0 +1,151 @@
+# eventos.py
+# Push de alterações para os clientes via Server-Sent Events (GET /eventos).
+# Cada worker tem um vigia que observa os contadores compartilhados de versoes.py (leitura de
+# memória, sem banco). Quando algum muda, o vigia busca as alterações UMA vez no banco
+# (listar_alteracoes) e distribui o mesmo lote já serializado para todas as conexões do worker.
+# Como todos os workers leem o mesmo arquivo de contadores, uma escrita feita em qualquer worker
+# chega aos clientes de todos, sem broker externo.
+import asyncio
+import time
+from typing import Optional, Set
+
+from fastapi.concurrency import run_in_threadpool
+
+import versoes
+from database import SessionLocal, listar_alteracoes, versao_atual
+from schemas import AlteracoesSchema
+
+# Intervalo entre leituras dos contadores compartilhados (segundos)
+INTERVALO_VIGIA = 0.25
+# Escritas feitas fora da API (ex: app desktop) não mexem nos contadores: de tempos em tempos
+# o vigia também confere a versão no banco, mas só enquanto houver alguém conectado.
+INTERVALO_CONFERENCIA_BANCO = 5.0
+# Lotes pendentes por conexão. Um cliente lento que passar disso perde os lotes e recebe "resync".
+TAMANHO_FILA_CONEXAO = 64
+# Comentário SSE enviado quando não há eventos, para manter proxies/conexão vivos
+INTERVALO_KEEPALIVE = 15.0
+
+
+def formatar_evento(evento: str, dados: str, id_evento: Optional[int] = None) -> str:
+    """Monta uma mensagem no formato text/event-stream."""
+    linhas = []
+    if id_evento is not None:
+        linhas.append(f"id: {id_evento}")
+    linhas.append(f"event: {evento}")
+    linhas.append(f"data: {dados}")
+    return "\n".join(linhas) + "\n\n"
+
+
+def buscar_lote(desde: int) -> tuple:
+    """Consulta síncrona (roda no threadpool): (token, mensagem SSE ou None se nada mudou)."""
+    db = SessionLocal()
+    try:
+        alteracoes = listar_alteracoes(db, desde=desde)
+        if alteracoes["resync"]:
+            # As lápides desde 'desde' já foram descartadas: o cliente refaz a carga pelo GET /changes
+            return alteracoes["token"], formatar_evento("resync", "{}")
+        vazio = not any(alteracoes["alterados"].values()) and not any(alteracoes["removidos"].values())
+        if vazio:
+            return alteracoes["token"], None
+        dados = AlteracoesSchema.model_validate(alteracoes).model_dump_json()
+        return alteracoes["token"], formatar_evento("alteracoes", dados, alteracoes["token"])
+    finally:
+        db.close()
+
+
+def token_do_banco() -> int:
+    db = SessionLocal()
+    try:
+        return versao_atual(db.connection())
+    finally:
+        db.close()
+
+
+class DifusorEventos:
+    """Mantém as filas das conexões SSE do worker e o vigia que as alimenta."""
+
+    def __init__(self):
+        self.filas: Set[asyncio.Queue] = set()
+        self.token: Optional[int] = None
+        self._tarefa: Optional[asyncio.Task] = None
+        self._loop = None
+
+    def assinar(self) -> asyncio.Queue:
+        fila = asyncio.Queue(maxsize=TAMANHO_FILA_CONEXAO)
+        self.filas.add(fila)
+        self._garantir_vigia()
+        return fila
+
+    def cancelar(self, fila: asyncio.Queue):
+        self.filas.discard(fila)
+
+    def _garantir_vigia(self):
+        # O vigia nasce junto com a primeira conexão (e renasce se o event loop for outro)
+        loop = asyncio.get_running_loop()
+        if self._tarefa is None or self._tarefa.done() or self._loop is not loop:
+            self._loop = loop
+            self._tarefa = loop.create_task(self._vigiar())
+
+    def _publicar(self, mensagem: str):
+        for fila in list(self.filas):
+            try:
+                fila.put_nowait(mensagem)
+            except asyncio.QueueFull:
+                # Contrapressão: o cliente não acompanha. Descarta o que está pendente e pede
+                # que ele se ressincronize por GET /changes a partir do último id recebido.
+                while not fila.empty():
+                    fila.get_nowait()
+                fila.put_nowait(formatar_evento("resync", "{}"))
+
+    async def _vigiar(self):
+        self.token = await run_in_threadpool(token_do_banco)
+        ultimo_estado = None
+        ultima_conferencia = time.monotonic()
+        while True:
+            estado = (versoes.epoca(), *(versoes.versao(t) for t in versoes.TABELAS))
+            conferir_banco = time.monotonic() - ultima_conferencia >= INTERVALO_CONFERENCIA_BANCO
+            if (estado != ultimo_estado or conferir_banco) and self.filas:
+                ultima_conferencia = time.monotonic()
+                try:
+                    token, mensagem = await run_in_threadpool(buscar_lote, self.token)
+                except Exception as e:  # Falha temporária do banco: tenta de novo na próxima volta
+                    print(f"Falha ao buscar alterações para os eventos: {e}")
+                else:
+                    if mensagem is not None:
+                        self._publicar(mensagem)
+                    self.token = max(self.token, token)
+                    ultimo_estado = estado
+            elif estado != ultimo_estado:
+                # Ninguém conectado: só acompanha o token (leitura de uma linha) para que a
+                # próxima conexão não receba alterações antigas neste worker
+                try:
+                    self.token = await run_in_threadpool(token_do_banco)
+                    ultimo_estado = estado
+                except Exception as e:
+                    print(f"Falha ao ler o token de alterações: {e}")
+            await asyncio.sleep(INTERVALO_VIGIA)
+
+
+difusor = DifusorEventos()
+
+
+async def gerar_stream(desde: Optional[int] = None):
+    """
+    Gerador do corpo text/event-stream de uma conexão. Com 'desde' (Last-Event-ID ou ?since=),
+    envia primeiro o que o cliente perdeu; depois repassa os lotes do difusor.
+    """
+    fila = difusor.assinar()
+    try:
+        # A fila já está registrada: o que mudar durante a recuperação chega por ela
+        yield "retry: 3000\n\n"
+        if desde is not None:
+            _, mensagem = await run_in_threadpool(buscar_lote, desde)
+            if mensagem is not None:
+                yield mensagem
+        while True:
+            try:
+                yield await asyncio.wait_for(fila.get(), INTERVALO_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+    finally:
+        difusor.cancelar(fila)
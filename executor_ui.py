@@ -0,0 +1,155 @@
+# executor_ui.py
+# Acesso ao banco fora da thread do Tk (app desktop).
+#
+# O Tk só pode ser tocado pela thread que roda o mainloop, e uma consulta lenta nessa thread
+# congela a janela inteira (nem redesenha). Aqui as funções do database.py rodam em um pool
+# de threads; o resultado volta por uma fila que a thread do Tk esvazia em callbacks de
+# after(), gastando no máximo alguns milissegundos por quadro para a interface seguir a 60 fps.
+#
+# Pedidos com a mesma 'chave' (ex.: "lista_tarefas") são agrupados: enquanto um está rodando,
+# os novos não disparam outra consulta; só o ÚLTIMO deles roda quando o atual terminar.
+# Assim dez cliques em "atualizar" viram no máximo duas consultas.
+import queue
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+
+# Intervalo entre as leituras da fila (16 ms ~ um quadro a 60 fps)
+INTERVALO_MS = 16
+# Tempo máximo gasto com callbacks por leitura da fila, para não travar o quadro
+ORCAMENTO_MS = 8
+
+
+class _Pedido:
+    __slots__ = ("funcao", "args", "kwargs", "ao_concluir", "ao_falhar", "chave")
+
+    def __init__(self, funcao, args, kwargs, ao_concluir, ao_falhar, chave):
+        self.funcao, self.args, self.kwargs = funcao, args, kwargs
+        self.ao_concluir, self.ao_falhar, self.chave = ao_concluir, ao_falhar, chave
+
+
+class ExecutorUI:
+    """Roda funções em segundo plano e entrega o resultado na thread do Tk."""
+
+    def __init__(self, raiz, max_workers: int = 4, intervalo_ms: int = INTERVALO_MS, orcamento_ms: int = ORCAMENTO_MS):
+        self._raiz = raiz
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="flow-db")
+        self._resultados: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._intervalo_ms = intervalo_ms
+        self._orcamento = orcamento_ms / 1000
+        self._thread_ui = threading.get_ident()
+        self._rodando: Dict[str, Optional[_Pedido]] = {}  # chave -> pedido que espera a vez
+        self._pendentes = 0
+        self._avisado = False  # Último estado de 'ocupado' entregue aos ouvintes
+        self._agendado = None
+        self._ouvintes: List[Callable[[bool], None]] = []
+        self._encerrado = False
+        # Futuros ainda não concluídos, para o encerrar() cancelar os que não começaram
+        # (o cancel_futures do shutdown só existe a partir do Python 3.9; o build é 3.8)
+        self._futuros: Set[Future] = set()
+
+    # --- API (chamar sempre da thread do Tk) ---
+
+    def executar(self, funcao: Callable, *args, ao_concluir: Optional[Callable] = None,
+                 ao_falhar: Optional[Callable] = None, chave: Optional[str] = None, **kwargs):
+        """
+        Agenda funcao(*args, **kwargs) no pool. ao_concluir(resultado) / ao_falhar(erro)
+        rodam depois, na thread do Tk. Sem ao_falhar, o erro é só impresso.
+        """
+        assert threading.get_ident() == self._thread_ui, "ExecutorUI.executar fora da thread do Tk"
+        if self._encerrado:
+            return
+        pedido = _Pedido(funcao, args, kwargs, ao_concluir, ao_falhar, chave)
+        if chave is not None and chave in self._rodando:
+            # Já há um igual rodando: guarda só o mais recente para depois
+            self._rodando[chave] = pedido
+            return
+        self._enviar(pedido)
+
+    @property
+    def ocupado(self) -> bool:
+        return self._pendentes > 0
+
+    def ao_mudar_ocupado(self, callback: Callable[[bool], None]):
+        """Registra callback(ocupado) chamado quando o executor começa/termina de trabalhar (indicador de carregando)."""
+        self._ouvintes.append(callback)
+
+    def encerrar(self):
+        """Descarta o que ainda não começou e para de entregar resultados (fechamento da janela)."""
+        self._encerrado = True
+        if self._agendado is not None:
+            try:
+                self._raiz.after_cancel(self._agendado)
+            except Exception:
+                pass
+            self._agendado = None
+        for futuro in list(self._futuros):
+            futuro.cancel()  # Só cancela o que ainda está na fila; o que já roda termina sozinho
+        self._pool.shutdown(wait=False)
+
+    # --- Interno ---
+
+    def _enviar(self, pedido: _Pedido):
+        if pedido.chave is not None:
+            self._rodando[pedido.chave] = None
+        self._pendentes += 1
+        self._avisar(True)
+        futuro = self._pool.submit(self._trabalhar, pedido)
+        self._futuros.add(futuro)
+        futuro.add_done_callback(self._futuros.discard)
+        self._agendar()
+
+    def _trabalhar(self, pedido: _Pedido):
+        # Thread do pool: NÃO toca no Tk, só deixa o resultado na fila
+        try:
+            self._resultados.put((pedido, True, pedido.funcao(*pedido.args, **pedido.kwargs)))
+        except BaseException as e:
+            self._resultados.put((pedido, False, e))
+
+    def _agendar(self):
+        if self._agendado is None and not self._encerrado:
+            self._agendado = self._raiz.after(self._intervalo_ms, self._drenar)
+
+    def _drenar(self):
+        self._agendado = None
+        limite = time.perf_counter() + self._orcamento
+        while time.perf_counter() < limite:
+            try:
+                pedido, sucesso, valor = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self._pendentes -= 1
+            self._entregar(pedido, sucesso, valor)
+            if pedido.chave is not None:
+                proximo = self._rodando.pop(pedido.chave, None)
+                if proximo is not None:
+                    self._enviar(proximo)
+        if self._pendentes == 0:
+            self._avisar(False)
+        else:
+            self._agendar()
+
+    def _entregar(self, pedido: _Pedido, sucesso: bool, valor):
+        try:
+            if sucesso:
+                if pedido.ao_concluir is not None:
+                    pedido.ao_concluir(valor)
+            elif pedido.ao_falhar is not None:
+                pedido.ao_falhar(valor)
+            else:
+                traceback.print_exception(type(valor), valor, valor.__traceback__)
+        except Exception:
+            # Erro no callback não pode parar a entrega dos outros resultados
+            traceback.print_exc()
+
+    def _avisar(self, ocupado: bool):
+        if ocupado == self._avisado:
+            return
+        self._avisado = ocupado
+        for callback in self._ouvintes:
+            try:
+                callback(ocupado)
+            except Exception:
+                traceback.print_exc()
@@ -0,0 +1,73 @@
+# exportacao.py
+# Exportação completa de tarefas (com o nome do empregado) em CSV ou NDJSON.
+# As linhas saem do banco em blocos por um cursor do lado do servidor (stream_results/yield_per)
+# e são escritas na resposta conforme chegam: a memória do worker não cresce com o tamanho da tabela.
+import csv
+import io
+import json
+from typing import Iterator
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from models import Empregado, Tarefa
+
+TAMANHO_BLOCO = 1000
+
+COLUNAS_EXPORTACAO = ("id", "titulo", "descricao", "prazo", "concluida", "empregado_id", "empregado_nome")
+
+
+def consulta_tarefas_com_empregado():
+    """Mesmo LEFT OUTER JOIN de listar_proximas_tarefas, mas só com as colunas (sem objetos ORM)."""
+    return select(
+        Tarefa.id,
+        Tarefa.titulo,
+        Tarefa.descricao,
+        Tarefa.prazo,
+        Tarefa.concluida,
+        Tarefa.empregado_id,
+        Empregado.nome.label("empregado_nome"),
+    ).outerjoin(
+        Empregado, Tarefa.empregado_id == Empregado.id
+    ).order_by(Tarefa.id)
+
+
+def iterar_blocos(engine: Engine, tamanho_bloco: int = TAMANHO_BLOCO):
+    """Gera blocos de linhas do JOIN. A conexão fica aberta só enquanto o gerador é consumido."""
+    with engine.connect() as conn:
+        resultado = conn.execution_options(stream_results=True, yield_per=tamanho_bloco).execute(
+            consulta_tarefas_com_empregado()
+        )
+        for bloco in resultado.partitions():
+            yield bloco
+
+
+def gerar_csv(engine: Engine, tamanho_bloco: int = TAMANHO_BLOCO) -> Iterator[str]:
+    """Cabeçalho + uma string CSV por bloco de linhas."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(COLUNAS_EXPORTACAO)
+    yield buffer.getvalue()
+
+    for bloco in iterar_blocos(engine, tamanho_bloco):
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows(bloco)
+        yield buffer.getvalue()
+
+
+def gerar_ndjson(engine: Engine, tamanho_bloco: int = TAMANHO_BLOCO) -> Iterator[str]:
+    """Um objeto JSON por linha, enviados um bloco por vez."""
+    for bloco in iterar_blocos(engine, tamanho_bloco):
+        yield "".join(
+            json.dumps({
+                "id": linha.id,
+                "titulo": linha.titulo,
+                "descricao": linha.descricao,
+                "prazo": linha.prazo.isoformat() if linha.prazo else None,
+                "concluida": linha.concluida,
+                "empregado_id": linha.empregado_id,
+                "empregado_nome": linha.empregado_nome,
+            }, ensure_ascii=False) + "\n"
+            for linha in bloco
+        )
@@ -0,0 +1,194 @@
+# importacao.py
+# Importação em massa de tarefas/empregados a partir de NDJSON ou CSV.
+# O corpo da requisição é lido como stream (nunca inteiro na memória), cada linha é validada
+# com os mesmos schemas da API e as linhas válidas são gravadas em lotes, um INSERT
+# multi-linha por transação. Uma linha inválida vira um erro no relatório e não derruba a carga.
+import csv
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import agora_utc, aplicar_deltas_carga, carimbar_versao, deltas_de_insercao, versao_provisoria
+from models import Empregado, Tarefa
+from schemas import EmpregadoCreate, TarefaCreate
+
+# Entidade -> (modelo ORM, schema de validação)
+ENTIDADES = {
+    "empregados": (Empregado, EmpregadoCreate),
+    "tarefas": (Tarefa, TarefaCreate),
+}
+
+TAMANHO_LOTE_PADRAO = 1000
+# O relatório lista no máximo esta quantidade de erros (o total é sempre informado)
+MAX_ERROS_REPORTADOS = 1000
+
+
+# Um registro CSV com aspas abertas pode ocupar várias linhas; acima deste tamanho ele é
+# entregue como está (e vira erro) em vez de acumular o resto do corpo na memória
+TAMANHO_MAXIMO_REGISTRO = 1024 * 1024
+
+
+def _decodificar(registro: bytes, numero: int) -> Union[str, bytes]:
+    """Texto do registro, ou os próprios bytes se não forem UTF-8 válido (o importador reporta o erro)."""
+    try:
+        return registro.decode("utf-8-sig" if numero == 1 else "utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        return registro
+
+
+async def ler_linhas(stream: AsyncIterator[bytes], formato: str = "ndjson") -> AsyncIterator[Tuple[int, Union[str, bytes]]]:
+    """
+    Quebra o stream de bytes em registros, sem carregar o corpo inteiro. O número é o da linha
+    (a partir de 1) onde o registro começa. No CSV, um campo entre aspas pode conter quebras
+    de linha: as linhas são juntadas até as aspas do registro fecharem (quantidade par de '"').
+    Registros que não são UTF-8 válido saem como bytes.
+    """
+    resto = b""
+    numero = 0
+    registro, inicio = b"", 0
+    async for pedaco in stream:
+        resto += pedaco
+        *linhas, resto = resto.split(b"\n")
+        for linha in linhas:
+            numero += 1
+            if formato != "csv":
+                yield numero, _decodificar(linha, numero)
+                continue
+            if not registro:
+                inicio = numero
+                registro = linha
+            else:
+                registro += b"\n" + linha
+            if registro.count(b'"') % 2 == 0 or len(registro) > TAMANHO_MAXIMO_REGISTRO:
+                yield inicio, _decodificar(registro, inicio)
+                registro = b""
+    if resto:
+        numero += 1
+        if registro:
+            registro += b"\n" + resto
+        else:
+            registro, inicio = resto, numero
+    if registro:
+        yield inicio, _decodificar(registro, inicio)
+
+
+class ImportadorEmLote:
+    """Valida linhas e grava as válidas em lotes. Use processar() para cada bloco e finalizar() no fim."""
+
+    def __init__(self, db_session: Session, entidade: str, formato: str, tamanho_lote: int = TAMANHO_LOTE_PADRAO):
+        self.db = db_session
+        self.modelo, self.schema = ENTIDADES[entidade]
+        self.formato = formato
+        self.tamanho_lote = tamanho_lote
+        self.cabecalho: Optional[List[str]] = None
+        self.lote: List[Tuple[int, Dict]] = []
+        self.inseridos = 0
+        self.total_erros = 0
+        self.erros: List[Dict] = []
+        self.inicio = time.perf_counter()
+
+    def _registrar_erro(self, numero: int, mensagem: str):
+        self.total_erros += 1
+        if len(self.erros) < MAX_ERROS_REPORTADOS:
+            self.erros.append({"linha": numero, "erro": mensagem})
+
+    def _converter(self, linha: str) -> Optional[Dict]:
+        """Transforma a linha bruta em dicionário. Retorna None para a linha de cabeçalho do CSV."""
+        if self.formato == "csv":
+            valores = next(csv.reader([linha]))
+            if self.cabecalho is None:
+                self.cabecalho = [v.strip() for v in valores]
+                return None
+            if len(valores) != len(self.cabecalho):
+                raise ValueError(f"esperava {len(self.cabecalho)} colunas, recebeu {len(valores)}")
+            # No CSV, campo vazio significa "não informado"
+            return {k: (v if v != "" else None) for k, v in zip(self.cabecalho, valores)}
+
+        registro = json.loads(linha)
+        if not isinstance(registro, dict):
+            raise ValueError("cada linha deve ser um objeto JSON")
+        return registro
+
+    def processar(self, linhas: List[Tuple[int, Union[str, bytes]]]):
+        """Valida as linhas recebidas e grava um lote sempre que ele enche."""
+        for numero, linha in linhas:
+            if isinstance(linha, bytes):  # ler_linhas não conseguiu decodificar
+                self._registrar_erro(numero, "texto não está em UTF-8")
+                continue
+            if not linha.strip():
+                continue
+            try:
+                registro = self._converter(linha)
+                if registro is None:
+                    continue
+                dados = self.schema.model_validate(registro).model_dump()
+            except ValidationError as e:
+                detalhes = "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+                self._registrar_erro(numero, detalhes)
+                continue
+            except (ValueError, csv.Error) as e:  # JSON/CSV malformado
+                self._registrar_erro(numero, str(e))
+                continue
+
+            self.lote.append((numero, dados))
+            if len(self.lote) >= self.tamanho_lote:
+                self._gravar_lote()
+
+    def _carimbar(self, linhas: List[Dict], versao: int) -> List[Dict]:
+        """O INSERT em massa não passa pelo flush do ORM: a versão de sincronização é aplicada aqui."""
+        agora = agora_utc()
+        return [{**dados, "versao": versao, "atualizado_em": agora} for dados in linhas]
+
+    def _inserir(self, linhas: List[Dict]):
+        """
+        INSERT multi-linha + ajuste da carga dos empregados, na transação corrente.
+        As linhas entram com uma versão provisória; a de verdade é reservada por último
+        (carimbar_versao), para o contador de versões não ficar travado durante o INSERT.
+        """
+        provisoria = versao_provisoria()
+        self.db.execute(insert(self.modelo), self._carimbar(linhas, provisoria))
+        conn = self.db.connection()
+        if self.modelo is Tarefa:
+            aplicar_deltas_carga(conn, deltas_de_insercao(linhas))
+        carimbar_versao(conn, provisoria, self.modelo)
+
+    def _gravar_lote(self):
+        """Grava o lote em uma transação. Se o banco recusar (ex: email duplicado), refaz linha a linha."""
+        if not self.lote:
+            return
+        lote, self.lote = self.lote, []
+        try:
+            self._inserir([dados for _, dados in lote])
+            self.db.commit()
+            self.inseridos += len(lote)
+            return
+        except IntegrityError:
+            self.db.rollback()
+
+        # Caminho lento, só para o lote que falhou: isola as linhas que violam restrições do banco
+        for numero, dados in lote:
+            try:
+                self._inserir([dados])
+                self.db.commit()
+                self.inseridos += 1
+            except IntegrityError as e:
+                self.db.rollback()
+                self._registrar_erro(numero, f"rejeitada pelo banco: {e.orig}")
+
+    def finalizar(self, linhas: List[Tuple[int, Union[str, bytes]]]) -> Dict:
+        """Processa o último bloco, grava o lote pendente e devolve o relatório da importação."""
+        self.processar(linhas)
+        self._gravar_lote()
+        segundos = time.perf_counter() - self.inicio
+        return {
+            "inseridos": self.inseridos,
+            "rejeitados": self.total_erros,
+            "erros": self.erros,
+            "segundos": round(segundos, 3),
+            "linhas_por_segundo": round(self.inseridos / segundos, 1) if segundos > 0 else None,
+        }
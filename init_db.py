@@ -1,13 +1,14 @@
 # init_db.py
 from database import engine
-from models import Base
+from migracoes import preparar_banco, VERSAO_ATUAL
 import sys
 
 try:
     print("Iniciando a criação das tabelas no banco de dados...")
-    # Base.metadata.create_all lê todos os modelos definidos em models.py e cria as tabelas no DB
-    Base.metadata.create_all(engine) 
-    print("✅ Tabelas criadas com sucesso! O banco de dados está pronto.")
+    # Cria as tabelas definidas em models.py e aplica as migrações pendentes (versao_schema).
+    # Se o banco já está na versão atual, nada é alterado.
+    preparar_banco(engine)
+    print(f"✅ Tabelas criadas com sucesso! O banco de dados está pronto (schema v{VERSAO_ATUAL}).")
 
 except Exception as e:
     # Se a conexão falhar ou as tabelas não puderem ser criadas (por exemplo, erro de credencial), 
@@ -1,22 +1,43 @@
 # initial_setup.py
+# Ponto de entrada do deploy (procfile). Prepara o banco UMA vez e só então sobe os workers,
+# que não fazem DDL nenhum (ver migracoes.preparar_banco).
+#
+# Variáveis de ambiente:
+#   PORT             porta HTTP (padrão 8000)
+#   WEB_CONCURRENCY  quantidade de workers (padrão 4)
+#   PRELOAD=1        usa o gunicorn com --preload (se instalado): a aplicação é importada uma
+#                    vez no processo mestre e os workers nascem por fork, já com tudo carregado
+#
+# Uso: python initial_setup.py [--somente-migrar]
 
-from database import Base, engine
-from models import Empregado, Tarefa # Importa os modelos para garantir que Base os conheça
+from database import engine
+from migracoes import preparar_banco, VERSAO_ATUAL
+import versoes
+import metricas
+import argparse
+import importlib.util
 import os
-import subprocess
+import sys
 import time
 
+# Marca o início do processo para os workers medirem o tempo até a primeira requisição
+os.environ.setdefault("FLOW_INICIO_PROCESSO", str(time.time()))
+
 def create_db_tables():
-    """Tenta criar todas as tabelas no banco de dados, esperando o PostgreSQL ficar pronto."""
+    """Cria/atualiza o schema do banco uma única vez, esperando o PostgreSQL ficar pronto."""
     print("Iniciando a verificação/criação das tabelas no banco de dados...")
-    
+    inicio = time.perf_counter()
+
     # Tenta a conexão por algumas vezes, dando tempo para o PostgreSQL inicializar.
     max_retries = 5
     for i in range(max_retries):
         try:
-            # Tenta criar todas as tabelas definidas em models.py
-            Base.metadata.create_all(bind=engine)
-            print("Tabelas criadas ou já existentes. Configuração do DB finalizada.")
+            # Banco já na versão do código: só um SELECT na tabela versao_schema
+            if preparar_banco(engine):
+                print(f"Schema atualizado para a versão {VERSAO_ATUAL}.")
+            else:
+                print(f"Schema já está na versão {VERSAO_ATUAL}.")
+            print(f"Configuração do DB finalizada em {time.perf_counter() - inicio:.2f}s.")
             return # Sai da função se for bem-sucedido
         except Exception as e:
             if i < max_retries - 1:
@@ -26,22 +47,52 @@ def create_db_tables():
                 print(f"ERRO CRÍTICO: Não foi possível conectar ao DB após {max_retries} tentativas.")
                 raise e # Falha se todas as tentativas falharem
 
+def _classe_worker_gunicorn():
+    """Worker do uvicorn para o gunicorn (pacote uvicorn-worker ou o módulo antigo do uvicorn)."""
+    if importlib.util.find_spec("uvicorn_worker"):
+        return "uvicorn_worker.UvicornWorker"
+    return "uvicorn.workers.UvicornWorker"
+
 def start_server():
-    """Inicia o servidor Uvicorn após garantir que o DB está pronto."""
-    print("Iniciando o servidor FastAPI...")
-    
-    # CRÍTICO: Comando que estava no procfile, agora executado via subprocess
-    command = [
-        "uvicorn", 
-        "main:app", 
-        "--host", "0.0.0.0", 
-        "--port", os.environ.get("PORT", "8000"), # Usa a variável $PORT do Railway
-        "--workers", "4"
-    ]
-    
-    # Executa o comando e substitui o processo atual (necessário para o Procfile)
-    subprocess.run(command) 
+    """Inicia o servidor (uvicorn, ou gunicorn com preload) após garantir que o DB está pronto."""
+    porta = os.environ.get("PORT", "8000") # Usa a variável $PORT do Railway
+    workers = os.environ.get("WEB_CONCURRENCY", "4")
+    preload = os.environ.get("PRELOAD", "").lower() in ("1", "true", "sim")
+
+    if preload and importlib.util.find_spec("gunicorn"):
+        command = [
+            sys.executable, "-m", "gunicorn", "main:app",
+            "--worker-class", _classe_worker_gunicorn(),
+            "--workers", workers,
+            "--bind", f"0.0.0.0:{porta}",
+            "--preload",
+        ]
+    else:
+        if preload:
+            print("⚠️ PRELOAD pedido, mas o gunicorn não está instalado: usando o uvicorn.")
+        command = [
+            sys.executable, "-m", "uvicorn",
+            "main:app",
+            "--host", "0.0.0.0",
+            "--port", porta,
+            "--workers", workers,
+        ]
+    print(f"Iniciando o servidor FastAPI ({os.path.basename(command[2])}, {workers} worker(s))...")
+    sys.stdout.flush()
+
+    # Substitui o processo atual pelo servidor (necessário para o Procfile: os sinais de
+    # parada da plataforma chegam direto no servidor, sem um processo Python no meio)
+    os.execv(sys.executable, command)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prepara o banco e inicia a API.")
+    parser.add_argument("--somente-migrar", action="store_true",
+                        help="só cria/atualiza o schema (fase de release do deploy) e sai")
+    args = parser.parse_args()
+
     create_db_tables()
-    start_server()
\ No newline at end of file
+    if not args.somente_migrar:
+        # O banco pode ter mudado com o servidor parado: invalida todos os ETags antigos
+        versoes.reiniciar()
+        metricas.limpar()
+        start_server()
@@ -0,0 +1,101 @@
+# lote.py
+# Operações em lote nas tarefas: concluir, reabrir, atribuir ou apagar muitas de uma vez.
+#
+# Em vez de ler e regravar tarefa por tarefa pelo ORM, cada operação é um único
+# UPDATE/DELETE ... WHERE id IN (...) (em blocos de TAMANHO_LOTE_UPDATE ids), numa só transação.
+# Como o Core não passa pelos hooks do ORM, a contabilidade que eles fariam é feita aqui,
+# na mesma transação: versão das linhas (sincronização incremental), lápides das removidas
+# e contador de tarefas abertas de cada empregado (carga).
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from database import abrir_escrita, agora_utc, aplicar_deltas_carga, carimbar_versao, proxima_versao, versao_provisoria
+from models import Empregado, Remocao, Tarefa
+
+OPERACOES_LOTE = ("concluir", "reabrir", "atribuir", "deletar")
+# Máximo de IDs por UPDATE/DELETE ... WHERE id IN (...) (mesmo limite do agendador)
+TAMANHO_LOTE_UPDATE = 500
+
+
+def _blocos(ids: List[int]) -> Iterable[List[int]]:
+    for i in range(0, len(ids), TAMANHO_LOTE_UPDATE):
+        yield ids[i:i + TAMANHO_LOTE_UPDATE]
+
+
+def _alvos(operacao: str, atuais: Dict[int, Tuple[Optional[int], bool]], empregado_id: Optional[int]) -> Tuple[List[int], Counter]:
+    """IDs que a operação realmente muda e os deltas de carga que isso causa."""
+    alvos, deltas = [], Counter()
+    for tarefa_id, (responsavel, concluida) in atuais.items():
+        if operacao == "concluir" and not concluida:
+            deltas[responsavel] -= 1
+        elif operacao == "reabrir" and concluida:
+            deltas[responsavel] += 1
+        elif operacao == "atribuir" and responsavel != empregado_id:
+            if not concluida:
+                deltas[responsavel] -= 1
+                deltas[empregado_id] += 1
+        elif operacao == "deletar":
+            if not concluida:
+                deltas[responsavel] -= 1
+        else:
+            continue  # Já está como pedido
+        alvos.append(tarefa_id)
+    return alvos, deltas
+
+
+def aplicar_operacao_lote(db_session: Session, operacao: str, ids: Iterable[int], empregado_id: Optional[int] = None) -> Dict:
+    """
+    Aplica a operação às tarefas indicadas e faz o commit. 'atribuir' usa empregado_id
+    (None = deixar sem responsável). Devolve o resultado de cada id, na ordem pedida:
+    "alterada"/"removida", "inalterada" (já estava assim) ou "nao_encontrada".
+    Levanta ValueError para operação desconhecida ou empregado inexistente.
+    """
+    if operacao not in OPERACOES_LOTE:
+        raise ValueError(f"Operação inválida: {operacao}. Use uma de {', '.join(OPERACOES_LOTE)}.")
+    ids = list(dict.fromkeys(ids))  # Sem repetidos, mantendo a ordem
+    conn = db_session.connection()
+    if operacao == "atribuir" and empregado_id is not None:
+        if conn.execute(select(Empregado.id).where(Empregado.id == empregado_id)).scalar() is None:
+            raise ValueError(f"Empregado {empregado_id} não encontrado.")
+
+    # A transação de escrita começa antes da leitura do estado atual, e as linhas lidas ficam
+    # travadas (FOR UPDATE no PostgreSQL): nada muda entre a leitura e o UPDATE/DELETE abaixo.
+    # A versão só é reservada no fim, para o contador não ficar travado durante os lotes.
+    abrir_escrita(conn)
+    atuais = {}
+    for bloco in _blocos(ids):
+        for tarefa_id, responsavel, concluida in conn.execute(
+            select(Tarefa.id, Tarefa.empregado_id, Tarefa.concluida).where(Tarefa.id.in_(bloco)).with_for_update()
+        ):
+            atuais[tarefa_id] = (responsavel, bool(concluida))
+
+    alvos, deltas = _alvos(operacao, atuais, empregado_id)
+    if operacao == "deletar":
+        for bloco in _blocos(alvos):
+            conn.execute(delete(Tarefa).where(Tarefa.id.in_(bloco)))
+        aplicar_deltas_carga(conn, deltas)
+        versao = proxima_versao(conn)
+        if alvos:
+            conn.execute(insert(Remocao), [{"tabela": "tarefas", "registro_id": i, "versao": versao} for i in alvos])
+    else:
+        provisoria = versao_provisoria()
+        valores = {"atribuir": {"empregado_id": empregado_id}, "concluir": {"concluida": True}, "reabrir": {"concluida": False}}[operacao]
+        for bloco in _blocos(alvos):
+            conn.execute(
+                update(Tarefa).where(Tarefa.id.in_(bloco))
+                .values(versao=provisoria, atualizado_em=agora_utc(), **valores)
+            )
+        aplicar_deltas_carga(conn, deltas)
+        versao = carimbar_versao(conn, provisoria, Tarefa)
+    db_session.commit()
+
+    mudou = set(alvos)
+    feito = "removida" if operacao == "deletar" else "alterada"
+    resultados: List[Dict] = [
+        {"id": i, "status": feito if i in mudou else ("inalterada" if i in atuais else "nao_encontrada")}
+        for i in ids
+    ]
+    return {"operacao": operacao, "alteradas": len(alvos), "versao": versao, "resultados": resultados}
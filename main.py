@@ -1,22 +1,116 @@
-from fastapi import FastAPI, Depends, HTTPException
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+
+_INICIO_IMPORTACAO = time.perf_counter()
+
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
+from datetime import date
 
 # Importa as ferramentas do banco
-from database import get_db, engine
-from models import Base, Empregado, Tarefa
+from database import (
+    get_db, engine, SessionLocal, listar_empregados_keyset, listar_tarefas_keyset, listar_alteracoes,
+    estatisticas_por_empregado, estatisticas_dashboard,
+    estatisticas_pool, async_engine, LIMITE_PADRAO, LIMITE_MAXIMO, USAR_DB_ASYNC,
+    create_empregado, create_tarefa, update_empregado, update_tarefa, delete_empregado, delete_tarefa,
+    desligar_empregado,
+)
+from models import Empregado, Tarefa
+from schemas import (
+    EmpregadoSchema, EmpregadoCreate, EmpregadoUpdate, TarefaSchema, TarefaUpdate, TarefaBuscaSchema, TarefaCreate, AlteracoesSchema,
+    EstatisticaEmpregadoSchema, DashboardSchema, CargaEmpregadoSchema, PlanejamentoEmpregadoSchema,
+    OperacaoLoteSchema, ResultadoLoteSchema, TarefaArquivadaSchema, DesligamentoSchema, ResultadoDesligamentoSchema,
+)
+from importacao import ImportadorEmLote, ler_linhas, TAMANHO_LOTE_PADRAO
+from exportacao import gerar_csv, gerar_ndjson
+from cache_http import ConsultaCondicional
+from busca import buscar_tarefas
+from cache_nomes import cache_nomes, linhas_com_nomes, preencher_nomes
+from lote import aplicar_operacao_lote
+from arquivo import arquivar_concluidas, listar_arquivo
+import versoes
+from eventos import gerar_stream
+from agendador import atribuir_tarefas_pendentes
+from planejador import planejador, resumir
+from migracoes import versao_do_schema, VERSAO_ATUAL
+import metricas
 
 # ==========================================================
-# ☢️ LIMPEZA AUTOMÁTICA DO BANCO (Para corrigir erros)
-# ==========================================================
-# Isso apaga as tabelas antigas e cria novas limpas ao iniciar
-Base.metadata.drop_all(bind=engine) 
-Base.metadata.create_all(bind=engine)
+# 🚀 PARTIDA DOS WORKERS
 # ==========================================================
+# O schema é criado/migrado UMA vez pelo bootstrap (initial_setup.py ou init_db.py), antes
+# de os workers subirem. Aqui não há DDL: cada worker só confere a versão (um SELECT).
+
+# Arquivamento automático das tarefas concluídas antigas (arquivo.py) e descarte das lápides
+# mais velhas que REMOCOES_DIAS. 0 desliga os dois.
+# Com vários workers todos rodam: cada lote trava as tarefas que move e o segundo a chegar
+# só encontra o que sobrou (normalmente nada, e aí é um SELECT).
+ARQUIVO_INTERVALO_MIN = float(os.environ.get("ARQUIVO_INTERVALO_MIN", "60"))
+
+def _rodar_arquivamento():
+    with SessionLocal() as sessao:
+        resultado = arquivar_concluidas(sessao)
+        descartadas = descartar_remocoes_antigas(sessao)
+    if descartadas:
+        print(f"🧹 {descartadas} lápide(s) com mais de {REMOCOES_DIAS} dias descartada(s).", flush=True)
+    if resultado["arquivadas"]:
+        versoes.incrementar("tarefas")
+        print(f"📦 {resultado['arquivadas']} tarefa(s) concluída(s) arquivada(s) em {resultado['segundos']}s.", flush=True)
 
-app = FastAPI(title="Flow Scheduler API (Demo Mode)")
+async def _arquivar_periodicamente():
+    while True:
+        await asyncio.sleep(ARQUIVO_INTERVALO_MIN * 60)
+        try:
+            await run_in_threadpool(_rodar_arquivamento)
+        except Exception as e:
+            # Banco ocupado/fora do ar: tenta de novo na próxima rodada
+            print(f"⚠️ Arquivamento falhou: {e}", flush=True)
+
+@asynccontextmanager
+async def ciclo_de_vida(app: FastAPI):
+    versao = versao_do_schema(engine)
+    if versao < VERSAO_ATUAL:
+        print(f"⚠️ Schema do banco na versão {versao}, o código espera a {VERSAO_ATUAL}. "
+              "Rode 'python initial_setup.py --somente-migrar' (ou init_db.py).", flush=True)
+    print(f"⏱️ Worker {os.getpid()} pronto em {time.perf_counter() - _INICIO_IMPORTACAO:.2f}s "
+          "(desde o import de main.py).", flush=True)
+    arquivamento = asyncio.create_task(_arquivar_periodicamente()) if ARQUIVO_INTERVALO_MIN > 0 else None
+    yield
+    if arquivamento is not None:
+        arquivamento.cancel()
+
+class MedirPrimeiraRequisicao:
+    """
+    Middleware ASGI que registra quanto tempo o worker levou até atender a primeira
+    requisição (o que importa para o autoscaling). Depois disso só repassa as chamadas.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.medido = False
+
+    async def __call__(self, scope, receive, send):
+        if self.medido or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        self.medido = True
+        await self.app(scope, receive, send)
+        agora = time.perf_counter()
+        desde_processo = ""
+        if os.environ.get("FLOW_INICIO_PROCESSO"):
+            # Marcado pelo initial_setup.py: inclui o bootstrap do banco e a subida do servidor
+            inicio = float(os.environ["FLOW_INICIO_PROCESSO"])
+            desde_processo = f", {time.time() - inicio:.2f}s desde o início do deploy"
+        print(f"⏱️ Worker {os.getpid()}: primeira requisição ({scope['path']}) atendida "
+              f"{agora - _INICIO_IMPORTACAO:.2f}s após o import{desde_processo}.", flush=True)
+
+app = FastAPI(title="Flow Scheduler API (Demo Mode)", lifespan=ciclo_de_vida)
+app.add_middleware(MedirPrimeiraRequisicao)
 
 # Configuração CORS (Liberado para funcionar sem erros)
 origins = ["*"]
@@ -27,37 +121,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # O navegador só deixa o script.js ler cabeçalhos expostos explicitamente
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-# --- SCHEMAS DE DADOS ---
-
-class EmpregadoSchema(BaseModel):
-    id: int
-    nome: str
-    cargo: str
-    email: str
-    class Config:
-        from_attributes = True
-
-class EmpregadoCreate(BaseModel):
-    nome: str
-    cargo: str
-    email: str
-
-class TarefaSchema(BaseModel):
-    id: int
-    titulo: str
-    prazo: str
-    empregado_id: Optional[int] = None
-    concluida: bool = False
-    class Config:
-        from_attributes = True
-
-class TarefaCreate(BaseModel):
-    titulo: str
-    prazo: str
-    empregado_id: Optional[int] = None
-    concluida: bool = False
+# Compressão das respostas grandes (listagens, exportação). O JSON de tarefas encolhe ~10x:
+# em rede lenta isso pesa mais que o tempo de servidor. Brotli se o pacote opcional
+# brotli-asgi estiver instalado (com gzip para clientes sem 'br'), senão gzip.
+# O stream de eventos (text/event-stream) nunca é comprimido: os eventos ficariam presos no buffer.
+COMPRESSAO = os.environ.get("COMPRESSAO", "1").lower() not in ("0", "false", "nao")
+COMPRESSAO_MIN_BYTES = int(os.environ.get("COMPRESSAO_MIN_BYTES", "1024"))
+COMPRESSAO_NIVEL = int(os.environ.get("COMPRESSAO_NIVEL", "5"))  # 9 (padrão do gzip) gasta CPU demais por pouco ganho
+
+if COMPRESSAO:
+    try:
+        from brotli_asgi import BrotliMiddleware
+        app.add_middleware(BrotliMiddleware, quality=COMPRESSAO_NIVEL, minimum_size=COMPRESSAO_MIN_BYTES,
+                           excluded_handlers=["/eventos"])
+    except ImportError:
+        from fastapi.middleware.gzip import GZipMiddleware
+        app.add_middleware(GZipMiddleware, minimum_size=COMPRESSAO_MIN_BYTES, compresslevel=COMPRESSAO_NIVEL)
+
+# Adicionado por último = camada mais externa: a latência medida inclui os outros middlewares
+app.add_middleware(metricas.MiddlewareMetricas)
 
 @app.get("/")
 def read_root():
@@ -66,53 +152,401 @@ def read_root():
 # --- ROTAS DE EMPREGADOS ---
 
 @app.get("/empregados/", response_model=List[EmpregadoSchema])
-def listar_empregados(db: Session = Depends(get_db)):
-    return db.query(Empregado).all()
+def listar_empregados(
+    request: Request,
+    limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    # Nada mudou desde a última leitura do cliente: 304 sem consultar o banco
+    cond = ConsultaCondicional(request, ("empregados",))
+    pronta = cond.resposta_pronta()
+    if pronta is not None:
+        return pronta
+
+    # Paginação por cursor: o token da próxima página vai no cabeçalho X-Next-Cursor
+    try:
+        empregados, proximo = listar_empregados_keyset(db, limite=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Linhas projetadas (só as colunas do schema) vão direto para o JSON, sem model_validate
+    return cond.responder(
+        [e._asdict() for e in empregados],
+        {"X-Next-Cursor": proximo} if proximo else None,
+    )
 
 @app.post("/empregados/", response_model=EmpregadoSchema)
 def criar_empregado(empregado: EmpregadoCreate, db: Session = Depends(get_db)):
-    # Cria o empregado no banco
-    db_emp = Empregado(
-        nome=empregado.nome,
-        cargo=empregado.cargo,
-        email=empregado.email
-    )
-    db.add(db_emp)
-    db.commit()
-    db.refresh(db_emp)
-    return db_emp
+    # INSERT ... RETURNING: a linha criada volta no próprio INSERT (sem refresh)
+    try:
+        db_emp = create_empregado(db, empregado)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Já existe um empregado com este email.")
+    versoes.incrementar("empregados")
+    return EmpregadoSchema.model_validate(db_emp)
+
+@app.patch("/empregados/{empregado_id}", response_model=EmpregadoSchema)
+def editar_empregado(empregado_id: int, dados: EmpregadoUpdate, db: Session = Depends(get_db)):
+    """Atualização parcial: só os campos enviados mudam (um UPDATE ... RETURNING)."""
+    try:
+        db_emp, alterado = update_empregado(db, empregado_id, dados)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Já existe um empregado com este email.")
+    if db_emp is None:
+        raise HTTPException(status_code=404, detail="Empregado não encontrado")
+    if alterado:  # PATCH vazio ou sem diferença não invalida ETags nem gera evento
+        versoes.incrementar("empregados")
+    return EmpregadoSchema.model_validate(db_emp)
 
 @app.delete("/empregados/{empregado_id}")
 def deletar_empregado(empregado_id: int, db: Session = Depends(get_db)):
-    emp = db.query(Empregado).filter(Empregado.id == empregado_id).first()
-    if emp:
-        db.delete(emp)
-        db.commit()
+    # Sem cascade: as tarefas ficam sem responsável (um UPDATE, ver database.desligar_empregado)
+    if not delete_empregado(db, empregado_id):
+        raise HTTPException(status_code=404, detail="Empregado não encontrado")
+    versoes.incrementar("empregados", "tarefas")
     return {"message": "Deletado"}
 
+@app.post("/empregados/{empregado_id}/desligamento", response_model=ResultadoDesligamentoSchema)
+def desligar_empregado_rota(empregado_id: int, pedido: DesligamentoSchema, db: Session = Depends(get_db)):
+    """
+    Desliga o empregado: as tarefas dele passam para 'transferir_para' (ou ficam sem
+    responsável) com um único UPDATE e o empregado é apagado, tudo numa transação.
+    """
+    try:
+        resultado = desligar_empregado(db, empregado_id, pedido.transferir_para)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if resultado is None:
+        raise HTTPException(status_code=404, detail="Empregado não encontrado")
+    versoes.incrementar("empregados", "tarefas")
+    return resultado
+
 # --- ROTAS DE TAREFAS ---
 
 @app.get("/tarefas/", response_model=List[TarefaSchema])
-def listar_tarefas(db: Session = Depends(get_db)):
-    return db.query(Tarefa).all()
+def listar_tarefas(
+    request: Request,
+    limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    cursor: Optional[str] = None,
+    ordenar: Literal["id", "prazo"] = "id",
+    concluida: Optional[bool] = None,
+    empregado_id: Optional[int] = None,
+    prazo_de: Optional[date] = None,
+    prazo_ate: Optional[date] = None,
+    expand: Optional[Literal["empregado"]] = None,
+    db: Session = Depends(get_db),
+):
+    # Com expand=empregado a resposta também depende dos nomes: muda quando um empregado muda
+    cond = ConsultaCondicional(request, ("tarefas", "empregados") if expand else ("tarefas",))
+    pronta = cond.resposta_pronta()
+    if pronta is not None:
+        return pronta
+
+    # Filtros e paginação são resolvidos no SQL; o cursor só vale para a mesma ordenação
+    try:
+        tarefas, proximo = listar_tarefas_keyset(
+            db, limite=limit, cursor=cursor, ordenar=ordenar, concluida=concluida,
+            empregado_id=empregado_id, prazo_de=prazo_de, prazo_ate=prazo_ate,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Nomes da página inteira: cache LRU + no máximo UMA consulta (nunca uma por tarefa)
+    nomes = cache_nomes.nomes(db, (t.empregado_id for t in tarefas)) if expand else {}
+    return cond.responder(
+        linhas_com_nomes(tarefas, nomes),
+        {"X-Next-Cursor": proximo} if proximo else None,
+    )
+
+@app.get("/tarefas/exportar")
+def exportar_tarefas(formato: Literal["csv", "ndjson"] = "csv"):
+    """Dump completo das tarefas com o nome do empregado, enviado em stream (memória constante)."""
+    # O gerador abre a própria conexão: a sessão do get_db não acompanha o stream da resposta
+    if formato == "csv":
+        return StreamingResponse(
+            gerar_csv(engine), media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="tarefas.csv"'},
+        )
+    return StreamingResponse(
+        gerar_ndjson(engine), media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="tarefas.ndjson"'},
+    )
+
+@app.get("/tarefas/busca", response_model=List[TarefaBuscaSchema])
+def buscar_tarefas_rota(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=LIMITE_PADRAO),
+    cursor: Optional[str] = None,
+    expand: Optional[Literal["empregado"]] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Busca no título e na descrição, pelo índice textual (ver busca.py). Todas as palavras
+    precisam aparecer; a última também vale como prefixo. Mais relevantes primeiro.
+    """
+    cond = ConsultaCondicional(request, ("tarefas", "empregados") if expand else ("tarefas",))
+    pronta = cond.resposta_pronta()
+    if pronta is not None:
+        return pronta
+
+    try:
+        tarefas, proximo = buscar_tarefas(db, q, limite=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if expand:
+        preencher_nomes(tarefas, cache_nomes.nomes(db, (t.empregado_id for t in tarefas)))
+    return cond.responder(
+        [TarefaBuscaSchema.model_validate(t) for t in tarefas],
+        {"X-Next-Cursor": proximo} if proximo else None,
+    )
+
+@app.get("/tarefas/arquivo", response_model=List[TarefaArquivadaSchema])
+def listar_tarefas_arquivadas(
+    request: Request,
+    limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    cursor: Optional[str] = None,
+    empregado_id: Optional[int] = None,
+    prazo_de: Optional[date] = None,
+    prazo_ate: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Tarefas concluídas já arquivadas (fora das listagens normais), na ordem em que foram
+    arquivadas. O 'id' é o que a tarefa tinha; o cursor da próxima página vem em X-Next-Cursor.
+    """
+    # O arquivo só muda quando tarefas são arquivadas, e o arquivamento avisa como escrita em "tarefas"
+    cond = ConsultaCondicional(request, ("tarefas",))
+    pronta = cond.resposta_pronta()
+    if pronta is not None:
+        return pronta
+    try:
+        linhas, proximo = listar_arquivo(db, limite=limit, cursor=cursor, empregado_id=empregado_id,
+                                         prazo_de=prazo_de, prazo_ate=prazo_ate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return cond.responder([linha._asdict() for linha in linhas], {"X-Next-Cursor": proximo} if proximo else None)
 
 @app.post("/tarefas/", response_model=TarefaSchema)
 def criar_tarefa(tarefa: TarefaCreate, db: Session = Depends(get_db)):
-    nova_tarefa = Tarefa(
-        titulo=tarefa.titulo, 
-        prazo=tarefa.prazo, 
-        concluida=tarefa.concluida,
-        empregado_id=tarefa.empregado_id
-    )
-    db.add(nova_tarefa)
-    db.commit()
-    db.refresh(nova_tarefa)
-    return nova_tarefa
+    # A chave estrangeira recusa um empregado_id que não existe
+    try:
+        nova_tarefa = create_tarefa(db, tarefa)
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail="Empregado responsável não encontrado.")
+    versoes.incrementar("tarefas")
+    return TarefaSchema.model_validate(nova_tarefa)
+
+@app.patch("/tarefas/{tarefa_id}", response_model=TarefaSchema)
+def editar_tarefa(tarefa_id: int, dados: TarefaUpdate, db: Session = Depends(get_db)):
+    """Atualização parcial: só os campos enviados mudam (um UPDATE ... RETURNING)."""
+    try:
+        tarefa, alterada = update_tarefa(db, tarefa_id, dados)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail="Empregado responsável não encontrado.")
+    if tarefa is None:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+    if alterada:
+        versoes.incrementar("empregados", "tarefas")
+    return TarefaSchema.model_validate(tarefa)
+
+@app.post("/tarefas/lote", response_model=ResultadoLoteSchema)
+def operar_tarefas_em_lote(pedido: OperacaoLoteSchema, db: Session = Depends(get_db)):
+    """
+    Conclui, reabre, atribui ou apaga várias tarefas numa só transação (um UPDATE/DELETE
+    ... WHERE id IN). Devolve o resultado de cada id; ids inexistentes não falham o lote.
+    """
+    try:
+        resultado = aplicar_operacao_lote(db, pedido.operacao, pedido.ids, pedido.empregado_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if resultado["alteradas"]:
+        # A carga (tarefas_abertas) dos empregados também pode ter mudado
+        versoes.incrementar("empregados", "tarefas")
+    return resultado
 
 @app.delete("/tarefas/{tarefa_id}")
 def deletar_tarefa(tarefa_id: int, db: Session = Depends(get_db)):
-    t = db.query(Tarefa).filter(Tarefa.id == tarefa_id).first()
-    if t:
-        db.delete(t)
-        db.commit()
+    if not delete_tarefa(db, tarefa_id):
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+    versoes.incrementar("tarefas")
     return {"message": "Deletada"}
+
+# --- ATRIBUIÇÃO AUTOMÁTICA ---
+
+@app.post("/agendamento/atribuir")
+def atribuir_automaticamente(cargo: Optional[str] = None, dry_run: bool = False, db: Session = Depends(get_db)):
+    """
+    Atribui todas as tarefas pendentes sem responsável, das mais urgentes para as menos,
+    sempre ao empregado menos carregado (opcionalmente só do 'cargo' informado).
+    Com dry_run=true nada é gravado e o plano proposto é devolvido.
+    """
+    resultado = atribuir_tarefas_pendentes(db, cargo=cargo, simular=dry_run)
+    if resultado["atribuidas"] and not dry_run:
+        versoes.incrementar("empregados", "tarefas")
+    return resultado
+
+# --- PLANEJAMENTO (EDF) ---
+
+@app.get("/planejamento/", response_model=List[PlanejamentoEmpregadoSchema])
+def listar_planejamento(request: Request, somente_em_risco: bool = False, db: Session = Depends(get_db)):
+    """
+    Linha do tempo de cada empregado (prazo mais próximo primeiro), com as tarefas que vão
+    estourar o prazo. Com somente_em_risco=true, só empregados com algum atraso previsto.
+    """
+    hoje = date.today()
+    cond = ConsultaCondicional(request, ("empregados", "tarefas"), extra=f"{hoje.isoformat()}:{somente_em_risco}")
+    pronta = cond.resposta_pronta()
+    if pronta is not None:
+        return pronta
+    planos = [resumir(e, linha) for e, linha in sorted(planejador.todas(db, hoje).items())]
+    if somente_em_risco:
+        planos = [p for p in planos if p["atrasadas_previstas"]]
+    return cond.responder(planos)
+
+@app.get("/planejamento/{empregado_id}", response_model=PlanejamentoEmpregadoSchema)
+def obter_planejamento(empregado_id: int, request: Request, db: Session = Depends(get_db)):
+    """Linha do tempo de um empregado. Só a dele é recalculada quando as tarefas dele mudam."""
+    hoje = date.today()
+    cond = ConsultaCondicional(request, ("empregados", "tarefas"), extra=f"{hoje.isoformat()}:{empregado_id}")
+    pronta = cond.resposta_pronta()
+    if pronta is not None:
+        return pronta
+    linha = planejador.linha_do_tempo(db, empregado_id, hoje)
+    if linha is None:
+        raise HTTPException(status_code=404, detail="Empregado não encontrado")
+    return cond.responder(resumir(empregado_id, linha))
+
+# --- ESTATÍSTICAS ---
+
+@app.get("/estatisticas/empregados", response_model=List[EstatisticaEmpregadoSchema])
+def listar_estatisticas_empregados(request: Request, db: Session = Depends(get_db)):
+    """Pendentes, atrasadas e concluídas por empregado, calculadas com GROUP BY no banco."""
+    hoje = date.today()
+    cond = ConsultaCondicional(request, ("empregados", "tarefas"), extra=hoje.isoformat())
+    pronta = cond.resposta_pronta()
+    if pronta is not None:
+        return pronta
+    return cond.responder(estatisticas_por_empregado(db, hoje))
+
+@app.get("/empregados/carga", response_model=List[CargaEmpregadoSchema])
+def listar_carga_empregados(request: Request, cargo: Optional[str] = None, db: Session = Depends(get_db)):
+    """Tarefas abertas por empregado (contador mantido a cada escrita), do menos para o mais carregado."""
+    cond = ConsultaCondicional(request, ("empregados", "tarefas"))
+    pronta = cond.resposta_pronta()
+    if pronta is not None:
+        return pronta
+    query = db.query(Empregado)
+    if cargo is not None:
+        query = query.filter(Empregado.cargo == cargo)
+    empregados = query.order_by(Empregado.tarefas_abertas.asc(), Empregado.id.asc()).all()
+    return cond.responder([CargaEmpregadoSchema.model_validate(e) for e in empregados])
+
+@app.get("/estatisticas/dashboard", response_model=DashboardSchema)
+def obter_estatisticas_dashboard(request: Request, db: Session = Depends(get_db)):
+    """Totais do painel (pendentes, atrasadas, concluídas, da semana, sem responsável)."""
+    hoje = date.today()
+    cond = ConsultaCondicional(request, ("tarefas",), extra=hoje.isoformat())
+    pronta = cond.resposta_pronta()
+    if pronta is not None:
+        return pronta
+    return cond.responder(estatisticas_dashboard(db, hoje))
+
+# --- SINCRONIZAÇÃO INCREMENTAL ---
+
+@app.get("/changes", response_model=AlteracoesSchema)
+def listar_mudancas(since: Optional[int] = Query(None, ge=0), db: Session = Depends(get_db)):
+    """
+    Tudo o que mudou depois do token 'since': linhas criadas/alteradas e IDs removidos.
+    Sem 'since', devolve só o token atual: o cliente guarda o token, faz a carga inicial
+    pelas listagens e a partir daí pede apenas as diferenças.
+    Aplique as remoções antes das alterações (um ID removido pode ter sido reaproveitado).
+    410 se 'since' é mais antigo que as lápides guardadas (REMOCOES_DIAS): o cliente descarta
+    a cópia local e refaz a carga completa.
+    """
+    alteracoes = listar_alteracoes(db, desde=since)
+    if alteracoes["resync"]:
+        raise HTTPException(status_code=410, detail="Token mais antigo que as remoções guardadas: refaça a carga completa.")
+    return alteracoes
+
+@app.get("/eventos")
+async def stream_eventos(request: Request, since: Optional[int] = Query(None, ge=0)):
+    """
+    Server-Sent Events com as alterações de Empregado/Tarefa assim que acontecem
+    (evento 'alteracoes', mesmo formato do GET /changes; o id do evento é o token).
+    Ao reconectar, o navegador manda Last-Event-ID e recebe o que perdeu.
+    Evento 'resync': o cliente ficou para trás e deve chamar GET /changes.
+    """
+    ultimo_id = request.headers.get("last-event-id")
+    desde = int(ultimo_id) if ultimo_id and ultimo_id.isdigit() else since
+    return StreamingResponse(
+        gerar_stream(desde), media_type="text/event-stream",
+        # X-Accel-Buffering: impede que proxies (nginx) segurem os eventos em buffer
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# --- IMPORTAÇÃO EM MASSA ---
+
+@app.post("/importar/{entidade}")
+async def importar_em_lote(
+    entidade: Literal["empregados", "tarefas"],
+    request: Request,
+    formato: Optional[Literal["ndjson", "csv"]] = None,
+    lote: int = Query(TAMANHO_LOTE_PADRAO, ge=1, le=10000),
+    db: Session = Depends(get_db),
+):
+    """
+    Recebe NDJSON (um objeto por linha) ou CSV (com cabeçalho; campos entre aspas podem ter
+    quebras de linha) no corpo, em UTF-8, e grava em lotes.
+    O formato vem do parâmetro 'formato' ou do Content-Type (text/csv); o padrão é NDJSON.
+    Responde com o total inserido e os erros por linha.
+    """
+    if formato is None:
+        formato = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+
+    importador = ImportadorEmLote(db, entidade, formato, tamanho_lote=lote)
+    pendentes = []
+    async for numero, linha in ler_linhas(request.stream(), formato):
+        pendentes.append((numero, linha))
+        if len(pendentes) >= lote:
+            # Validação e gravação são síncronas (SQLAlchemy): rodam fora do event loop
+            await run_in_threadpool(importador.processar, pendentes)
+            pendentes = []
+    relatorio = await run_in_threadpool(importador.finalizar, pendentes)
+    if relatorio["inseridos"]:
+        await run_in_threadpool(versoes.incrementar, entidade)
+    return relatorio
+
+# --- DIAGNÓSTICO ---
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def exportar_metricas():
+    """Métricas no formato do Prometheus, somadas de todos os workers desta máquina."""
+    return PlainTextResponse(metricas.exportar_texto(), media_type="text/plain; version=0.0.4")
+
+@app.get("/diagnostico/pool")
+def diagnostico_pool():
+    """Pool de conexões do worker que atendeu (cada worker do uvicorn tem o seu)."""
+    dados = {"sincrono": estatisticas_pool(engine)}
+    if async_engine is not None:
+        dados["assincrono"] = estatisticas_pool(async_engine.sync_engine)
+    return dados
+
+# ==========================================================
+# ⚡ MODO ASSÍNCRONO (DB_ASYNC=1)
+# ==========================================================
+# As rotas de rotas_async.py substituem as versões síncronas de mesmo caminho/método.
+# Este bloco fica no fim do arquivo: só aqui todas as rotas síncronas já foram registradas.
+if USAR_DB_ASYNC:
+    from fastapi.routing import APIRoute
+    from rotas_async import router as router_async
+
+    substituidas = {(rota.path, metodo) for rota in router_async.routes for metodo in rota.methods}
+    app.router.routes = [
+        rota for rota in app.router.routes
+        if not (isinstance(rota, APIRoute) and any((rota.path, m) in substituidas for m in rota.methods))
+    ]
+    app.include_router(router_async)
@@ -0,0 +1,379 @@
+# metricas.py
+# Métricas da API no formato texto do Prometheus (GET /metrics), sem coletor externo.
+#
+# - Latência e requisições em andamento por rota: middleware ASGI puro (sem BaseHTTPMiddleware,
+#   que cria uma tarefa e filas extras por requisição).
+# - Consultas SQL por requisição (quantidade e tempo): eventos before/after_cursor_execute do
+#   engine, somados no "acumulador" da requisição atual (contextvar; as rotas síncronas rodam
+#   no threadpool com uma cópia do contexto, então enxergam o mesmo acumulador).
+# - Espera pelo pool de conexões: subclasses do QueuePool que medem o checkout.
+#
+# Cada worker guarda os números em memória e grava um retrato (JSON) a cada poucos segundos
+# em um diretório compartilhado; o /metrics soma os retratos de todos os workers vivos.
+# Este módulo não importa database.py: é o database.py que liga os ganchos no engine.
+# Só depende do SQLAlchemy no import (o app desktop carrega o database.py sem o starlette);
+# o que é da API (middleware) importa o starlette quando é usado.
+import contextvars
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+Labels = Tuple[Tuple[str, str], ...]
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+BUCKETS_POOL = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+# Intervalo entre as gravações do retrato de cada worker
+INTERVALO_GRAVACAO = float(os.environ.get("METRICAS_INTERVALO", "2"))
+
+DIRETORIO_METRICAS = os.environ.get("METRICAS_DIR") or os.path.join(
+    tempfile.gettempdir(),
+    # Um diretório por banco, como o arquivo de versões (versoes.py)
+    f"flowscheduler-metricas-{hashlib.sha1(os.environ.get('DATABASE_URL', '').encode()).hexdigest()[:12]}",
+)
+
+DESCRICOES = {
+    "flow_http_requisicoes_total": ("counter", "Requisições HTTP atendidas, por rota e status."),
+    "flow_http_duracao_segundos": ("histogram", "Latência das requisições HTTP, por rota."),
+    "flow_http_em_andamento": ("gauge", "Requisições HTTP em andamento, por rota."),
+    "flow_sql_consultas_por_requisicao": ("histogram", "Consultas SQL executadas em cada requisição, por rota."),
+    "flow_sql_segundos_por_requisicao": ("histogram", "Tempo total em SQL de cada requisição, por rota."),
+    "flow_sql_consultas_total": ("counter", "Consultas SQL executadas (dentro e fora de requisições)."),
+    "flow_sql_segundos_total": ("counter", "Tempo total gasto em consultas SQL."),
+    "flow_pool_espera_segundos": ("histogram", "Espera para obter uma conexão do pool (inclui abrir conexões novas)."),
+    "flow_versao_trava_segundos": ("histogram", "Tempo entre reservar a versão (database.proxima_versao) e o commit/rollback: o contador fica travado."),
+    "flow_workers": ("gauge", "Workers cujos retratos foram somados nesta leitura."),
+}
+
+
+# --- REGISTRO EM MEMÓRIA (POR WORKER) ---
+
+class Registro:
+    """Contadores, medidores e histogramas do processo. Atualizações sob uma trava simples."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.contadores: Dict[Tuple[str, Labels], float] = {}
+        self.medidores: Dict[Tuple[str, Labels], float] = {}
+        # (nome, labels) -> [buckets, contagem por bucket (não acumulada), soma, total]
+        self.histogramas: Dict[Tuple[str, Labels], list] = {}
+
+    def somar(self, nome: str, labels: Labels, valor: float = 1):
+        chave = (nome, labels)
+        with self._trava:
+            self.contadores[chave] = self.contadores.get(chave, 0) + valor
+
+    def ajustar(self, nome: str, labels: Labels, delta: float):
+        chave = (nome, labels)
+        with self._trava:
+            self.medidores[chave] = self.medidores.get(chave, 0) + delta
+
+    def observar(self, nome: str, labels: Labels, valor: float, buckets: Tuple[float, ...]):
+        chave = (nome, labels)
+        with self._trava:
+            hist = self.histogramas.get(chave)
+            if hist is None:
+                hist = self.histogramas[chave] = [buckets, [0] * len(buckets), 0.0, 0]
+            for i, limite in enumerate(buckets):
+                if valor <= limite:
+                    hist[1][i] += 1
+                    break
+            hist[2] += valor
+            hist[3] += 1
+
+    def retrato(self) -> dict:
+        """Cópia serializável em JSON."""
+        with self._trava:
+            return {
+                "contadores": [[n, list(map(list, l)), v] for (n, l), v in self.contadores.items()],
+                "medidores": [[n, list(map(list, l)), v] for (n, l), v in self.medidores.items()],
+                "histogramas": [
+                    [n, list(map(list, l)), list(h[0]), list(h[1]), h[2], h[3]]
+                    for (n, l), h in self.histogramas.items()
+                ],
+            }
+
+
+registro = Registro()
+
+
+def _labels(**valores: str) -> Labels:
+    return tuple(valores.items())
+
+
+# --- CONSULTAS SQL ---
+
+# Acumulador [consultas, segundos] da requisição em andamento (None fora de requisições)
+# (anotação em texto: ContextVar só aceita subscrito a partir do Python 3.9)
+_consultas_requisicao: "contextvars.ContextVar[Optional[List[float]]]" = contextvars.ContextVar(
+    "consultas_requisicao", default=None
+)
+
+
+def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+
+def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+    inicios = conn.info.get("metricas_inicio")
+    if not inicios:
+        return
+    duracao = time.perf_counter() - inicios.pop()
+    registro.somar("flow_sql_consultas_total", ())
+    registro.somar("flow_sql_segundos_total", (), duracao)
+    acumulador = _consultas_requisicao.get()
+    if acumulador is not None:
+        acumulador[0] += 1
+        acumulador[1] += duracao
+
+
+# --- TRAVA DO CONTADOR DE VERSÕES ---
+# database.proxima_versao marca em conn.info quando reservou a versão; o fim da transação
+# mede por quanto tempo a linha do contador ficou travada (o teto de escritas por segundo).
+
+CHAVE_VERSAO_RESERVADA = "versao_reservada_em"
+
+
+def _fim_da_transacao(conn):
+    inicio = conn.info.pop(CHAVE_VERSAO_RESERVADA, None)
+    if inicio is not None:
+        registro.observar("flow_versao_trava_segundos", (), time.perf_counter() - inicio, BUCKETS_LATENCIA)
+
+
+def instrumentar_engine(engine):
+    """Liga a contagem de consultas no engine (síncrono, ou o sync_engine de um AsyncEngine)."""
+    event.listen(engine, "before_cursor_execute", _antes_da_consulta)
+    event.listen(engine, "after_cursor_execute", _depois_da_consulta)
+    event.listen(engine, "commit", _fim_da_transacao)
+    event.listen(engine, "rollback", _fim_da_transacao)
+
+
+# --- ESPERA NO POOL ---
+
+class _EsperaMedida:
+    """Mede o checkout do pool (_do_get): fila de espera + abertura de conexão nova."""
+    nome_pool = "sincrono"
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            registro.observar(
+                "flow_pool_espera_segundos", (("pool", self.nome_pool),),
+                time.perf_counter() - inicio, BUCKETS_POOL,
+            )
+
+
+class QueuePoolMedido(_EsperaMedida, QueuePool):
+    pass
+
+
+class AsyncAdaptedQueuePoolMedido(_EsperaMedida, AsyncAdaptedQueuePool):
+    nome_pool = "assincrono"
+
+
+# --- MIDDLEWARE HTTP ---
+
+class MiddlewareMetricas:
+    """Middleware ASGI: latência, em andamento e SQL por rota (o molde da rota, não o caminho)."""
+
+    def __init__(self, app):
+        self.app = app
+        # (método, caminho) -> molde da rota, para não refazer o casamento a cada requisição
+        self._rotas: Dict[Tuple[str, str], str] = {}
+
+    def _rota(self, scope) -> str:
+        chave = (scope["method"], scope["path"])
+        rota = self._rotas.get(chave)
+        if rota is None:
+            from starlette.routing import Match
+            rota = "nao_encontrada"  # 404: um rótulo só, para não criar uma série por URL
+            for candidata in scope["app"].router.routes:
+                if candidata.matches(scope)[0] == Match.FULL:
+                    rota = getattr(candidata, "path", rota)
+                    break
+            if len(self._rotas) >= 4096:
+                self._rotas.clear()  # Caminhos com IDs não podem crescer o cache sem limite
+            self._rotas[chave] = rota
+        return rota
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        _garantir_gravador()
+
+        rota = self._rota(scope)
+        por_rota = _labels(metodo=scope["method"], rota=rota)
+        status = [500]
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                status[0] = mensagem["status"]
+            await send(mensagem)
+
+        acumulador = [0, 0.0]
+        token = _consultas_requisicao.set(acumulador)
+        registro.ajustar("flow_http_em_andamento", por_rota, 1)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = time.perf_counter() - inicio
+            _consultas_requisicao.reset(token)
+            registro.ajustar("flow_http_em_andamento", por_rota, -1)
+            registro.somar("flow_http_requisicoes_total", por_rota + (("status", str(status[0])),))
+            registro.observar("flow_http_duracao_segundos", por_rota, duracao, BUCKETS_LATENCIA)
+            registro.observar("flow_sql_consultas_por_requisicao", por_rota, acumulador[0], BUCKETS_CONSULTAS)
+            registro.observar("flow_sql_segundos_por_requisicao", por_rota, acumulador[1], BUCKETS_LATENCIA)
+
+
+# --- RETRATOS POR WORKER E AGREGAÇÃO ---
+
+_gravador_pid: Optional[int] = None
+
+
+def _arquivo_do_worker(pid: int) -> str:
+    return os.path.join(DIRETORIO_METRICAS, f"{pid}.json")
+
+
+def gravar_retrato():
+    """Grava o retrato deste worker (troca atômica: o leitor nunca vê um arquivo pela metade)."""
+    os.makedirs(DIRETORIO_METRICAS, exist_ok=True)
+    destino = _arquivo_do_worker(os.getpid())
+    # Temporário por thread: o /metrics (threadpool) e a thread de gravação podem gravar juntos
+    temporario = f"{destino}.{threading.get_ident()}.tmp"
+    with open(temporario, "w") as arquivo:
+        json.dump(registro.retrato(), arquivo)
+    os.replace(temporario, destino)
+
+
+def _loop_gravacao():
+    while True:
+        time.sleep(INTERVALO_GRAVACAO)
+        try:
+            gravar_retrato()
+        except OSError:
+            pass
+
+
+def _garantir_gravador():
+    """Sobe a thread de gravação na primeira requisição do worker (depois de um eventual fork)."""
+    global _gravador_pid
+    if _gravador_pid == os.getpid():
+        return
+    _gravador_pid = os.getpid()
+    threading.Thread(target=_loop_gravacao, name="metricas-gravador", daemon=True).start()
+
+
+def _processo_vivo(pid: int) -> bool:
+    if os.name != "posix":
+        return True  # No Windows o sinal 0 não é uma consulta; lá o servidor roda em um processo
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _ler_retratos() -> List[dict]:
+    retratos = []
+    if not os.path.isdir(DIRETORIO_METRICAS):
+        return retratos
+    for nome in os.listdir(DIRETORIO_METRICAS):
+        if not nome.endswith(".json"):
+            continue
+        caminho = os.path.join(DIRETORIO_METRICAS, nome)
+        pid = int(nome[:-5]) if nome[:-5].isdigit() else None
+        if pid is not None and not _processo_vivo(pid):
+            # Worker que já morreu: os números dele saem da soma
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(caminho) as arquivo:
+                retratos.append(json.load(arquivo))
+        except (OSError, ValueError):
+            continue
+    return retratos
+
+
+def limpar():
+    """Apaga os retratos da execução anterior (chamado antes de subir os workers)."""
+    if os.path.isdir(DIRETORIO_METRICAS):
+        for nome in os.listdir(DIRETORIO_METRICAS):
+            try:
+                os.remove(os.path.join(DIRETORIO_METRICAS, nome))
+            except OSError:
+                pass
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatar_labels(labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pares = list(labels) + ([extra] if extra else [])
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(str(v))}"' for k, v in pares) + "}"
+
+
+def _numero(valor: float) -> str:
+    return repr(float(valor)) if isinstance(valor, float) and not float(valor).is_integer() else str(int(valor))
+
+
+def exportar_texto() -> str:
+    """Soma os retratos de todos os workers e devolve o texto do Prometheus."""
+    gravar_retrato()  # O retrato deste worker sai sempre atualizado
+    retratos = _ler_retratos()
+
+    escalares: Dict[Tuple[str, tuple], float] = {}
+    histogramas: Dict[Tuple[str, tuple], list] = {}
+    for retrato in retratos:
+        for nome, labels, valor in retrato["contadores"] + retrato["medidores"]:
+            chave = (nome, tuple(map(tuple, labels)))
+            escalares[chave] = escalares.get(chave, 0) + valor
+        for nome, labels, buckets, contagens, soma, total in retrato["histogramas"]:
+            chave = (nome, tuple(map(tuple, labels)))
+            atual = histogramas.get(chave)
+            if atual is None:
+                histogramas[chave] = [buckets, list(contagens), soma, total]
+            else:
+                atual[1] = [a + b for a, b in zip(atual[1], contagens)]
+                atual[2] += soma
+                atual[3] += total
+    escalares[("flow_workers", ())] = len(retratos)
+
+    linhas = []
+    for nome, (tipo, ajuda) in DESCRICOES.items():
+        series = sorted(k for k in escalares if k[0] == nome)
+        hist = sorted(k for k in histogramas if k[0] == nome)
+        if not series and not hist:
+            continue
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+        for chave in series:
+            linhas.append(f"{nome}{_formatar_labels(chave[1])} {_numero(escalares[chave])}")
+        for chave in hist:
+            buckets, contagens, soma, total = histogramas[chave]
+            acumulado = 0
+            for limite, contagem in zip(buckets, contagens):
+                acumulado += contagem
+                linhas.append(f"{nome}_bucket{_formatar_labels(chave[1], ('le', repr(float(limite))))} {acumulado}")
+            linhas.append(f"{nome}_bucket{_formatar_labels(chave[1], ('le', '+Inf'))} {total}")
+            linhas.append(f"{nome}_sum{_formatar_labels(chave[1])} {_numero(soma)}")
+            linhas.append(f"{nome}_count{_formatar_labels(chave[1])} {total}")
+    return "\n".join(linhas) + "\n"
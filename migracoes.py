@@ -0,0 +1,302 @@
+# migracoes.py
+# Ajustes de schema/dados para bancos que já existem. O create_all só cria tabelas novas:
+# ele não altera colunas nem cria índices em tabelas que já estão no banco.
+# Todas as funções aqui são idempotentes (podem rodar a cada deploy sem efeito colateral).
+#
+# Cada migração tem um número (lista MIGRACOES, no fim do arquivo) e as aplicadas ficam na
+# tabela versao_schema. O bootstrap (preparar_banco, chamado por initial_setup.py/init_db.py)
+# só faz DDL quando o banco está atrás da versão do código; os workers da API não fazem DDL.
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+from models import Base, Empregado, Remocao, Tarefa, TarefaArquivada, VersaoSchema
+
+# Formatos aceitos no campo texto antigo de prazo (o primeiro é o ISO gravado pela API)
+FORMATOS_PRAZO = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d", "%d/%m/%y")
+
+TAMANHO_LOTE = 1000
+
+
+def _normalizar_prazo(valor) -> Optional[str]:
+    """Converte o texto de prazo antigo para ISO (AAAA-MM-DD). Retorna None se não for uma data."""
+    if valor is None:
+        return None
+    texto = str(valor).strip()
+    for formato in FORMATOS_PRAZO:
+        try:
+            return datetime.strptime(texto, formato).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def migrar_prazo_para_date(engine: Engine):
+    """
+    Converte tarefas.prazo de texto livre para data.
+    - Reescreve todos os valores em ISO (datas inválidas viram NULL e são listadas no log).
+    - No PostgreSQL, muda o tipo da coluna para DATE.
+    - No SQLite não existe tipo DATE nativo: o SQLAlchemy grava a data como texto ISO,
+      então basta normalizar os valores para que a ordenação e o índice funcionem.
+    """
+    colunas = {c["name"]: c for c in inspect(engine).get_columns("tarefas")}
+    if "prazo" not in colunas:
+        return
+    if engine.dialect.name == "postgresql" and colunas["prazo"]["type"].python_type is not str:
+        return  # Já é DATE
+
+    invalidos = []
+    convertidas = 0
+    with engine.begin() as conn:
+        # Percorre a tabela em lotes pelo id para não carregar tudo na memória
+        ultimo_id = 0
+        while True:
+            linhas = conn.execute(
+                text("SELECT id, prazo FROM tarefas WHERE id > :ultimo AND prazo IS NOT NULL ORDER BY id LIMIT :lote"),
+                {"ultimo": ultimo_id, "lote": TAMANHO_LOTE},
+            ).all()
+            if not linhas:
+                break
+            ultimo_id = linhas[-1][0]
+
+            alteracoes = []
+            for tarefa_id, prazo in linhas:
+                novo = _normalizar_prazo(prazo)
+                if novo is None:
+                    invalidos.append(tarefa_id)
+                if novo != prazo:
+                    alteracoes.append({"id": tarefa_id, "prazo": novo})
+            if alteracoes:
+                conn.execute(text("UPDATE tarefas SET prazo = :prazo WHERE id = :id"), alteracoes)
+                convertidas += len(alteracoes)
+
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("ALTER TABLE tarefas ALTER COLUMN prazo TYPE DATE USING prazo::date"))
+
+    if convertidas:
+        print(f"Prazo convertido para data em {convertidas} tarefa(s).")
+    if invalidos:
+        print(f"⚠️ Prazos inválidos (gravados como NULL) nas tarefas: {invalidos}")
+
+
+def _adicionar_coluna(engine: Engine, tabela: str, coluna: str, definicao: str) -> bool:
+    """ALTER TABLE ... ADD COLUMN, só se a coluna ainda não existir. Retorna True se criou."""
+    if coluna in {c["name"] for c in inspect(engine).get_columns(tabela)}:
+        return False
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {definicao}"))
+    print(f"Coluna {tabela}.{coluna} adicionada.")
+    return True
+
+
+def adicionar_colunas_de_versao(engine: Engine):
+    """Colunas da sincronização incremental. Linhas antigas ficam com versão 0."""
+    for tabela in ("empregados", "tarefas"):
+        _adicionar_coluna(engine, tabela, "versao", "INTEGER NOT NULL DEFAULT 0")
+        _adicionar_coluna(engine, tabela, "atualizado_em", "TIMESTAMP")
+
+
+def adicionar_carga_trabalho(engine: Engine):
+    """Contador de tarefas abertas por empregado: criado zerado e preenchido pela reconciliação."""
+    if _adicionar_coluna(engine, "empregados", "tarefas_abertas", "INTEGER NOT NULL DEFAULT 0"):
+        from database import SessionLocal, reconciliar_carga_trabalho
+        db = SessionLocal()
+        try:
+            print(f"Carga de trabalho calculada para {len(reconciliar_carga_trabalho(db))} empregado(s).")
+        finally:
+            db.close()
+
+
+def adicionar_esforco_estimado(engine: Engine):
+    """Estimativa de esforço das tarefas (planejador). Tarefas antigas ficam sem estimativa."""
+    _adicionar_coluna(engine, "tarefas", "esforco_horas", "FLOAT")
+
+
+def criar_busca_textual(engine: Engine):
+    """Índice de busca em título/descrição (FTS5 no SQLite, tsvector + GIN no PostgreSQL)."""
+    from busca import criar_indice_busca
+    criar_indice_busca(engine)
+
+
+def criar_arquivo_de_tarefas(engine: Engine):
+    """
+    Tabela das tarefas concluídas arquivadas (arquivo.py). O índice de seleção vem de criar_indices.
+    Tarefas sem atualizado_em (gravadas antes da migração 2) passam a contar a idade a partir
+    de agora: sem isso o primeiro arquivamento levaria todas as concluídas, de qualquer data.
+    """
+    TarefaArquivada.__table__.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.execute(
+            Tarefa.__table__.update().where(Tarefa.atualizado_em.is_(None)).values(atualizado_em=datetime.utcnow())
+        )
+
+
+def _fk_empregado_tarefas(engine: Engine) -> Optional[dict]:
+    """Chave estrangeira tarefas.empregado_id -> empregados.id como o banco a descreve."""
+    for fk in inspect(engine).get_foreign_keys("tarefas"):
+        if fk["constrained_columns"] == ["empregado_id"]:
+            return fk
+    return None
+
+
+def tarefas_sem_responsavel_ao_apagar_empregado(engine: Engine):
+    """
+    tarefas.empregado_id passa a ser ON DELETE SET NULL: apagar um empregado deixa as tarefas
+    dele sem responsável, no próprio banco, sem o ORM carregar nenhuma. Responsáveis que já
+    não existem (gravados enquanto o SQLite não conferia as chaves) viram NULL.
+    - PostgreSQL: troca a constraint (ALTER TABLE).
+    - SQLite: não altera constraints; a tabela é recriada (cópia em uma transação, com as
+      chaves desligadas nesta conexão) e os triggers da busca textual, que somem com a tabela
+      antiga, são recriados. Os índices voltam em criar_indices, ao final das migrações.
+    """
+    fk = _fk_empregado_tarefas(engine)
+    if fk is not None and (fk.get("options") or {}).get("ondelete", "").upper() == "SET NULL":
+        return
+    orfas = text("UPDATE tarefas SET empregado_id = NULL WHERE empregado_id IS NOT NULL "
+                 "AND empregado_id NOT IN (SELECT id FROM empregados)")
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(orfas)
+            if fk is not None and fk.get("name"):
+                conn.execute(text(f'ALTER TABLE tarefas DROP CONSTRAINT "{fk["name"]}"'))
+            conn.execute(text("ALTER TABLE tarefas ADD CONSTRAINT tarefas_empregado_id_fkey FOREIGN KEY (empregado_id) "
+                              "REFERENCES empregados (id) ON DELETE SET NULL"))
+        return
+    if engine.dialect.name != "sqlite":
+        return
+
+    from sqlalchemy.schema import CreateTable
+    colunas = ", ".join(c.name for c in Tarefa.__table__.columns)
+    criar = str(CreateTable(Tarefa.__table__).compile(dialect=engine.dialect))
+    with engine.connect() as conn:
+        # O PRAGMA não tem efeito dentro de uma transação: vale para esta conexão, antes do begin
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        conn.commit()  # Encerra o autobegin do SQLAlchemy (no driver nenhuma transação foi aberta)
+        try:
+            with conn.begin():
+                conn.execute(orfas)
+                conn.exec_driver_sql(criar.replace("CREATE TABLE tarefas", "CREATE TABLE tarefas_nova", 1))
+                conn.exec_driver_sql(f"INSERT INTO tarefas_nova ({colunas}) SELECT {colunas} FROM tarefas")
+                conn.exec_driver_sql("DROP TABLE tarefas")
+                conn.exec_driver_sql("ALTER TABLE tarefas_nova RENAME TO tarefas")
+                problemas = conn.exec_driver_sql("PRAGMA foreign_key_check(tarefas)").all()
+                if problemas:
+                    raise RuntimeError(f"Chaves estrangeiras inválidas em tarefas: {problemas[:10]}")
+        finally:
+            conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+            conn.commit()
+    # Os ids são os mesmos, mas o rebuild deixa o índice da busca conferido com a tabela nova
+    criar_busca_textual(engine)
+    print("Tarefas recriadas com ON DELETE SET NULL no responsável.")
+
+
+def criar_indices(engine: Engine):
+    """Cria os índices declarados em models.py que ainda não existem no banco."""
+    # IF NOT EXISTS em vez de checkfirst: a reflexão do SQLite não enxerga índices de expressão
+    with engine.begin() as conn:
+        for modelo in (Empregado, Tarefa, TarefaArquivada):
+            for indice in modelo.__table__.indexes:
+                conn.execute(CreateIndex(indice, if_not_exists=True))
+
+
+INDICES_DE_PRAZO = ("ix_tarefas_prazo_ordem_id", "ix_tarefas_concluida_prazo_ordem_id")
+
+
+def criar_indices_de_prazo(engine: Engine):
+    """
+    Cria ix_tarefas_prazo_ordem_id e ix_tarefas_concluida_prazo_ordem_id, os índices de
+    expressão sobre models.PRAZO_ORDENACAO que a paginação por prazo (com as tarefas sem prazo
+    no fim) percorre.
+    """
+    with engine.begin() as conn:
+        for indice in Tarefa.__table__.indexes:
+            if indice.name in INDICES_DE_PRAZO:
+                conn.execute(CreateIndex(indice, if_not_exists=True))
+
+
+def retencao_das_remocoes(engine: Engine):
+    """
+    Data das lápides e o piso do GET /changes (database.descartar_remocoes_antigas).
+    As lápides existentes contam a idade a partir de agora.
+    """
+    _adicionar_coluna(engine, "remocoes", "removida_em", "TIMESTAMP")
+    _adicionar_coluna(engine, "contador_versao", "remocoes_ate", "INTEGER NOT NULL DEFAULT 0")
+    with engine.begin() as conn:
+        conn.execute(
+            Remocao.__table__.update().where(Remocao.removida_em.is_(None)).values(removida_em=datetime.utcnow())
+        )
+
+
+# --- VERSÃO DO SCHEMA ---
+
+# (número, descrição, função). Migrações novas entram SEMPRE no fim, com o próximo número.
+# Índices novos declarados em models.py são criados por criar_indices, que roda ao final de
+# qualquer bootstrap que aplicou migrações: basta a migração que os introduziu existir.
+MIGRACOES = (
+    (1, "prazo de texto para data", migrar_prazo_para_date),
+    (2, "colunas de versão (sincronização incremental)", adicionar_colunas_de_versao),
+    (3, "contador de tarefas abertas por empregado", adicionar_carga_trabalho),
+    (4, "esforço estimado das tarefas", adicionar_esforco_estimado),
+    (5, "busca textual nas tarefas", criar_busca_textual),
+    (6, "arquivo de tarefas concluídas", criar_arquivo_de_tarefas),
+    (7, "tarefas sem responsável ao apagar o empregado", tarefas_sem_responsavel_ao_apagar_empregado),
+    (8, "índices ix_tarefas_prazo_ordem_id e ix_tarefas_concluida_prazo_ordem_id (paginação por prazo com tarefas sem prazo)",
+     criar_indices_de_prazo),
+    (9, "retenção das lápides do GET /changes", retencao_das_remocoes),
+)
+VERSAO_ATUAL = MIGRACOES[-1][0]
+
+# Chave do pg_advisory_lock que serializa bootstraps simultâneos (várias instâncias subindo juntas)
+CHAVE_TRAVA_BOOTSTRAP = 0x466C6F77
+
+
+def versao_do_schema(engine: Engine) -> int:
+    """Versão do schema gravada no banco (0 se a tabela ainda não existe ou está vazia)."""
+    if not inspect(engine).has_table(VersaoSchema.__tablename__):
+        return 0
+    with engine.connect() as conn:
+        return conn.execute(select(func.max(VersaoSchema.versao))).scalar() or 0
+
+
+def aplicar_migracoes(engine: Engine) -> int:
+    """Executa, na ordem, as migrações ainda não registradas. Retorna quantas rodaram."""
+    with engine.connect() as conn:
+        aplicadas = set(conn.scalars(select(VersaoSchema.versao)))
+    pendentes = [m for m in MIGRACOES if m[0] not in aplicadas]
+    for numero, descricao, migrar in pendentes:
+        migrar(engine)
+        with engine.begin() as conn:
+            conn.execute(VersaoSchema.__table__.insert().values(
+                versao=numero, descricao=descricao, aplicada_em=datetime.utcnow()
+            ))
+        print(f"Migração {numero} aplicada: {descricao}.")
+    if pendentes:
+        criar_indices(engine)
+    return len(pendentes)
+
+
+def preparar_banco(engine: Engine) -> bool:
+    """
+    Bootstrap do banco: se já está na VERSAO_ATUAL, custa um SELECT e não faz nada.
+    Senão cria as tabelas que faltam e aplica as migrações pendentes. Retorna True se alterou.
+    """
+    if versao_do_schema(engine) >= VERSAO_ATUAL:
+        return False
+    with engine.connect() as trava:
+        if engine.dialect.name == "postgresql":
+            # Outra instância pode estar migrando agora: espera ela terminar e confere de novo
+            trava.execute(text("SELECT pg_advisory_lock(:chave)"), {"chave": CHAVE_TRAVA_BOOTSTRAP})
+        try:
+            if versao_do_schema(engine) >= VERSAO_ATUAL:
+                return False
+            Base.metadata.create_all(bind=engine)
+            aplicar_migracoes(engine)
+            return True
+        finally:
+            if engine.dialect.name == "postgresql":
+                trava.execute(text("SELECT pg_advisory_unlock(:chave)"), {"chave": CHAVE_TRAVA_BOOTSTRAP})
+                trava.commit()
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, Float, ForeignKey, Index, func, literal_column
 from sqlalchemy.orm import relationship, declarative_base
+from datetime import datetime, timezone
 
 Base = declarative_base()
 
@@ -10,9 +11,22 @@ class Empregado(Base):
     nome = Column(String, index=True)
     cargo = Column(String)
     email = Column(String, unique=True, index=True)
+
+    # Carga de trabalho desnormalizada: tarefas pendentes atribuídas a este empregado.
+    # Mantida na mesma transação de cada escrita em Tarefa (ver database.aplicar_deltas_carga)
+    # e conferida/reconstruída por reconciliar_carga.py.
+    tarefas_abertas = Column(Integer, nullable=False, default=0)
+
+    # Sincronização incremental: versão global da última escrita (ver database.proxima_versao)
+    versao = Column(Integer, nullable=False, default=0, index=True)
+    atualizado_em = Column(DateTime, nullable=True)
     
     # Removemos senha e função para simplificar
-    tarefas = relationship("Tarefa", back_populates="empregado", cascade="all, delete-orphan")
+    # Sem cascade de remoção: apagar o empregado NÃO apaga as tarefas. O banco as deixa sem
+    # responsável (ON DELETE SET NULL em tarefas.empregado_id) e passive_deletes impede o ORM
+    # de carregar todas elas só para fazer o mesmo. O desligamento com transferência das
+    # tarefas é database.desligar_empregado.
+    tarefas = relationship("Tarefa", back_populates="empregado", passive_deletes=True)
 
 class Tarefa(Base):
     __tablename__ = "tarefas"
@@ -20,8 +34,84 @@ class Tarefa(Base):
     id = Column(Integer, primary_key=True, index=True)
     titulo = Column(String, index=True)
     descricao = Column(String, nullable=True)
-    prazo = Column(String)
+    prazo = Column(Date)
     concluida = Column(Boolean, default=False)
+    # Estimativa de esforço em horas, usada pelo planejador (planejador.py). NULL = sem estimativa
+    esforco_horas = Column(Float, nullable=True)
+
+    # Sincronização incremental: versão global da última escrita (ver database.proxima_versao)
+    versao = Column(Integer, nullable=False, default=0, index=True)
+    atualizado_em = Column(DateTime, nullable=True)
     
-    empregado_id = Column(Integer, ForeignKey("empregados.id"), nullable=True)
+    empregado_id = Column(Integer, ForeignKey("empregados.id", ondelete="SET NULL"), nullable=True)
     empregado = relationship("Empregado", back_populates="tarefas")
+
+    # Índice para a paginação por cursor (keyset) ordenada por prazo: o par (prazo, id)
+    # permite continuar a leitura exatamente de onde a página anterior parou.
+    # O índice (concluida, prazo, id) atende "pendentes por ordem de prazo" (Dashboard) como
+    # uma leitura de intervalo do índice, sem varrer as tarefas concluídas e sem ordenar.
+    # O índice (empregado_id, concluida, prazo) cobre as estatísticas por empregado (GROUP BY
+    # sem ler a tabela) e também serve às buscas pela FK empregado_id.
+    __table_args__ = (
+        Index("ix_tarefas_prazo_id", "prazo", "id"),
+        Index("ix_tarefas_concluida_prazo", "concluida", "prazo", "id"),
+        Index("ix_tarefas_empregado_concluida_prazo", "empregado_id", "concluida", "prazo"),
+        # Seleção das concluídas antigas para o arquivo (arquivo.py) sem varrer as pendentes
+        Index("ix_tarefas_concluida_atualizado", "concluida", "atualizado_em"),
+    )
+
+# Prazo usado na paginação por prazo (database.consulta_tarefas_keyset): tarefas sem prazo
+# (a migração 1 anula prazos inválidos) vão para o fim, e a comparação de tupla do cursor
+# continua valendo para elas (com NULL ela não seria verdadeira nem falsa).
+# A data fica como literal, não como parâmetro: só assim o SQLite reconhece a expressão dos índices.
+PRAZO_ORDENACAO = func.coalesce(Tarefa.prazo, literal_column("'9999-12-31'"))
+Index("ix_tarefas_prazo_ordem_id", PRAZO_ORDENACAO, Tarefa.id)
+Index("ix_tarefas_concluida_prazo_ordem_id", Tarefa.concluida, PRAZO_ORDENACAO, Tarefa.id)
+
+class TarefaArquivada(Base):
+    """Tarefa concluída retirada de 'tarefas' pelo arquivamento (arquivo.py). Só leitura pela API."""
+    __tablename__ = "tarefas_arquivo"
+
+    # Chave própria: no SQLite o id de uma tarefa apagada pode ser reaproveitado por uma nova,
+    # que um dia também pode ser arquivada
+    id = Column(Integer, primary_key=True)
+    tarefa_id = Column(Integer, nullable=False, index=True)  # id que a tarefa tinha em 'tarefas'
+    titulo = Column(String)
+    descricao = Column(String, nullable=True)
+    prazo = Column(Date)
+    esforco_horas = Column(Float, nullable=True)
+    # Sem chave estrangeira: o empregado pode ser removido depois, o histórico continua
+    empregado_id = Column(Integer, nullable=True, index=True)
+    concluida_em = Column(DateTime, nullable=True)  # Última escrita na tarefa antes de arquivar
+    arquivada_em = Column(DateTime, nullable=False)
+
+class ContadorVersao(Base):
+    """Linha única com a última versão entregue. O UPDATE dela trava a linha até o commit,
+    então as versões ficam visíveis na mesma ordem em que são numeradas."""
+    __tablename__ = "contador_versao"
+
+    id = Column(Integer, primary_key=True)
+    valor = Column(Integer, nullable=False, default=0)
+    # Lápides com versão até esta já foram descartadas (database.descartar_remocoes_antigas):
+    # um GET /changes com token menor precisa refazer a carga completa
+    remocoes_ate = Column(Integer, nullable=False, default=0)
+
+class VersaoSchema(Base):
+    """Uma linha por migração aplicada (migracoes.MIGRACOES). A maior é a versão do schema:
+    na partida basta um SELECT para saber se o banco já está pronto."""
+    __tablename__ = "versao_schema"
+
+    versao = Column(Integer, primary_key=True, autoincrement=False)
+    descricao = Column(String, nullable=False)
+    aplicada_em = Column(DateTime, nullable=False)
+
+class Remocao(Base):
+    """Registro ("lápide") de cada linha apagada, para o cliente remover da sua cópia local."""
+    __tablename__ = "remocoes"
+
+    id = Column(Integer, primary_key=True)
+    tabela = Column(String, nullable=False)
+    registro_id = Column(Integer, nullable=False)
+    versao = Column(Integer, nullable=False, index=True)
+    # Quando foi apagada (UTC, sem fuso): as lápides só são guardadas por REMOCOES_DIAS dias
+    removida_em = Column(DateTime, nullable=True, default=lambda: datetime.now(timezone.utc).replace(tzinfo=None))
@@ -0,0 +1,177 @@
+# planejador.py
+# Linha do tempo de cada empregado: as tarefas abertas dele em ordem de execução,
+# pela regra EDF (earliest deadline first = prazo mais próximo primeiro), com a data
+# prevista de início/término de cada uma e o aviso das que vão estourar o prazo.
+#
+# Recalcular a empresa inteira a cada consulta seria refazer milhares de linhas do tempo
+# por causa de uma única tarefa. Por isso as linhas do tempo ficam em memória (por worker)
+# junto com o token de versão do banco em que foram montadas; na consulta seguinte só as
+# tarefas com versão maior que esse token (e as lápides de remoção) são lidas, e apenas
+# os empregados afetados por elas têm a linha do tempo refeita.
+import threading
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from database import versao_atual
+from models import Empregado, Remocao, Tarefa
+
+# Horas de trabalho por dia útil (segunda a sexta) de cada empregado
+HORAS_POR_DIA = 8.0
+# Esforço assumido para tarefas sem estimativa (esforco_horas NULL)
+ESFORCO_PADRAO_HORAS = HORAS_POR_DIA
+
+
+def _primeiro_dia_util(dia: date) -> date:
+    while dia.weekday() >= 5:
+        dia += timedelta(days=1)
+    return dia
+
+
+def _dia_util(inicio: date, indice: int) -> date:
+    """O 'indice'-ésimo dia útil a partir de 'inicio' (que já é dia útil; índice 0 = ele mesmo)."""
+    semanas, resto = divmod(indice, 5)
+    dia = inicio + timedelta(weeks=semanas)
+    for _ in range(resto):
+        dia = _primeiro_dia_util(dia + timedelta(days=1))
+    return dia
+
+
+def _chave_edf(tarefa: Tuple) -> Tuple:
+    # Sem prazo vai para o fim; empate pelo id para a ordem ser estável
+    tarefa_id, _, prazo, _ = tarefa
+    return (prazo is None, prazo or date.max, tarefa_id)
+
+
+def montar_linha_do_tempo(tarefas: Iterable[Tuple[int, str, Optional[date], Optional[float]]], hoje: date) -> List[dict]:
+    """
+    Recebe (id, titulo, prazo, esforco_horas) das tarefas abertas de UM empregado e devolve
+    a sequência EDF com início/término previstos. Não acessa o banco.
+    """
+    primeiro_dia = _primeiro_dia_util(hoje)
+    linha = []
+    horas = 0.0
+    for tarefa_id, titulo, prazo, esforco in sorted(tarefas, key=_chave_edf):
+        esforco = ESFORCO_PADRAO_HORAS if esforco is None else max(float(esforco), 0.0)
+        inicio = _dia_util(primeiro_dia, int(horas // HORAS_POR_DIA))
+        horas += esforco
+        # Termina no dia em que a última hora é trabalhada (esforço zero termina no dia do início)
+        termino = _dia_util(primeiro_dia, max(int(-(-horas // HORAS_POR_DIA)) - 1, 0)) if esforco else inicio
+        linha.append({
+            "tarefa_id": tarefa_id,
+            "titulo": titulo,
+            "prazo": prazo,
+            "esforco_horas": esforco,
+            "inicio_previsto": inicio,
+            "termino_previsto": termino,
+            "atrasara": prazo is not None and termino > prazo,
+        })
+    return linha
+
+
+def resumir(empregado_id: int, linha: List[dict]) -> dict:
+    """Formato da API: a linha do tempo mais os totais do empregado."""
+    return {
+        "empregado_id": empregado_id,
+        "tarefas": linha,
+        "horas_totais": sum(item["esforco_horas"] for item in linha),
+        "atrasadas_previstas": sum(1 for item in linha if item["atrasara"]),
+    }
+
+
+class PlanejadorIncremental:
+    """Cache das linhas do tempo de um processo, atualizado só onde o banco mudou."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._token: Optional[int] = None
+        self._hoje: Optional[date] = None
+        self._linhas: Dict[int, List[dict]] = {}
+        self._dono: Dict[int, int] = {}  # tarefa_id -> empregado_id na última montagem
+
+    def _recalcular(self, db_session: Session, empregados: Optional[Set[int]], hoje: date):
+        """Remonta as linhas do tempo dos empregados indicados (None = todos)."""
+        stmt = select(Empregado.id)
+        if empregados is not None:
+            stmt = stmt.where(Empregado.id.in_(empregados))
+        existentes = set(db_session.scalars(stmt))
+
+        stmt = select(Tarefa.id, Tarefa.titulo, Tarefa.prazo, Tarefa.esforco_horas, Tarefa.empregado_id).where(
+            Tarefa.empregado_id.isnot(None), Tarefa.concluida == False
+        )
+        if empregados is not None:
+            stmt = stmt.where(Tarefa.empregado_id.in_(empregados))
+        abertas = defaultdict(list)
+        for tarefa_id, titulo, prazo, esforco, empregado_id in db_session.execute(stmt):
+            abertas[empregado_id].append((tarefa_id, titulo, prazo, esforco))
+
+        alvo = set(self._linhas) if empregados is None else empregados
+        for empregado_id in alvo | existentes:
+            for item in self._linhas.pop(empregado_id, []):
+                self._dono.pop(item["tarefa_id"], None)
+        for empregado_id in existentes:
+            self._linhas[empregado_id] = montar_linha_do_tempo(abertas[empregado_id], hoje)
+            for item in self._linhas[empregado_id]:
+                self._dono[item["tarefa_id"]] = empregado_id
+
+    def _afetados(self, db_session: Session, desde: int) -> Set[int]:
+        """Empregados cuja linha do tempo pode ter mudado depois da versão 'desde'."""
+        afetados = set()
+        for tarefa_id, empregado_id in db_session.execute(
+            select(Tarefa.id, Tarefa.empregado_id).where(Tarefa.versao > desde)
+        ):
+            # Reatribuída: muda a linha do novo dono e a do antigo
+            if empregado_id is not None:
+                afetados.add(empregado_id)
+            if tarefa_id in self._dono:
+                afetados.add(self._dono[tarefa_id])
+        afetados.update(db_session.scalars(select(Empregado.id).where(Empregado.versao > desde)))
+
+        for tabela, registro_id in db_session.execute(
+            select(Remocao.tabela, Remocao.registro_id).where(Remocao.versao > desde)
+        ):
+            if tabela == "tarefas" and registro_id in self._dono:
+                afetados.add(self._dono[registro_id])
+            elif tabela == "empregados":
+                afetados.add(registro_id)
+        return afetados
+
+    def atualizar(self, db_session: Session, hoje: Optional[date] = None) -> int:
+        """Deixa o cache igual ao banco. Retorna quantos empregados foram recalculados."""
+        hoje = hoje or date.today()
+        # Token lido ANTES das linhas (mesma regra do GET /changes): uma escrita no meio
+        # pode ser reprocessada na próxima consulta, mas nunca fica de fora.
+        token = versao_atual(db_session.connection())
+        if self._token is None or self._hoje != hoje:
+            # Primeira consulta ou virada do dia (as datas previstas andam): monta tudo
+            self._linhas, self._dono = {}, {}
+            self._recalcular(db_session, None, hoje)
+            recalculados = len(self._linhas)
+        elif token != self._token:
+            afetados = self._afetados(db_session, self._token)
+            if afetados:
+                self._recalcular(db_session, afetados, hoje)
+            recalculados = len(afetados)
+        else:
+            recalculados = 0
+        self._token, self._hoje = token, hoje
+        return recalculados
+
+    def linha_do_tempo(self, db_session: Session, empregado_id: int, hoje: Optional[date] = None) -> Optional[List[dict]]:
+        """Linha do tempo de um empregado (None se ele não existe)."""
+        with self._trava:
+            self.atualizar(db_session, hoje)
+            return self._linhas.get(empregado_id)
+
+    def todas(self, db_session: Session, hoje: Optional[date] = None) -> Dict[int, List[dict]]:
+        """Linhas do tempo de todos os empregados."""
+        with self._trava:
+            self.atualizar(db_session, hoje)
+            return dict(self._linhas)
+
+
+# Instância do processo (cada worker do uvicorn tem a sua; o token do banco as mantém corretas)
+planejador = PlanejadorIncremental()
@@ -0,0 +1,28 @@
+# reconciliar_carga.py
+# Confere o contador Empregado.tarefas_abertas contra a contagem real em 'tarefas' e corrige
+# as divergências. Uso:
+#   python reconciliar_carga.py                  -> corrige e lista o que estava errado
+#   python reconciliar_carga.py --somente-verificar  -> só lista (sai com código 1 se houver divergência)
+from database import SessionLocal, reconciliar_carga_trabalho
+import sys
+
+corrigir = "--somente-verificar" not in sys.argv[1:]
+
+db = SessionLocal()
+try:
+    divergencias = reconciliar_carga_trabalho(db, corrigir=corrigir)
+finally:
+    db.close()
+
+if not divergencias:
+    print("✅ Carga de trabalho consistente: nenhum contador divergente.")
+    sys.exit(0)
+
+for d in divergencias:
+    print(f"Empregado {d['empregado_id']} ({d['nome']}): registrado={d['registrado']} real={d['real']}")
+
+if corrigir:
+    print(f"🔧 {len(divergencias)} contador(es) corrigido(s).")
+else:
+    print(f"❌ {len(divergencias)} contador(es) divergente(s).")
+    sys.exit(1)
@@ -0,0 +1,159 @@
+# rotas_async.py
+# Versões assíncronas das rotas de CRUD, usadas quando DB_ASYNC=1 (ver o fim de main.py).
+# Cada requisição espera o banco com "await" em vez de ocupar uma thread do threadpool,
+# então o número de requisições simultâneas por worker não fica limitado pelo pool de threads.
+from datetime import date
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import (
+    get_async_db, consulta_empregados_keyset, consulta_tarefas_keyset, fechar_pagina,
+    LIMITE_PADRAO, LIMITE_MAXIMO,
+    create_empregado, create_tarefa, update_empregado, update_tarefa, delete_empregado, delete_tarefa,
+    desligar_empregado,
+)
+from schemas import (
+    EmpregadoSchema, EmpregadoCreate, EmpregadoUpdate, TarefaSchema, TarefaCreate, TarefaUpdate,
+    DesligamentoSchema, ResultadoDesligamentoSchema,
+)
+from cache_http import ConsultaCondicional
+from cache_nomes import cache_nomes, linhas_com_nomes
+import versoes
+
+router = APIRouter()
+
+# --- ROTAS DE EMPREGADOS ---
+
+@router.get("/empregados/", response_model=List[EmpregadoSchema])
+async def listar_empregados_async(
+    request: Request,
+    limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    cond = ConsultaCondicional(request, ("empregados",))
+    pronta = cond.resposta_pronta()
+    if pronta is not None:
+        return pronta
+
+    try:
+        stmt = consulta_empregados_keyset(limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    empregados, proximo = fechar_pagina((await db.execute(stmt)).all(), limit)
+    return cond.responder(
+        [e._asdict() for e in empregados],
+        {"X-Next-Cursor": proximo} if proximo else None,
+    )
+
+# As escritas usam as mesmas funções do database.py (um comando com RETURNING por escrita),
+# rodando com a sessão síncrona por baixo da AsyncSession (run_sync), sem bloquear o loop.
+
+@router.post("/empregados/", response_model=EmpregadoSchema)
+async def criar_empregado_async(empregado: EmpregadoCreate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        db_emp = await db.run_sync(create_empregado, empregado)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Já existe um empregado com este email.")
+    await run_in_threadpool(versoes.incrementar, "empregados")
+    return EmpregadoSchema.model_validate(db_emp)
+
+@router.patch("/empregados/{empregado_id}", response_model=EmpregadoSchema)
+async def editar_empregado_async(empregado_id: int, dados: EmpregadoUpdate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        db_emp, alterado = await db.run_sync(update_empregado, empregado_id, dados)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Já existe um empregado com este email.")
+    if db_emp is None:
+        raise HTTPException(status_code=404, detail="Empregado não encontrado")
+    if alterado:  # PATCH vazio ou sem diferença não invalida ETags nem gera evento
+        await run_in_threadpool(versoes.incrementar, "empregados")
+    return EmpregadoSchema.model_validate(db_emp)
+
+@router.delete("/empregados/{empregado_id}")
+async def deletar_empregado_async(empregado_id: int, db: AsyncSession = Depends(get_async_db)):
+    if not await db.run_sync(delete_empregado, empregado_id):
+        raise HTTPException(status_code=404, detail="Empregado não encontrado")
+    await run_in_threadpool(versoes.incrementar, "empregados", "tarefas")
+    return {"message": "Deletado"}
+
+@router.post("/empregados/{empregado_id}/desligamento", response_model=ResultadoDesligamentoSchema)
+async def desligar_empregado_async(empregado_id: int, pedido: DesligamentoSchema, db: AsyncSession = Depends(get_async_db)):
+    try:
+        resultado = await db.run_sync(desligar_empregado, empregado_id, pedido.transferir_para)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if resultado is None:
+        raise HTTPException(status_code=404, detail="Empregado não encontrado")
+    await run_in_threadpool(versoes.incrementar, "empregados", "tarefas")
+    return resultado
+
+# --- ROTAS DE TAREFAS ---
+
+@router.get("/tarefas/", response_model=List[TarefaSchema])
+async def listar_tarefas_async(
+    request: Request,
+    limit: int = Query(LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    cursor: Optional[str] = None,
+    ordenar: Literal["id", "prazo"] = "id",
+    concluida: Optional[bool] = None,
+    empregado_id: Optional[int] = None,
+    prazo_de: Optional[date] = None,
+    prazo_ate: Optional[date] = None,
+    expand: Optional[Literal["empregado"]] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    cond = ConsultaCondicional(request, ("tarefas", "empregados") if expand else ("tarefas",))
+    pronta = cond.resposta_pronta()
+    if pronta is not None:
+        return pronta
+
+    try:
+        stmt = consulta_tarefas_keyset(
+            limit, cursor, ordenar, concluida=concluida,
+            empregado_id=empregado_id, prazo_de=prazo_de, prazo_ate=prazo_ate,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    tarefas, proximo = fechar_pagina((await db.execute(stmt)).all(), limit, ordenar)
+    nomes = await cache_nomes.nomes_async(db, [t.empregado_id for t in tarefas]) if expand else {}
+    return cond.responder(
+        linhas_com_nomes(tarefas, nomes),
+        {"X-Next-Cursor": proximo} if proximo else None,
+    )
+
+@router.post("/tarefas/", response_model=TarefaSchema)
+async def criar_tarefa_async(tarefa: TarefaCreate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        nova_tarefa = await db.run_sync(create_tarefa, tarefa)
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail="Empregado responsável não encontrado.")
+    await run_in_threadpool(versoes.incrementar, "tarefas")
+    return TarefaSchema.model_validate(nova_tarefa)
+
+@router.patch("/tarefas/{tarefa_id}", response_model=TarefaSchema)
+async def editar_tarefa_async(tarefa_id: int, dados: TarefaUpdate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        tarefa, alterada = await db.run_sync(update_tarefa, tarefa_id, dados)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IntegrityError:
+        raise HTTPException(status_code=400, detail="Empregado responsável não encontrado.")
+    if tarefa is None:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+    if alterada:
+        await run_in_threadpool(versoes.incrementar, "empregados", "tarefas")
+    return TarefaSchema.model_validate(tarefa)
+
+@router.delete("/tarefas/{tarefa_id}")
+async def deletar_tarefa_async(tarefa_id: int, db: AsyncSession = Depends(get_async_db)):
+    if not await db.run_sync(delete_tarefa, tarefa_id):
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+    await run_in_threadpool(versoes.incrementar, "tarefas")
+    return {"message": "Deletada"}
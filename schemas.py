@@ -0,0 +1,155 @@
+# schemas.py
+# Schemas Pydantic compartilhados pelas rotas da API e pela importação em massa.
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import date, datetime
+
+# --- SCHEMAS DE DADOS ---
+
+class EmpregadoSchema(BaseModel):
+    id: int
+    nome: str
+    cargo: str
+    email: str
+    class Config:
+        from_attributes = True
+
+class EmpregadoCreate(BaseModel):
+    nome: str
+    cargo: str
+    email: str
+
+class EmpregadoUpdate(BaseModel):
+    # PATCH: só os campos enviados são gravados
+    nome: Optional[str] = None
+    cargo: Optional[str] = None
+    email: Optional[str] = None
+
+class DesligamentoSchema(BaseModel):
+    transferir_para: Optional[int] = None # Quem recebe as tarefas (None = ficam sem responsável)
+
+class ResultadoDesligamentoSchema(BaseModel):
+    empregado_id: int
+    transferir_para: Optional[int] = None
+    tarefas_transferidas: int
+    tarefas_abertas: int # Pendentes entre as transferidas (entram na carga de quem recebe)
+    versao: int # Versão da gravação (token do GET /changes)
+
+class TarefaSchema(BaseModel):
+    id: int
+    titulo: str
+    descricao: Optional[str] = None
+    prazo: Optional[date] = None # Pode ser NULL em tarefas antigas com prazo inválido
+    empregado_id: Optional[int] = None
+    concluida: bool = False
+    esforco_horas: Optional[float] = None
+    empregado_nome: Optional[str] = None # Só vem preenchido com ?expand=empregado
+    class Config:
+        from_attributes = True
+
+class TarefaBuscaSchema(TarefaSchema):
+    relevancia: float # Maior = mais relevante (bm25 no SQLite, ts_rank_cd no PostgreSQL)
+
+class TarefaArquivadaSchema(BaseModel):
+    id: int # id que a tarefa tinha antes de ser arquivada
+    titulo: str
+    descricao: Optional[str] = None
+    prazo: Optional[date] = None
+    empregado_id: Optional[int] = None
+    esforco_horas: Optional[float] = None
+    concluida_em: Optional[datetime] = None
+    arquivada_em: datetime
+    arquivo_id: int # Posição no arquivo (base do cursor)
+    class Config:
+        from_attributes = True
+
+class TarefaCreate(BaseModel):
+    titulo: str
+    descricao: Optional[str] = None
+    prazo: date
+    empregado_id: Optional[int] = None
+    concluida: bool = False
+    esforco_horas: Optional[float] = Field(None, ge=0) # Horas estimadas (planejador)
+
+class TarefaUpdate(BaseModel):
+    # PATCH: só os campos enviados são gravados (empregado_id: null tira o responsável)
+    titulo: Optional[str] = None
+    descricao: Optional[str] = None
+    prazo: Optional[date] = None
+    empregado_id: Optional[int] = None
+    concluida: Optional[bool] = None
+    esforco_horas: Optional[float] = Field(None, ge=0)
+
+# --- OPERAÇÕES EM LOTE (POST /tarefas/lote) ---
+
+class OperacaoLoteSchema(BaseModel):
+    operacao: Literal["concluir", "reabrir", "atribuir", "deletar"]
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+    empregado_id: Optional[int] = None # Só para 'atribuir' (None = deixar sem responsável)
+
+class ResultadoItemLoteSchema(BaseModel):
+    id: int
+    status: Literal["alterada", "removida", "inalterada", "nao_encontrada"]
+
+class ResultadoLoteSchema(BaseModel):
+    operacao: str
+    alteradas: int
+    versao: int # Versão da gravação (token do GET /changes)
+    resultados: List[ResultadoItemLoteSchema]
+
+# --- SINCRONIZAÇÃO INCREMENTAL (GET /changes) ---
+
+class AlteradosSchema(BaseModel):
+    empregados: List[EmpregadoSchema] = []
+    tarefas: List[TarefaSchema] = []
+
+class RemovidosSchema(BaseModel):
+    empregados: List[int] = []
+    tarefas: List[int] = []
+
+class AlteracoesSchema(BaseModel):
+    token: int
+    alterados: AlteradosSchema
+    removidos: RemovidosSchema
+
+# --- ESTATÍSTICAS ---
+
+class EstatisticaEmpregadoSchema(BaseModel):
+    empregado_id: int
+    nome: Optional[str] = None
+    pendentes: int
+    atrasadas: int
+    concluidas: int
+
+class CargaEmpregadoSchema(BaseModel):
+    id: int
+    nome: str
+    cargo: str
+    tarefas_abertas: int
+    class Config:
+        from_attributes = True
+
+class DashboardSchema(BaseModel):
+    total: int
+    pendentes: int
+    atrasadas: int
+    concluidas: int
+    vencem_esta_semana: int
+    sem_responsavel: int
+
+# --- PLANEJAMENTO (LINHA DO TEMPO POR EMPREGADO) ---
+
+class ItemPlanejamentoSchema(BaseModel):
+    tarefa_id: int
+    titulo: str
+    prazo: Optional[date] = None
+    esforco_horas: float
+    inicio_previsto: date
+    termino_previsto: date
+    atrasara: bool
+
+class PlanejamentoEmpregadoSchema(BaseModel):
+    empregado_id: int
+    tarefas: List[ItemPlanejamentoSchema]
+    horas_totais: float
+    atrasadas_previstas: int
@@ -3,8 +3,7 @@ const API_BASE_URL = 'https://flowscheduler-app-1.onrender.com';
 
 document.addEventListener('DOMContentLoaded', () => {
     setupTabs();
-    loadEmpregados();
-    loadTarefas();
+    syncChanges();
 
     document.getElementById('empregado-form').addEventListener('submit', handleCreateEmpregado);
     document.getElementById('tarefa-form').addEventListener('submit', handleCreateTarefa);
@@ -13,11 +12,95 @@ document.addEventListener('DOMContentLoaded', () => {
     setupAlertSystem();
 });
 
+// --- PAGINAÇÃO ---
+// As listagens da API são paginadas por cursor: o token da próxima página vem no cabeçalho X-Next-Cursor.
+async function fetchAllPages(path) {
+    const items = [];
+    let cursor = null;
+    do {
+        const sep = path.includes('?') ? '&' : '?';
+        const url = `${API_BASE_URL}${path}${cursor ? `${sep}cursor=${encodeURIComponent(cursor)}` : ''}`;
+        const res = await fetch(url);
+        items.push(...await res.json());
+        cursor = res.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return items;
+}
+
+// --- SINCRONIZAÇÃO ---
+// Cópia local das tabelas (id -> registro). Depois da carga inicial, só o que mudou
+// desde o último token é pedido ao servidor (GET /changes?since=token).
+const state = { token: null, empregados: new Map(), tarefas: new Map() };
+
+async function fullLoad() {
+    // O token é obtido ANTES da carga: o que mudar durante a paginação volta no próximo sync
+    const res = await fetch(`${API_BASE_URL}/changes`);
+    const token = (await res.json()).token;
+    const [empregados, tarefas] = await Promise.all([
+        fetchAllPages('/empregados/?limit=500'),
+        fetchAllPages('/tarefas/?limit=500')
+    ]);
+    state.empregados = new Map(empregados.map(e => [e.id, e]));
+    state.tarefas = new Map(tarefas.map(t => [t.id, t]));
+    state.token = token;
+    loadEmpregados();
+    loadTarefas();
+}
+
+// Aplica um lote de alterações (mesmo formato do GET /changes e do evento 'alteracoes')
+function applyDelta(delta) {
+    const changed = {};
+    for (const table of ['empregados', 'tarefas']) {
+        // Remoções primeiro: um ID removido pode ter sido reaproveitado por uma linha nova
+        delta.removidos[table].forEach(id => state[table].delete(id));
+        delta.alterados[table].forEach(row => state[table].set(row.id, row));
+        changed[table] = delta.removidos[table].length + delta.alterados[table].length > 0;
+    }
+    state.token = Math.max(state.token ?? 0, delta.token);
+    if (changed.empregados) loadEmpregados();
+    // A coluna "responsável" mostra o nome do empregado: muda também quando ele muda
+    if (changed.tarefas || changed.empregados) loadTarefas();
+}
+
+async function syncChanges() {
+    try {
+        if (state.token === null) {
+            await fullLoad();
+            connectEvents();
+            return;
+        }
+        const res = await fetch(`${API_BASE_URL}/changes?since=${state.token}`);
+        if (res.status === 410) {
+            // Ficamos tempo demais sem sincronizar e as remoções já foram descartadas:
+            // a cópia local pode ter linhas apagadas, então é refeita do zero
+            await fullLoad();
+            return;
+        }
+        applyDelta(await res.json());
+    } catch (e) { console.error(e); }
+}
+
+// --- PUSH DO SERVIDOR (Server-Sent Events) ---
+// Alterações feitas por qualquer usuário chegam sozinhas; não é preciso recarregar as listas.
+let eventSource = null;
+
+function connectEvents() {
+    if (!window.EventSource || eventSource) return;
+    eventSource = new EventSource(`${API_BASE_URL}/eventos?since=${state.token}`);
+    eventSource.addEventListener('alteracoes', ev => applyDelta(JSON.parse(ev.data)));
+    // O servidor descartou eventos porque ficamos para trás: busca a diferença completa
+    eventSource.addEventListener('resync', () => syncChanges());
+}
+
+// Depois de uma escrita própria: com o stream aberto, o evento traz a mudança sozinho
+function refreshAfterWrite() {
+    if (!eventSource || eventSource.readyState !== EventSource.OPEN) syncChanges();
+}
+
 // --- EMPREGADOS ---
-async function loadEmpregados() {
+function loadEmpregados() {
     try {
-        const res = await fetch(`${API_BASE_URL}/empregados/`);
-        const data = await res.json();
+        const data = [...state.empregados.values()].sort((a, b) => a.id - b.id);
         
         const tbody = document.querySelector('#empregados-table tbody');
         const select = document.getElementById('empregado-select');
@@ -54,30 +137,31 @@ async function handleCreateEmpregado(e) {
     });
     alert("Salvo!");
     document.getElementById('empregado-form').reset();
-    loadEmpregados();
+    refreshAfterWrite();
 }
 
 async function deleteEmpregado(id) {
     if(!confirm("Excluir?")) return;
     await fetch(`${API_BASE_URL}/empregados/${id}`, { method: 'DELETE' });
-    loadEmpregados(); loadTarefas();
+    refreshAfterWrite();
 }
 
 // --- TAREFAS ---
-async function loadTarefas() {
+function loadTarefas() {
     try {
-        const res = await fetch(`${API_BASE_URL}/tarefas/`);
-        const data = await res.json();
+        const data = [...state.tarefas.values()].sort((a, b) => a.id - b.id);
         const tbody = document.querySelector('#tarefas-table tbody');
         tbody.innerHTML = '';
         
         data.forEach(t => {
             const row = tbody.insertRow();
             const status = t.concluida ? "✅" : "🕒";
-            row.innerHTML = `<td>${t.titulo}</td><td>${t.prazo}</td><td style="text-align:center">${t.empregado_id || '-'}</td><td>${status}</td>
+            // Nome pela cópia local dos empregados (sem uma requisição por tarefa)
+            const responsavel = state.empregados.get(t.empregado_id)?.nome ?? t.empregado_nome ?? t.empregado_id ?? '-';
+            row.innerHTML = `<td>${t.titulo}</td><td>${t.prazo ?? '-'}</td><td style="text-align:center">${responsavel}</td><td>${status}</td>
                 <td><button onclick="deleteTarefa(${t.id})" style="background:#f44336; color:white; border:none; padding:5px;">X</button></td>`;
         });
-        checkUrgentTasks(data);
+        checkUrgentTasks();
     } catch (e) { console.error(e); }
 }
 
@@ -97,13 +181,13 @@ async function handleCreateTarefa(e) {
     });
     alert("Tarefa Criada!");
     document.getElementById('tarefa-form').reset();
-    loadTarefas();
+    refreshAfterWrite();
 }
 
 async function deleteTarefa(id) {
     if(!confirm("Excluir?")) return;
     await fetch(`${API_BASE_URL}/tarefas/${id}`, { method: 'DELETE' });
-    loadTarefas();
+    refreshAfterWrite();
 }
 
 // --- UTIL ---
@@ -125,10 +209,15 @@ function setupAlertSystem() {
     const main = document.querySelector('main');
     main.insertBefore(alertContainer, main.firstChild);
 }
-function checkUrgentTasks(tarefas) {
-    const pending = tarefas.filter(t => !t.concluida);
-    alertContainer.innerHTML = '';
-    if (pending.length > 0) {
-        alertContainer.innerHTML = `<div style="background:#ff9800; color:white; padding:10px; margin-bottom:20px; text-align:center; border-radius:5px;">🚨 ${pending.length} tarefas pendentes.</div>`;
-    }
+// Os totais vêm prontos do servidor (GROUP BY no banco), sem baixar a lista de tarefas
+async function checkUrgentTasks() {
+    try {
+        const res = await fetch(`${API_BASE_URL}/estatisticas/dashboard`);
+        const stats = await res.json();
+        alertContainer.innerHTML = '';
+        if (stats.pendentes > 0) {
+            const atrasadas = stats.atrasadas > 0 ? ` (${stats.atrasadas} atrasadas)` : '';
+            alertContainer.innerHTML = `<div style="background:#ff9800; color:white; padding:10px; margin-bottom:20px; text-align:center; border-radius:5px;">🚨 ${stats.pendentes} tarefas pendentes${atrasadas}.</div>`;
+        }
+    } catch (e) { console.error(e); }
 }
@@ -0,0 +1,44 @@
+# serializacao.py
+# JSON das respostas grandes (listagens) sem passar pelo jsonable_encoder.
+#
+# O jsonable_encoder percorre cada valor de cada linha em Python antes do json.dumps: numa
+# página de 10 mil tarefas ele custa mais que a própria consulta. Com o orjson (opcional,
+# em C) dicts, listas, datas e números vão direto para bytes; o resto (schemas Pydantic,
+# Decimal do PostgreSQL...) passa pelo jsonable_encoder só naquele valor.
+# Sem o orjson instalado, cai no json da biblioteca padrão (mesmo resultado, mais lento).
+import json
+from typing import Any
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Dependência opcional
+    orjson = None
+
+# Chaves não-texto (ex.: ids inteiros) viram texto, como no json.dumps
+_OPCOES_ORJSON = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def _converter(valor: Any) -> Any:
+    """Chamado pelo orjson só para os tipos que ele não conhece."""
+    if isinstance(valor, BaseModel):
+        return valor.model_dump(mode="json")
+    return jsonable_encoder(valor)
+
+
+def serializar(conteudo: Any) -> bytes:
+    """Conteúdo da resposta -> JSON compacto em bytes."""
+    if orjson is not None:
+        return orjson.dumps(conteudo, default=_converter, option=_OPCOES_ORJSON)
+    return json.dumps(jsonable_encoder(conteudo), separators=(",", ":")).encode()
+
+
+class RespostaJSON(Response):
+    """JSONResponse que serializa com serializar() (orjson quando disponível)."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return serializar(content)
@@ -0,0 +1,83 @@
+# tests/conftest.py
+# Os testes rodam contra um banco SQLite temporário, criado e migrado uma vez por execução
+# (preparar_banco). As variáveis de ambiente são definidas aqui, ANTES do import de
+# database.py/main.py: o engine, os contadores de versoes.py e as métricas leem o ambiente no import.
+#   python -m pytest -q
+import os
+import sys
+import tempfile
+
+DIRETORIO_TESTES = tempfile.mkdtemp(prefix="flowscheduler-testes-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(DIRETORIO_TESTES, 'testes.db')}"
+os.environ["VERSOES_ARQUIVO"] = os.path.join(DIRETORIO_TESTES, "versoes")
+os.environ["METRICAS_DIR"] = os.path.join(DIRETORIO_TESTES, "metricas")
+os.environ["ARQUIVO_INTERVALO_MIN"] = "0"  # Sem arquivamento em segundo plano durante os testes
+os.environ["DB_ASYNC"] = "0"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import delete, update
+
+
+@pytest.fixture(scope="session")
+def app():
+    from database import engine
+    from migracoes import preparar_banco
+    preparar_banco(engine)
+    import main
+    return main.app
+
+
+@pytest.fixture(autouse=True)
+def banco_limpo(app):
+    """Cada teste começa com as tabelas vazias (o contador de versões continua subindo)."""
+    import versoes
+    from cache_nomes import cache_nomes
+    from database import SessionLocal
+    from models import ContadorVersao, Empregado, Remocao, Tarefa, TarefaArquivada
+
+    with SessionLocal() as sessao:
+        for modelo in (TarefaArquivada, Tarefa, Remocao, Empregado):
+            sessao.execute(delete(modelo))
+        sessao.execute(update(ContadorVersao).values(remocoes_ate=0))
+        sessao.commit()
+    cache_nomes.limpar()
+    versoes.incrementar(*versoes.TABELAS)
+    yield
+
+
+@pytest.fixture
+def cliente(app):
+    from fastapi.testclient import TestClient
+    with TestClient(app) as cliente:
+        yield cliente
+
+
+@pytest.fixture
+def db(app):
+    from database import SessionLocal
+    with SessionLocal() as sessao:
+        yield sessao
+
+
+@pytest.fixture
+def novo_empregado(cliente):
+    """Cria um empregado pela API e devolve o id."""
+    contador = iter(range(1, 1_000_000))
+
+    def criar(nome: str = "Empregado", cargo: str = "Desenvolvedor") -> int:
+        n = next(contador)
+        resposta = cliente.post("/empregados/", json={"nome": f"{nome} {n}", "cargo": cargo, "email": f"empregado{n}@teste.com"})
+        assert resposta.status_code == 200, resposta.text
+        return resposta.json()["id"]
+    return criar
+
+
+@pytest.fixture
+def nova_tarefa(cliente):
+    """Cria uma tarefa pela API e devolve o id."""
+    def criar(titulo: str = "Tarefa", prazo: str = "2030-01-10", empregado_id=None, concluida: bool = False) -> int:
+        resposta = cliente.post("/tarefas/", json={"titulo": titulo, "prazo": prazo, "empregado_id": empregado_id, "concluida": concluida})
+        assert resposta.status_code == 200, resposta.text
+        return resposta.json()["id"]
+    return criar
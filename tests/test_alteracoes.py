@@ -0,0 +1,51 @@
+# GET /changes: o que mudou depois de um token, incluindo as remoções (lápides), e o pedido
+# de carga completa quando as lápides que o cliente precisava já foram descartadas.
+from sqlalchemy import update
+
+from database import agora_utc, descartar_remocoes_antigas
+from models import Remocao
+
+
+def _token(cliente) -> int:
+    return cliente.get("/changes").json()["token"]
+
+
+def test_changes_depois_de_apagar_tarefa(cliente, nova_tarefa):
+    apagada, mantida = nova_tarefa("Apagar"), nova_tarefa("Manter")
+    token = _token(cliente)
+    assert cliente.delete(f"/tarefas/{apagada}").status_code == 200
+
+    resposta = cliente.get("/changes", params={"since": token})
+    assert resposta.status_code == 200
+    alteracoes = resposta.json()
+    assert alteracoes["removidos"]["tarefas"] == [apagada]
+    assert mantida not in [t["id"] for t in alteracoes["alterados"]["tarefas"]]
+    assert alteracoes["token"] > token
+    # A partir do token novo, nada mais a aplicar
+    seguinte = cliente.get("/changes", params={"since": alteracoes["token"]}).json()
+    assert seguinte["removidos"]["tarefas"] == [] and seguinte["alterados"]["tarefas"] == []
+
+
+def test_changes_depois_de_apagar_empregado(cliente, novo_empregado, nova_tarefa):
+    empregado = novo_empregado()
+    tarefa = nova_tarefa(empregado_id=empregado)
+    token = _token(cliente)
+    assert cliente.delete(f"/empregados/{empregado}").status_code == 200
+
+    alteracoes = cliente.get("/changes", params={"since": token}).json()
+    assert alteracoes["removidos"]["empregados"] == [empregado]
+    # A tarefa ficou sem responsável e volta como alterada
+    assert [(t["id"], t["empregado_id"]) for t in alteracoes["alterados"]["tarefas"]] == [(tarefa, None)]
+
+
+def test_changes_pede_carga_completa_depois_do_descarte(cliente, db, nova_tarefa):
+    tarefa = nova_tarefa()
+    token = _token(cliente)
+    cliente.delete(f"/tarefas/{tarefa}")
+    db.execute(update(Remocao).values(removida_em=agora_utc().replace(year=2000)))
+    db.commit()
+
+    assert descartar_remocoes_antigas(db, dias=30) == 1
+    assert cliente.get("/changes", params={"since": token}).status_code == 410
+    # Quem refaz a carga recebe um token novo e volta a sincronizar normalmente
+    assert cliente.get("/changes", params={"since": _token(cliente)}).status_code == 200
@@ -0,0 +1,71 @@
+# Arquivamento das tarefas concluídas: só as concluídas sem escrita há mais de ARQUIVO_DIAS
+# dias saem de 'tarefas' (as sem data, de antes da migração 2, ficam).
+import importlib
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+import arquivo
+from database import agora_utc
+from models import Tarefa, TarefaArquivada
+
+
+@pytest.fixture
+def tarefas_com_idade(db, nova_tarefa):
+    """Nome -> id de tarefas com atualizado_em envelhecido direto no banco."""
+    idades = {"concluida_10d": (True, 10), "concluida_45d": (True, 45), "concluida_120d": (True, 120),
+              "aberta_120d": (False, 120), "concluida_sem_data": (True, None)}
+    # Todas criadas pela API antes do UPDATE: a sessão do teste segura a escrita até o commit
+    ids = {nome: nova_tarefa(nome, concluida=concluida) for nome, (concluida, _) in idades.items()}
+    for nome, (_, dias) in idades.items():
+        data = None if dias is None else agora_utc() - timedelta(days=dias)
+        db.execute(update(Tarefa).where(Tarefa.id == ids[nome]).values(atualizado_em=data))
+    db.commit()
+    return ids
+
+
+def _restantes(db) -> set:
+    return set(db.scalars(select(Tarefa.titulo)))
+
+
+def _arquivadas(db) -> set:
+    return set(db.scalars(select(TarefaArquivada.titulo)))
+
+
+@pytest.fixture
+def arquivo_com_dias(monkeypatch):
+    """Recarrega arquivo.py com ARQUIVO_DIAS no ambiente (o valor é lido no import)."""
+    def recarregar(dias: int):
+        monkeypatch.setenv("ARQUIVO_DIAS", str(dias))
+        return importlib.reload(arquivo)
+    yield recarregar
+    monkeypatch.delenv("ARQUIVO_DIAS", raising=False)
+    importlib.reload(arquivo)
+
+
+def test_arquivamento_usa_arquivo_dias(db, tarefas_com_idade, arquivo_com_dias):
+    modulo = arquivo_com_dias(30)
+    assert modulo.ARQUIVO_DIAS == 30
+    assert modulo.arquivar_concluidas(db, simular=True)["arquivadas"] == 2
+
+    resultado = modulo.arquivar_concluidas(db)
+    assert resultado["arquivadas"] == 2 and resultado["dias"] == 30
+    assert _arquivadas(db) == {"concluida_45d", "concluida_120d"}
+    assert _restantes(db) == {"concluida_10d", "aberta_120d", "concluida_sem_data"}
+
+
+def test_arquivamento_padrao_de_90_dias(db, tarefas_com_idade, arquivo_com_dias):
+    modulo = arquivo_com_dias(90)
+    assert modulo.arquivar_concluidas(db, lote=1)["arquivadas"] == 1
+    assert _arquivadas(db) == {"concluida_120d"}
+    # Uma segunda rodada não encontra mais nada
+    assert modulo.arquivar_concluidas(db)["arquivadas"] == 0
+
+
+def test_arquivadas_saem_pelo_changes(cliente, db, tarefas_com_idade):
+    token = cliente.get("/changes").json()["token"]
+    arquivo.arquivar_concluidas(db, dias=100)
+    removidas = cliente.get("/changes", params={"since": token}).json()["removidos"]["tarefas"]
+    assert removidas == [tarefas_com_idade["concluida_120d"]]
+    assert [t["id"] for t in cliente.get("/tarefas/arquivo").json()] == [tarefas_com_idade["concluida_120d"]]
@@ -0,0 +1,52 @@
+# Desligamento de empregados: as tarefas vão para outro empregado (ou ficam sem responsável)
+# e o contador tarefas_abertas acompanha, sem divergência na reconciliação.
+from sqlalchemy import select
+
+from database import reconciliar_carga_trabalho
+from models import Empregado, Tarefa
+
+
+def _cargas(db) -> dict:
+    db.expire_all()
+    return dict(db.execute(select(Empregado.id, Empregado.tarefas_abertas)).all())
+
+
+def _responsaveis(db) -> dict:
+    return dict(db.execute(select(Tarefa.id, Tarefa.empregado_id)).all())
+
+
+def test_desligamento_transfere_tarefas_e_carga(cliente, db, novo_empregado, nova_tarefa):
+    ana, beto = novo_empregado("Ana"), novo_empregado("Beto")
+    abertas = [nova_tarefa(f"A{i}", empregado_id=ana) for i in range(3)]
+    concluida = nova_tarefa("Feita", empregado_id=ana, concluida=True)
+    nova_tarefa("Do Beto", empregado_id=beto)
+
+    resposta = cliente.post(f"/empregados/{ana}/desligamento", json={"transferir_para": beto})
+    assert resposta.status_code == 200, resposta.text
+    resultado = resposta.json()
+    assert resultado["tarefas_transferidas"] == 4 and resultado["tarefas_abertas"] == 3
+
+    assert _cargas(db) == {beto: 4}
+    responsaveis = _responsaveis(db)
+    assert all(responsaveis[t] == beto for t in abertas + [concluida])
+    assert reconciliar_carga_trabalho(db, corrigir=False) == []
+
+
+def test_apagar_empregado_deixa_tarefas_sem_responsavel(cliente, db, novo_empregado, nova_tarefa):
+    ana, beto = novo_empregado("Ana"), novo_empregado("Beto")
+    tarefas = [nova_tarefa(f"A{i}", empregado_id=ana) for i in range(2)]
+
+    assert cliente.delete(f"/empregados/{ana}").status_code == 200
+    assert _cargas(db) == {beto: 0}
+    assert all(_responsaveis(db)[t] is None for t in tarefas)
+    assert reconciliar_carga_trabalho(db, corrigir=False) == []
+
+
+def test_desligamento_com_destino_invalido_nao_altera_nada(cliente, db, novo_empregado, nova_tarefa):
+    ana = novo_empregado("Ana")
+    tarefa = nova_tarefa(empregado_id=ana)
+    assert cliente.post(f"/empregados/{ana}/desligamento", json={"transferir_para": ana}).status_code == 400
+    assert cliente.post(f"/empregados/{ana}/desligamento", json={"transferir_para": 999999}).status_code == 400
+    assert cliente.post("/empregados/999999/desligamento", json={}).status_code == 404
+    assert _cargas(db) == {ana: 1}
+    assert _responsaveis(db)[tarefa] == ana
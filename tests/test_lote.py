@@ -0,0 +1,47 @@
+# POST /tarefas/lote: o contador tarefas_abertas dos empregados continua batendo com as tarefas
+# depois de cada operação (a conferência é a mesma do reconciliar_carga.py).
+from sqlalchemy import select
+
+from database import reconciliar_carga_trabalho
+from models import Empregado
+
+
+def _cargas(db) -> dict:
+    db.expire_all()
+    return dict(db.execute(select(Empregado.id, Empregado.tarefas_abertas)).all())
+
+
+def _lote(cliente, operacao: str, ids, **extra) -> dict:
+    resposta = cliente.post("/tarefas/lote", json={"operacao": operacao, "ids": ids, **extra})
+    assert resposta.status_code == 200, resposta.text
+    return resposta.json()
+
+
+def test_lote_mantem_tarefas_abertas(cliente, db, novo_empregado, nova_tarefa):
+    ana, beto = novo_empregado("Ana"), novo_empregado("Beto")
+    tarefas = [nova_tarefa(f"T{i}", empregado_id=ana if i % 2 else beto) for i in range(6)]
+    assert _cargas(db) == {ana: 3, beto: 3}
+
+    # Inclui ids repetidos, já concluídos e inexistentes: só o que muda conta
+    assert _lote(cliente, "concluir", tarefas[:2] + tarefas[:1] + [999999])["alteradas"] == 2
+    assert _lote(cliente, "concluir", tarefas[:2])["alteradas"] == 0
+    assert _cargas(db) == {ana: 2, beto: 2}
+
+    _lote(cliente, "atribuir", tarefas, empregado_id=ana)  # Só as abertas pesam na carga
+    assert _cargas(db) == {ana: 4, beto: 0}
+
+    _lote(cliente, "reabrir", tarefas[:1])
+    _lote(cliente, "atribuir", tarefas[2:4], empregado_id=None)
+    assert _cargas(db) == {ana: 3, beto: 0}
+
+    _lote(cliente, "deletar", tarefas[4:] + tarefas[1:2])
+    assert _cargas(db) == {ana: 1, beto: 0}
+    assert reconciliar_carga_trabalho(db, corrigir=False) == []
+
+
+def test_lote_com_empregado_inexistente_nao_altera_nada(cliente, db, novo_empregado, nova_tarefa):
+    ana = novo_empregado("Ana")
+    tarefa = nova_tarefa(empregado_id=ana)
+    resposta = cliente.post("/tarefas/lote", json={"operacao": "atribuir", "ids": [tarefa], "empregado_id": 999999})
+    assert resposta.status_code == 400
+    assert _cargas(db) == {ana: 1}
@@ -0,0 +1,45 @@
+# Paginação por cursor das tarefas ordenadas por prazo: as tarefas sem prazo vêm no fim,
+# por id, e nenhuma página repete ou pula tarefas ao atravessar a fronteira prazo/sem prazo.
+from datetime import date
+
+from models import Tarefa
+
+
+def _todas_as_paginas(cliente, limite: int, **filtros) -> list:
+    ids, cursor = [], None
+    while True:
+        parametros = {"limit": limite, "ordenar": "prazo", **filtros}
+        if cursor:
+            parametros["cursor"] = cursor
+        resposta = cliente.get("/tarefas/", params=parametros)
+        assert resposta.status_code == 200, resposta.text
+        ids += [t["id"] for t in resposta.json()]
+        cursor = resposta.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+
+
+def _criar_tarefas(db) -> list:
+    # Prazos repetidos e tarefas sem prazo intercaladas na ordem de criação (ids)
+    prazos = [date(2030, 1, 5), None, date(2030, 1, 2), None, date(2030, 1, 5), date(2030, 1, 2), None, date(2030, 2, 1)]
+    tarefas = [Tarefa(titulo=f"T{i}", prazo=prazo, concluida=(i % 3 == 0)) for i, prazo in enumerate(prazos)]
+    db.add_all(tarefas)
+    db.commit()
+    return tarefas
+
+
+def _ordem_esperada(tarefas) -> list:
+    return [t.id for t in sorted(tarefas, key=lambda t: (t.prazo or date.max, t.id))]
+
+
+def test_paginacao_por_prazo_atravessa_tarefas_sem_prazo(cliente, db):
+    tarefas = _criar_tarefas(db)
+    esperado = _ordem_esperada(tarefas)
+    for limite in (1, 2, 3):
+        assert _todas_as_paginas(cliente, limite) == esperado
+
+
+def test_paginacao_por_prazo_com_filtro_de_concluida(cliente, db):
+    tarefas = _criar_tarefas(db)
+    pendentes = [t for t in tarefas if not t.concluida]
+    assert _todas_as_paginas(cliente, 2, concluida="false") == _ordem_esperada(pendentes)
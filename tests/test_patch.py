@@ -0,0 +1,42 @@
+# PATCH sem diferença (vazio ou com os valores atuais) não é uma escrita: o token do
+# GET /changes e o ETag das listagens continuam os mesmos e nada volta como alterado.
+import pytest
+
+
+def _token(cliente) -> int:
+    return cliente.get("/changes").json()["token"]
+
+
+def _alteradas(cliente, token: int, tabela: str) -> list:
+    return [linha["id"] for linha in cliente.get("/changes", params={"since": token}).json()["alterados"][tabela]]
+
+
+@pytest.mark.parametrize("corpo", [{}, {"titulo": "Revisar", "prazo": "2030-01-10"}])
+def test_patch_de_tarefa_sem_mudanca_nao_sobe_a_versao(cliente, nova_tarefa, corpo):
+    tarefa = nova_tarefa("Revisar", prazo="2030-01-10")
+    etag = cliente.get("/tarefas/").headers["ETag"]
+    token = _token(cliente)
+
+    assert cliente.patch(f"/tarefas/{tarefa}", json=corpo).status_code == 200
+    assert _token(cliente) == token
+    assert _alteradas(cliente, token, "tarefas") == []
+    assert cliente.get("/tarefas/", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_patch_de_empregado_sem_mudanca_nao_sobe_a_versao(cliente, novo_empregado):
+    empregado = novo_empregado("Ana")
+    atual = cliente.get("/empregados/").json()[0]
+    token = _token(cliente)
+
+    resposta = cliente.patch(f"/empregados/{empregado}", json={"nome": atual["nome"], "cargo": atual["cargo"]})
+    assert resposta.status_code == 200
+    assert _token(cliente) == token
+    assert _alteradas(cliente, token, "empregados") == []
+
+
+def test_patch_com_mudanca_sobe_a_versao(cliente, nova_tarefa):
+    tarefa = nova_tarefa("Revisar")
+    token = _token(cliente)
+    assert cliente.patch(f"/tarefas/{tarefa}", json={"titulo": "Revisar de novo"}).status_code == 200
+    assert _token(cliente) > token
+    assert _alteradas(cliente, token, "tarefas") == [tarefa]
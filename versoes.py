@@ -0,0 +1,122 @@
+# versoes.py
+# Contador de versão por tabela, compartilhado entre todos os workers do uvicorn da mesma máquina.
+# Cada rota de escrita incrementa o contador da tabela depois do commit; as listagens usam os
+# contadores para montar o ETag e responder 304 sem tocar no banco.
+# Os contadores ficam em um arquivo pequeno mapeado em memória (mmap): a leitura é só um acesso
+# à memória e o incremento usa um lock de arquivo (fcntl), então vale entre processos.
+import hashlib
+import mmap
+import os
+import secrets
+import struct
+import tempfile
+import threading
+
+try:
+    import fcntl  # Indisponível no Windows (app desktop): lá existe um processo só
+except ImportError:
+    fcntl = None
+
+from database import DATABASE_URL
+
+# Ordem fixa: novas tabelas entram sempre no fim para não mudar a posição das existentes
+TABELAS = ("empregados", "tarefas")
+MAX_TABELAS = 16
+
+# Layout: 8 bytes de "época" (aleatória, trocada a cada reinício do servidor) + 8 bytes por tabela
+_FORMATO = "<Q"
+_TAMANHO = 8 * (1 + MAX_TABELAS)
+
+ARQUIVO_VERSOES = os.environ.get("VERSOES_ARQUIVO") or os.path.join(
+    tempfile.gettempdir(),
+    # Um arquivo por banco: duas instalações na mesma máquina não compartilham contadores
+    f"flowscheduler-versoes-{hashlib.sha1(DATABASE_URL.encode()).hexdigest()[:12]}.bin",
+)
+
+_lock_local = threading.Lock()
+_mapa = None
+
+
+def _abrir():
+    """Abre (criando se preciso) o arquivo de contadores e devolve (fd, mmap)."""
+    global _mapa
+    if _mapa is not None:
+        return _mapa
+    with _lock_local:
+        if _mapa is None:
+            fd = os.open(ARQUIVO_VERSOES, os.O_RDWR | os.O_CREAT, 0o600)
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size < _TAMANHO:
+                    os.ftruncate(fd, _TAMANHO)
+                mm = mmap.mmap(fd, _TAMANHO)
+                # Arquivo recém-criado: sorteia a época (nunca 0, que indica "não inicializado")
+                if struct.unpack_from(_FORMATO, mm, 0)[0] == 0:
+                    struct.pack_into(_FORMATO, mm, 0, secrets.randbits(63) | 1)
+            finally:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+            _mapa = (fd, mm)
+    return _mapa
+
+
+def _posicao(tabela: str) -> int:
+    return 8 * (1 + TABELAS.index(tabela))
+
+
+def versao(tabela: str) -> int:
+    """Versão atual da tabela (leitura direta da memória compartilhada, sem lock)."""
+    _, mm = _abrir()
+    return struct.unpack_from(_FORMATO, mm, _posicao(tabela))[0]
+
+
+def _descartar_no_filho():
+    """Depois de um fork (gunicorn --preload) o filho reabre o arquivo: o flock vale por
+    descritor aberto, e um descritor herdado do mestre não trava contra os outros workers."""
+    global _mapa
+    _mapa = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_descartar_no_filho)
+
+
+def epoca() -> int:
+    """Identificador aleatório da "geração" dos contadores (muda em reiniciar())."""
+    _, mm = _abrir()
+    return struct.unpack_from(_FORMATO, mm, 0)[0]
+
+
+def incrementar(*tabelas: str):
+    """Marca as tabelas como alteradas. Chamar DEPOIS do commit."""
+    fd, mm = _abrir()
+    with _lock_local:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            for tabela in tabelas:
+                posicao = _posicao(tabela)
+                atual = struct.unpack_from(_FORMATO, mm, posicao)[0]
+                struct.pack_into(_FORMATO, mm, posicao, atual + 1)
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def reiniciar():
+    """
+    Troca a época e zera os contadores. Chamado uma vez antes de subir os workers
+    (initial_setup.py): o banco pode ter mudado enquanto o servidor estava parado,
+    então nenhum ETag emitido antes do reinício pode continuar válido.
+    """
+    fd, mm = _abrir()
+    with _lock_local:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            mm[:] = bytes(_TAMANHO)
+            struct.pack_into(_FORMATO, mm, 0, secrets.randbits(63) | 1)
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)